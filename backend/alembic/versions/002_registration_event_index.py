@@ -0,0 +1,24 @@
+"""Index registrations by event
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Event listings aggregate registration counts grouped by event
+    op.create_index('ix_registrations_event_id', 'registrations', ['event_id'])
+
+
+def downgrade():
+    op.drop_index('ix_registrations_event_id', table_name='registrations')
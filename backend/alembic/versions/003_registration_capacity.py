@@ -0,0 +1,50 @@
+"""Enforce registration capacity and uniqueness
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the earliest registration of any duplicated (event, user) pair
+    op.execute(
+        """
+        DELETE FROM registrations a
+        USING registrations b
+        WHERE a.event_id = b.event_id
+          AND a.user_id = b.user_id
+          AND (a.created_at, a.id) > (b.created_at, b.id)
+        """
+    )
+    op.create_unique_constraint(
+        'uq_registrations_event_user', 'registrations', ['event_id', 'user_id']
+    )
+
+    op.add_column(
+        'events',
+        sa.Column('seats_taken', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute(
+        """
+        UPDATE events
+        SET seats_taken = (
+            SELECT count(*) FROM registrations WHERE registrations.event_id = events.id
+        )
+        """
+    )
+
+
+def downgrade():
+    op.drop_column('events', 'seats_taken')
+    op.drop_constraint('uq_registrations_event_user', 'registrations', type_='unique')
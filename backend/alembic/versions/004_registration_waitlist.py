@@ -0,0 +1,42 @@
+"""Registration waitlist
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+registration_status = sa.Enum(
+    'CONFIRMED', 'WAITLISTED', 'CANCELLED', name='registrationstatus'
+)
+
+
+def upgrade():
+    registration_status.create(op.get_bind(), checkfirst=True)
+    op.add_column(
+        'registrations',
+        sa.Column('status', registration_status, nullable=False, server_default='CONFIRMED'),
+    )
+    op.add_column(
+        'registrations',
+        sa.Column('waitlisted_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        'ix_registrations_waitlist', 'registrations', ['event_id', 'status', 'waitlisted_at']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_registrations_waitlist', table_name='registrations')
+    op.drop_column('registrations', 'waitlisted_at')
+    op.drop_column('registrations', 'status')
+    registration_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,28 @@
+"""Index updated_at
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+TABLES = ['users', 'events', 'registrations', 'blog_posts', 'gallery']
+
+
+def upgrade():
+    # ETags for public reads are built from max(updated_at) of each table
+    for table in TABLES:
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'])
+
+
+def downgrade():
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
@@ -0,0 +1,46 @@
+"""Job queue
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+job_status = sa.Enum('QUEUED', 'RUNNING', 'FAILED', name='jobstatus')
+
+
+def upgrade():
+    job_status.create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        'jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('kind', sa.String(64), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', job_status, nullable=False, server_default='QUEUED'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('run_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_jobs_claim', 'jobs', ['status', 'run_at'])
+    op.create_index('ix_jobs_updated_at', 'jobs', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_jobs_updated_at', table_name='jobs')
+    op.drop_index('ix_jobs_claim', table_name='jobs')
+    op.drop_table('jobs')
+    job_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,32 @@
+"""Image variants
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('gallery', 'image_variants'),
+    ('events', 'cover_image_variants'),
+    ('users', 'profile_pic_variants'),
+]
+
+
+def upgrade():
+    for table, column in COLUMNS:
+        op.add_column(table, sa.Column(column, sa.JSON(), nullable=True))
+
+
+def downgrade():
+    for table, column in COLUMNS:
+        op.drop_column(table, column)
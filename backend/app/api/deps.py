@@ -0,0 +1,44 @@
+"""
+Shared API dependencies.
+"""
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_active_user, get_current_host_user, TokenPayload
+from app.core.database import get_db
+from app.crud import user
+from app.schemas.user import CurrentUser
+
+
+async def _resolve_user(current_user: TokenPayload, db: AsyncSession) -> CurrentUser:
+    """Resolve the token's email to the user's id and role."""
+    identity = None
+    if current_user.email:
+        identity = await user.get_identity(db, email=current_user.email)
+    if identity is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    return identity.model_copy(update={"cognito_groups": current_user.cognito_groups})
+
+
+async def get_current_db_user(
+    current_user: TokenPayload = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+) -> CurrentUser:
+    """
+    Get the current user's database identity.
+    
+    FastAPI resolves the dependency once per request, and the email to
+    id/role lookup is cached across requests for USER_CACHE_TTL_SECONDS.
+    """
+    return await _resolve_user(current_user, db)
+
+
+async def get_current_db_host_user(
+    current_user: TokenPayload = Depends(get_current_host_user),
+    db: AsyncSession = Depends(get_db),
+) -> CurrentUser:
+    """Get the current host user's database identity."""
+    return await _resolve_user(current_user, db)
@@ -1,107 +1,137 @@
 """
 Blog API endpoints.
 """
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Path
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
-from app.core.auth import get_current_active_user, get_current_host_user, TokenPayload
-from app.core.database import get_db
+from app.api.deps import get_current_db_host_user
+from app.core.conditional import resource_version
+from app.core.database import get_db, get_read_db
+from app.core.fieldsets import FieldSelector, Shape, load_options
+from app.core.response_cache import BLOG, CachedResponse, cached_response, response_cache
+from app.core.serialization import dump_trusted
+from app.crud import blog_post
 from app.models.blog import BlogPost
 from app.models.user import User
 from app.schemas.blog import BlogPost as BlogPostSchema
 from app.schemas.blog import BlogPostCreate, BlogPostUpdate, BlogPostWithAuthor
+from app.schemas.user import CurrentUser
 
 router = APIRouter()
 
+# fields= and expand= for the public reads
+_post_fields = FieldSelector(BlogPostWithAuthor)
+
 
 @router.post("", response_model=BlogPostSchema)
 async def create_blog_post(
     post_in: BlogPostCreate,
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Create new blog post (host only).
     """
-    # Get the user directly
-    user_query = select(User).where(User.email == current_user.email)
-    result = await db.execute(user_query)
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
     # Create blog post directly
     db_obj = BlogPost(
         title=post_in.title,
         content=post_in.content,
-        author_id=db_user.id
+        author_id=current_user.id
     )
     
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    await response_cache.invalidate(BLOG)
     return db_obj
 
 
 @router.get("", response_model=List[BlogPostWithAuthor])
 async def read_blog_posts(
+    request: Request,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1),
+    shape: Shape = Depends(_post_fields),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Any:
     """
-    Get all blog posts (public).
+    Get all blog posts, newest first (public).
+    
+    The X-Next-Cursor response header holds the cursor for the next page.
+    fields= and expand= narrow the response, e.g. fields=title&expand= for
+    a list of titles without post bodies or authors.
     """
-    query = (
-        select(BlogPost)
-        .options(joinedload(BlogPost.author))
-        .order_by(BlogPost.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+    async def load(session: AsyncSession) -> CachedResponse:
+        db_posts, next_cursor = await blog_post.get_multi_with_author(
+            db=session,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            # created_at is read for the next page's cursor
+            options=load_options(BlogPost, shape, BlogPost.created_at),
+        )
+        return CachedResponse(
+            body=dump_trusted(List[BlogPostWithAuthor], db_posts, shape=shape),
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else {},
+        )
+    
+    page = blog_post.page_rows(cursor=cursor, skip=skip, limit=limit)
+    on_page = select(page.subquery().c.id)
+    version = await resource_version(
+        db,
+        (User, User.id.in_(select(BlogPost.author_id).where(BlogPost.id.in_(on_page)))),
+        page=page,
     )
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await cached_response(request, db, load, collection=BLOG, version=version)
 
 
 @router.get("/{id}", response_model=BlogPostWithAuthor)
 async def read_blog_post(
+    request: Request,
     id: UUID = Path(...),
-    db: AsyncSession = Depends(get_db),
+    shape: Shape = Depends(_post_fields),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Any:
     """
     Get blog post by ID (public).
-    """
-    # Get blog post with author directly
-    query = (
-        select(BlogPost)
-        .options(joinedload(BlogPost.author))
-        .where(BlogPost.id == id)
-    )
-    result = await db.execute(query)
-    db_post = result.scalar_one_or_none()
     
-    if not db_post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Blog post not found",
+    fields= and expand= narrow the response; by default it embeds the author.
+    """
+    async def load(session: AsyncSession) -> CachedResponse:
+        # Load only the requested columns and the author if expanded
+        query = (
+            select(BlogPost)
+            .options(*load_options(BlogPost, shape))
+            .where(BlogPost.id == id)
         )
-    return db_post
+        result = await session.execute(query)
+        db_post = result.scalar_one_or_none()
+        
+        if not db_post:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Blog post not found",
+            )
+        return CachedResponse(body=dump_trusted(BlogPostWithAuthor, db_post, shape=shape))
+    
+    version = await resource_version(
+        db,
+        (BlogPost, BlogPost.id == id),
+        (User, User.id == select(BlogPost.author_id).where(BlogPost.id == id).scalar_subquery()),
+    )
+    return await cached_response(request, db, load, collection=BLOG, id=id, version=version)
 
 
 @router.patch("/{id}", response_model=BlogPostSchema)
 async def update_blog_post(
     post_in: BlogPostUpdate,
     id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
@@ -118,19 +148,8 @@ async def update_blog_post(
             detail="Blog post not found",
         )
     
-    # Get the user directly
-    user_query = select(User).where(User.email == current_user.email)
-    result = await db.execute(user_query)
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-        
     # Check if user is author
-    if db_post.author_id != db_user.id and "admin" not in current_user.cognito_groups:
+    if db_post.author_id != current_user.id and "admin" not in current_user.cognito_groups:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
@@ -144,13 +163,14 @@ async def update_blog_post(
     db.add(db_post)
     await db.commit()
     await db.refresh(db_post)
+    await response_cache.invalidate_item(BLOG, id)
     return db_post
 
 
 @router.delete("/{id}", response_model=BlogPostSchema)
 async def delete_blog_post(
     id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
@@ -167,19 +187,8 @@ async def delete_blog_post(
             detail="Blog post not found",
         )
     
-    # Get the user directly
-    user_query = select(User).where(User.email == current_user.email)
-    result = await db.execute(user_query)
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-        
     # Check if user is author
-    if db_post.author_id != db_user.id and "admin" not in current_user.cognito_groups:
+    if db_post.author_id != current_user.id and "admin" not in current_user.cognito_groups:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
@@ -188,4 +197,5 @@ async def delete_blog_post(
     # Delete blog post directly
     await db.delete(db_post)
     await db.commit()
+    await response_cache.invalidate_item(BLOG, id)
     return db_post
\ No newline at end of file
@@ -1,49 +1,58 @@
 """
 Event API endpoints.
 """
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
 from uuid import UUID
-from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status, Path
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, status, Path
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
-from app.core.auth import get_current_active_user, get_current_host_user, TokenPayload
-from app.core.database import get_db
-from app.core.storage import BucketName, upload_file_to_s3
+from app.api.deps import get_current_db_host_user, get_current_db_user
+from app.core.conditional import resource_version
+from app.core.database import get_db, get_read_db
+from app.core.fieldsets import FieldSelector, Shape, load_options
+from app.core.images import EVENT_COVER, delete_image_later, queue_image_variants, replace_image
+from app.core.response_cache import EVENTS, CachedResponse, cached_response, response_cache
+from app.core.serialization import dump_trusted
+from app.core.tickets import InvalidTicket, Ticket, decode_ticket
+from app.core.storage import (
+    BucketName, confirm_upload, create_upload_slot, delete_object_later, new_object_key,
+    upload_file_to_s3,
+)
+from app.crud import event, registration
 from app.models.event import Event as EventModel
-from app.models.user import User, UserRole
-from app.models.registration import Registration as RegistrationModel
-from app.schemas.event import Event, EventCreate, EventUpdate, EventWithRelations
-from app.schemas.registration import Registration, RegistrationCreate, RegistrationUpdate
-from app.schemas.user import User
+from app.models.user import UserRole
+from app.models.registration import Registration as RegistrationModel, RegistrationStatus
+from app.models.user import User as UserModel
+from app.schemas.event import (
+    Event, EventCreate, EventUpdate, EventWithCounts, EventWithCountsAndRegistrations,
+    EventWithRelations,
+)
+from app.schemas.registration import (
+    BulkCheckIn, CheckInResult, CheckInStatus, Registration, RegistrationCreate,
+    RegistrationUpdate, TicketCheckIn,
+)
+from app.schemas.upload import UploadConfirm, UploadSlot, UploadSlotRequest
+from app.schemas.user import CurrentUser
 
 router = APIRouter()
 
+# fields= and expand= for the public reads; listings embed the creator by default
+_event_list_fields = FieldSelector(EventWithCountsAndRegistrations, default_expand=["created_by"])
+_event_fields = FieldSelector(EventWithRelations)
+
 
 @router.post("", response_model=Event)
 async def create_event(
     event_in: EventCreate,
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Create new event (host only).
     """
-    # Get user directly
-    query = select(User).where(User.email == current_user.email)
-    result = await db.execute(query)
-    db_user = result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
     # Create event directly
     db_obj = EventModel(
         title=event_in.title,
@@ -54,111 +63,143 @@ async def create_event(
         price=event_in.price,
         capacity=event_in.capacity,
         cover_image_url=event_in.cover_image_url,
-        created_by_id=db_user.id
+        created_by_id=current_user.id
     )
     
     db.add(db_obj)
+    await db.flush()
+    # Resized variants of the cover are rendered by the job worker
+    queue_image_variants(db, EVENT_COVER, db_obj, db_obj.cover_image_url)
     await db.commit()
     await db.refresh(db_obj)
+    await response_cache.invalidate(EVENTS)
     return db_obj
 
 
-@router.get("", response_model=List[EventWithRelations])
+@router.get(
+    "",
+    response_model=List[Union[EventWithCountsAndRegistrations, EventWithCounts]],
+)
 async def read_events(
+    request: Request,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1),
+    include: Optional[str] = Query(
+        None, description="Set to 'registrations' to embed every registration"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. title,created_by.name"
+    ),
+    expand: Optional[str] = Query(
+        None, description="Comma-separated relationships to embed: created_by, registrations"
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Any:
     """
-    Get all events (public).
+    Get all events with registration counts, newest first (public).
+    
+    The X-Next-Cursor response header holds the cursor for the next page.
+    include=registrations is kept as a shorthand for
+    expand=created_by,registrations.
     """
-    # Get events with creator directly
-    query = (
-        select(EventModel)
-        .options(
-            joinedload(EventModel.created_by),
-            joinedload(EventModel.registrations).joinedload(RegistrationModel.user),
+    shape = _event_list_fields.shape(
+        fields,
+        expand,
+        default_expand=["created_by", "registrations"] if include == "registrations" else None,
+    )
+    
+    async def load(session: AsyncSession) -> CachedResponse:
+        db_events, next_cursor = await event.get_multi_with_counts(
+            db=session,
+            cursor=cursor,
+            skip=skip,
+            limit=limit,
+            # created_at is read for the next page's cursor
+            options=load_options(EventModel, shape, EventModel.created_at),
+        )
+        return CachedResponse(
+            body=dump_trusted(List[EventWithCountsAndRegistrations], db_events, shape=shape),
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else {},
         )
-        .order_by(EventModel.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+    
+    # Listings embed creators, counts and optionally registrations of the
+    # events on the page
+    page = event.page_rows(cursor=cursor, skip=skip, limit=limit)
+    on_page = select(page.subquery().c.id)
+    version = await resource_version(
+        db,
+        (RegistrationModel, RegistrationModel.event_id.in_(on_page)),
+        (UserModel, UserModel.id.in_(
+            select(EventModel.created_by_id).where(EventModel.id.in_(on_page))
+        )),
+        page=page,
     )
-    result = await db.execute(query)
-    # When joinedload includes collection relationships the result may contain
-    # duplicate parent rows; use unique() before scalars() to deduplicate.
-    return result.unique().scalars().all()
+    return await cached_response(request, db, load, collection=EVENTS, version=version)
 
 
 @router.get("/{id}", response_model=EventWithRelations)
 async def read_event(
+    request: Request,
     id: UUID = Path(...),
-    db: AsyncSession = Depends(get_db),
+    shape: Shape = Depends(_event_fields),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Any:
     """
     Get event by ID (public).
-    """
-    # Get event with creator and registrations directly
-    query = (
-        select(EventModel)
-        .options(joinedload(EventModel.created_by), joinedload(EventModel.registrations).joinedload(RegistrationModel.user))
-        .where(EventModel.id == id)
-    )
-    result = await db.execute(query)
-    db_event = result.scalar_one_or_none()
     
-    if not db_event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
+    fields= and expand= narrow the response; by default it embeds the
+    creator and every registration.
+    """
+    async def load(session: AsyncSession) -> CachedResponse:
+        # Load only the requested columns and relationships
+        query = (
+            select(EventModel)
+            .options(*load_options(EventModel, shape))
+            .where(EventModel.id == id)
         )
-    return db_event
+        result = await session.execute(query)
+        db_event = result.scalar_one_or_none()
+        
+        if not db_event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found",
+            )
+        return CachedResponse(body=dump_trusted(EventWithRelations, db_event, shape=shape))
+    
+    version = await resource_version(
+        db,
+        (EventModel, EventModel.id == id),
+        (RegistrationModel, RegistrationModel.event_id == id),
+        (UserModel, or_(
+            UserModel.id == select(EventModel.created_by_id).where(EventModel.id == id).scalar_subquery(),
+            UserModel.id.in_(select(RegistrationModel.user_id).where(RegistrationModel.event_id == id)),
+        )),
+    )
+    return await cached_response(request, db, load, collection=EVENTS, id=id, version=version)
 
 
 @router.post("/{event_id}/register", response_model=Registration)
 async def register_for_event(
     event_id: UUID,
-    current_user: TokenPayload = Depends(get_current_active_user),
+    current_user: CurrentUser = Depends(get_current_db_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Register current user for an event.
     """
-    # Get user
-    user_query = select(User).where(User.email == current_user.email)
-    user_result = await db.execute(user_query)
-    db_user = user_result.scalar_one_or_none()
-    if not db_user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Get event
-    event_query = select(EventModel).where(EventModel.id == event_id)
-    event_result = await db.execute(event_query)
-    db_event = event_result.scalar_one_or_none()
-    if not db_event:
-        raise HTTPException(status_code=404, detail="Event not found")
-
-    # Check if already registered
-    reg_query = select(RegistrationModel).where(
-        RegistrationModel.event_id == event_id, RegistrationModel.user_id == db_user.id
-    )
-    reg_result = await db.execute(reg_query)
-    existing_reg = reg_result.scalar_one_or_none()
-    if existing_reg:
-        raise HTTPException(status_code=400, detail="Already registered for this event")
-
-    # Create registration
-    new_reg = RegistrationModel(event_id=event_id, user_id=db_user.id)
-    db.add(new_reg)
-    await db.commit()
-    await db.refresh(new_reg)
-    return new_reg
+    # Claim a seat and create the registration and its QR code job atomically
+    new_registration = await registration.register(db=db, event_id=event_id, user_id=current_user.id)
+    await response_cache.invalidate_item(EVENTS, event_id)
+    return new_registration
 
 
 @router.post("/{event_id}/attendance", response_model=Registration)
 async def mark_attendance(
     event_id: UUID,
     user_id: UUID,
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -168,15 +209,11 @@ async def mark_attendance(
     event_query = select(EventModel).where(EventModel.id == event_id)
     event_result = await db.execute(event_query)
     db_event = event_result.scalar_one_or_none()
-    
-    host_user_query = select(User).where(User.email == current_user.email)
-    host_user_result = await db.execute(host_user_query)
-    db_host = host_user_result.scalar_one_or_none()
 
-    if not db_event or not db_host:
-        raise HTTPException(status_code=404, detail="Event or host not found")
+    if not db_event:
+        raise HTTPException(status_code=404, detail="Event not found")
 
-    if db_event.created_by_id != db_host.id and db_host.role != UserRole.ADMIN:
+    if db_event.created_by_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized to mark attendance for this event")
 
     # Find the registration
@@ -188,21 +225,128 @@ async def mark_attendance(
 
     if not db_reg:
         raise HTTPException(status_code=404, detail="User is not registered for this event")
+    if db_reg.status != RegistrationStatus.CONFIRMED:
+        raise HTTPException(status_code=400, detail="Only confirmed registrations can be checked in")
 
     # Mark attendance (e.g., by setting a check-in time)
     if not db_reg.checkin_start:
         db_reg.checkin_start = datetime.utcnow()
         await db.commit()
         await db.refresh(db_reg)
+        await response_cache.invalidate_item(EVENTS, event_id)
 
     return db_reg
 
 
+@router.post("/{event_id}/checkin", response_model=Registration)
+async def check_in_ticket(
+    checkin_in: TicketCheckIn,
+    event_id: UUID,
+    current_user: CurrentUser = Depends(get_current_db_host_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Check in the holder of a scanned QR ticket (host only).
+    
+    The ticket's signature and event are verified before any database work.
+    """
+    try:
+        ticket = decode_ticket(checkin_in.ticket)
+    except InvalidTicket as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    if ticket.event_id != event_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ticket is for a different event",
+        )
+    
+    await _get_event_for_host(db, event_id, current_user)
+    
+    db_reg = await registration.get(db=db, id=ticket.registration_id)
+    if not db_reg or db_reg.status != RegistrationStatus.CONFIRMED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No confirmed registration for this ticket",
+        )
+    
+    if not db_reg.checkin_start:
+        db_reg = await registration.mark_checkin_start(db=db, db_obj=db_reg)
+        await response_cache.invalidate_item(EVENTS, event_id)
+    return db_reg
+
+
+@router.post("/{event_id}/checkin/bulk", response_model=List[CheckInResult])
+async def bulk_check_in(
+    checkin_in: BulkCheckIn,
+    event_id: UUID,
+    current_user: CurrentUser = Depends(get_current_db_host_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Check in a queue of scanned QR tickets in one transaction (host only).
+    
+    Each registration keeps its earliest scan time; re-submitting scans that
+    were already applied reports them as already checked in. Results are in
+    the order of the scans.
+    """
+    now = datetime.now(timezone.utc)
+    tickets: Dict[int, Ticket] = {}
+    statuses: Dict[int, CheckInStatus] = {}
+    scanned_at: Dict[UUID, datetime] = {}
+    for index, scan in enumerate(checkin_in.scans):
+        try:
+            ticket = decode_ticket(scan.ticket)
+        except InvalidTicket:
+            statuses[index] = CheckInStatus.INVALID
+            continue
+        if ticket.event_id != event_id:
+            statuses[index] = CheckInStatus.WRONG_EVENT
+            continue
+        tickets[index] = ticket
+        # Scanner clocks drift; never record a check-in in the future
+        at = scan.scanned_at or now
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        at = min(at, now)
+        previous = scanned_at.get(ticket.registration_id)
+        scanned_at[ticket.registration_id] = min(at, previous) if previous else at
+    
+    checked_in = {}
+    if scanned_at:
+        await _get_event_for_host(db, event_id, current_user)
+        checked_in = await registration.bulk_check_in(db=db, event_id=event_id, scans=scanned_at)
+        await response_cache.invalidate_item(EVENTS, event_id)
+    
+    results = []
+    reported = set()
+    for index, scan in enumerate(checkin_in.scans):
+        if index in statuses:
+            results.append(CheckInResult(ticket=scan.ticket, status=statuses[index]))
+            continue
+        registration_id = tickets[index].registration_id
+        if registration_id not in checked_in:
+            results.append(CheckInResult(
+                ticket=scan.ticket, status=CheckInStatus.NOT_FOUND, registration_id=registration_id
+            ))
+            continue
+        checkin_start, set_now = checked_in[registration_id]
+        # A registration scanned twice in one batch is checked in by the first scan
+        first = set_now and registration_id not in reported
+        reported.add(registration_id)
+        results.append(CheckInResult(
+            ticket=scan.ticket,
+            status=CheckInStatus.CHECKED_IN if first else CheckInStatus.ALREADY_CHECKED_IN,
+            registration_id=registration_id,
+            checkin_start=checkin_start,
+        ))
+    return results
+
+
 @router.patch("/{id}", response_model=Event)
 async def update_event(
     event_in: EventUpdate,
     id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
@@ -219,19 +363,8 @@ async def update_event(
             detail="Event not found",
         )
         
-    # Get user
-    user_query = select(User).where(User.email == current_user.email)
-    user_result = await db.execute(user_query)
-    db_user = user_result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-        
     # Check ownership or admin role
-    if db_event.created_by_id != db_user.id and db_user.role != UserRole.ADMIN:
+    if db_event.created_by_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
@@ -239,18 +372,27 @@ async def update_event(
     
     # Update event directly
     update_data = event_in.model_dump(exclude_unset=True)
+    cover_url = update_data.get("cover_image_url", db_event.cover_image_url)
+    if cover_url != db_event.cover_image_url:
+        update_data.update(replace_image(db, EVENT_COVER, db_event, cover_url))
+    # Capacity changes go through the event lock so freed seats reach the waitlist
+    capacity = update_data.pop("capacity", None)
     for field, value in update_data.items():
         setattr(db_event, field, value)
     
-    await db.commit()
+    if capacity is not None:
+        await registration.set_capacity(db=db, event_id=id, capacity=capacity)
+    else:
+        await db.commit()
     await db.refresh(db_event)
+    await response_cache.invalidate_item(EVENTS, id)
     return db_event
 
 
 @router.delete("/{id}", response_model=Event)
 async def delete_event(
     id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
@@ -267,28 +409,29 @@ async def delete_event(
             detail="Event not found",
         )
     
-    # Get user
-    user_query = select(User).where(User.email == current_user.email)
-    user_result = await db.execute(user_query)
-    db_user = user_result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-        
     # Check ownership or admin role
-    if db_event.created_by_id != db_user.id and db_user.role != UserRole.ADMIN:
+    if db_event.created_by_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
     
+    # Its cover and its registrations' QR codes are removed from storage once
+    # the delete commits
+    delete_image_later(db, EVENT_COVER, db_event)
+    qr_code_urls = await db.scalars(
+        select(RegistrationModel.qr_code_url).where(
+            RegistrationModel.event_id == id, RegistrationModel.qr_code_url.is_not(None)
+        )
+    )
+    for qr_code_url in qr_code_urls:
+        delete_object_later(db, BucketName.QRCODES, qr_code_url)
+    
     # Delete event directly
     deleted_event = db_event
     await db.delete(db_event)
     await db.commit()
+    await response_cache.invalidate_item(EVENTS, id)
     return deleted_event
 
 
@@ -296,7 +439,7 @@ async def delete_event(
 async def upload_event_cover(
     cover_image: UploadFile = File(...),
     id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
@@ -313,19 +456,8 @@ async def upload_event_cover(
             detail="Event not found",
         )
     
-    # Get user
-    user_query = select(User).where(User.email == current_user.email)
-    user_result = await db.execute(user_query)
-    db_user = user_result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-        
     # Check ownership or admin role
-    if db_event.created_by_id != db_user.id and db_user.role != UserRole.ADMIN:
+    if db_event.created_by_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
@@ -339,10 +471,75 @@ async def upload_event_cover(
         content_type=cover_image.content_type,
     )
     
-    # Update event directly
-    db_event.cover_image_url = cover_url
+    # Update event directly; a cover stored under another key is removed, and
+    # the new cover's variants are rendered by the job worker
+    for field, value in replace_image(db, EVENT_COVER, db_event, cover_url).items():
+        setattr(db_event, field, value)
     await db.commit()
     await db.refresh(db_event)
+    await response_cache.invalidate_item(EVENTS, id)
+    return db_event
+
+
+async def _get_event_for_host(db: AsyncSession, id: UUID, current_user: CurrentUser) -> EventModel:
+    """Get an event the current host created, or any event for an admin."""
+    query = select(EventModel).where(EventModel.id == id)
+    result = await db.execute(query)
+    db_event = result.scalar_one_or_none()
+    
+    if not db_event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found",
+        )
+    
+    if db_event.created_by_id != current_user.id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return db_event
+
+
+@router.post("/{id}/cover/uploads", response_model=UploadSlot)
+async def create_event_cover_upload(
+    slot_in: UploadSlotRequest,
+    id: UUID = Path(...),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Get a presigned PUT to upload an event cover image directly to storage (host only).
+    """
+    await _get_event_for_host(db, id, current_user)
+    return await create_upload_slot(
+        bucket=BucketName.GALLERY,
+        object_name=new_object_key(f"events/{id}/", slot_in.filename),
+        content_type=slot_in.content_type,
+    )
+
+
+@router.post("/{id}/cover/uploads/confirm", response_model=Event)
+async def confirm_event_cover_upload(
+    upload_in: UploadConfirm,
+    id: UUID = Path(...),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Set the event cover to a finished direct upload (host only).
+    """
+    db_event = await _get_event_for_host(db, id, current_user)
+    cover_url = await confirm_upload(
+        bucket=BucketName.GALLERY,
+        object_name=upload_in.object_key,
+        prefix=f"events/{id}/",
+    )
+    for field, value in replace_image(db, EVENT_COVER, db_event, cover_url).items():
+        setattr(db_event, field, value)
+    await db.commit()
+    await db.refresh(db_event)
+    await response_cache.invalidate_item(EVENTS, id)
     return db_event
 
 
@@ -351,7 +548,7 @@ async def toggle_paid_status(
     is_paid: bool,
     price: Optional[int] = None,
     id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
@@ -368,19 +565,8 @@ async def toggle_paid_status(
             detail="Event not found",
         )
     
-    # Get user
-    user_query = select(User).where(User.email == current_user.email)
-    user_result = await db.execute(user_query)
-    db_user = user_result.scalar_one_or_none()
-    
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-        
     # Check ownership or admin role
-    if db_event.created_by_id != db_user.id and db_user.role != UserRole.ADMIN:
+    if db_event.created_by_id != current_user.id and current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
@@ -395,4 +581,5 @@ async def toggle_paid_status(
         
     await db.commit()
     await db.refresh(db_event)
+    await response_cache.invalidate_item(EVENTS, id)
     return db_event
\ No newline at end of file
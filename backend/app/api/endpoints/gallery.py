@@ -1,17 +1,28 @@
 """
 Gallery API endpoints.
 """
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Path
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request, status, Path
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.auth import get_current_active_user, get_current_host_user, TokenPayload
-from app.core.database import get_db
-from app.core.storage import BucketName, upload_file_to_s3
-from app.crud import gallery, user
+from app.api.deps import get_current_db_host_user
+from app.core.conditional import resource_version
+from app.core.database import get_db, get_read_db
+from app.core.images import GALLERY_IMAGE, delete_image_later
+from app.core.storage import (
+    BucketName, confirm_upload, create_upload_slot, new_object_key, upload_file_to_s3,
+)
+from app.core.response_cache import GALLERY, CachedResponse, cached_response, response_cache
+from app.core.serialization import dump_trusted
+from app.crud import gallery
+from app.models.gallery import Gallery as GalleryModel
+from app.models.user import User
 from app.schemas.gallery import Gallery, GalleryCreate, GalleryWithUploader
+from app.schemas.upload import UploadConfirm, UploadSlot, UploadSlotRequest
+from app.schemas.user import CurrentUser
 
 router = APIRouter()
 
@@ -19,67 +30,129 @@ router = APIRouter()
 @router.post("", response_model=Gallery)
 async def upload_gallery_image(
     image: UploadFile = File(...),
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Upload gallery image (host only).
     """
-    db_user = await user.get_by_email(db, email=current_user.email)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
     # Upload image to S3
     image_url = await upload_file_to_s3(
         file=image,
         bucket=BucketName.GALLERY,
-        object_name=f"gallery/{db_user.id}/{image.filename}",
+        object_name=new_object_key(f"gallery/{current_user.id}/", image.filename),
         content_type=image.content_type,
     )
     
     # Create gallery item
     gallery_in = GalleryCreate(image_url=image_url)
-    return await gallery.create_with_uploader(
-        db=db, obj_in=gallery_in, uploader_id=db_user.id
+    # Resized variants are rendered by the job worker
+    db_gallery = await gallery.create_with_uploader(
+        db=db, obj_in=gallery_in, uploader_id=current_user.id
+    )
+    await response_cache.invalidate(GALLERY)
+    return db_gallery
+
+
+@router.post("/uploads", response_model=UploadSlot)
+async def create_gallery_upload(
+    slot_in: UploadSlotRequest,
+    current_user: CurrentUser = Depends(get_current_db_host_user),
+) -> Any:
+    """
+    Get a presigned PUT to upload a gallery image directly to storage (host only).
+    """
+    return await create_upload_slot(
+        bucket=BucketName.GALLERY,
+        object_name=new_object_key(f"gallery/{current_user.id}/", slot_in.filename),
+        content_type=slot_in.content_type,
+    )
+
+
+@router.post("/uploads/confirm", response_model=Gallery)
+async def confirm_gallery_upload(
+    upload_in: UploadConfirm,
+    current_user: CurrentUser = Depends(get_current_db_host_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Add a finished direct upload to the gallery (host only).
+    """
+    image_url = await confirm_upload(
+        bucket=BucketName.GALLERY,
+        object_name=upload_in.object_key,
+        prefix=f"gallery/{current_user.id}/",
+    )
+    gallery_in = GalleryCreate(image_url=image_url)
+    db_gallery = await gallery.create_with_uploader(
+        db=db, obj_in=gallery_in, uploader_id=current_user.id
     )
+    await response_cache.invalidate(GALLERY)
+    return db_gallery
 
 
 @router.get("", response_model=List[GalleryWithUploader])
 async def read_gallery_images(
+    request: Request,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Any:
     """
-    Get all gallery images (public).
+    Get all gallery images, newest first (public).
+    
+    The X-Next-Cursor response header holds the cursor for the next page.
     """
-    return await gallery.get_multi_with_uploader(db=db, skip=skip, limit=limit)
+    async def load(session: AsyncSession) -> CachedResponse:
+        db_images, next_cursor = await gallery.get_multi_with_uploader(
+            db=session, cursor=cursor, skip=skip, limit=limit
+        )
+        return CachedResponse(
+            body=dump_trusted(List[GalleryWithUploader], db_images),
+            headers={"X-Next-Cursor": next_cursor} if next_cursor else {},
+        )
+    
+    page = gallery.page_rows(cursor=cursor, skip=skip, limit=limit)
+    on_page = select(page.subquery().c.id)
+    version = await resource_version(
+        db,
+        (User, User.id.in_(select(GalleryModel.uploaded_by_id).where(GalleryModel.id.in_(on_page)))),
+        page=page,
+    )
+    return await cached_response(request, db, load, collection=GALLERY, version=version)
 
 
 @router.get("/{id}", response_model=GalleryWithUploader)
 async def read_gallery_image(
+    request: Request,
     id: UUID = Path(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> Any:
     """
     Get gallery image by ID (public).
     """
-    db_gallery = await gallery.get_with_uploader(db=db, id=id)
-    if not db_gallery:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Gallery image not found",
-        )
-    return db_gallery
+    async def load(session: AsyncSession) -> CachedResponse:
+        db_gallery = await gallery.get_with_uploader(db=session, id=id)
+        if not db_gallery:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Gallery image not found",
+            )
+        return CachedResponse(body=dump_trusted(GalleryWithUploader, db_gallery))
+    
+    version = await resource_version(
+        db,
+        (GalleryModel, GalleryModel.id == id),
+        (User, User.id == select(GalleryModel.uploaded_by_id).where(GalleryModel.id == id).scalar_subquery()),
+    )
+    return await cached_response(request, db, load, collection=GALLERY, id=id, version=version)
 
 
 @router.delete("/{id}", response_model=Gallery)
 async def delete_gallery_image(
     id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_host_user),
+    current_user: CurrentUser = Depends(get_current_db_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
@@ -92,18 +165,15 @@ async def delete_gallery_image(
             detail="Gallery image not found",
         )
         
-    db_user = await user.get_by_email(db, email=current_user.email)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-        
     # Check if user is uploader
-    if db_gallery.uploaded_by_id != db_user.id and "admin" not in current_user.cognito_groups:
+    if db_gallery.uploaded_by_id != current_user.id and "admin" not in current_user.cognito_groups:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
     
-    return await gallery.remove(db=db, id=id)
\ No newline at end of file
+    # The image is removed from storage once the row's delete commits
+    delete_image_later(db, GALLERY_IMAGE, db_gallery)
+    db_gallery = await gallery.remove(db=db, id=id)
+    await response_cache.invalidate_item(GALLERY, id)
+    return db_gallery
\ No newline at end of file
@@ -1,94 +1,57 @@
 """
 Registration API endpoints.
 """
+import csv
+import io
 import json
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Path
+from fastapi.responses import RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.auth import get_current_active_user, get_current_host_user, TokenPayload
-from app.core.database import get_db
-from app.core.qrcode_utils import generate_qrcode
-from app.core.storage import BucketName
-from app.crud import event, registration, user
-from app.models.registration import PaymentStatus
+from app.api.deps import get_current_db_user
+from app.core.auth import get_current_host_user, TokenPayload
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.fieldsets import FieldSelector, Shape, load_options
+from app.core.response_cache import EVENTS, response_cache
+from app.core.serialization import dump_trusted
+from app.core.storage import BucketName, generate_presigned_download_url
+from app.core.ticket_qrcodes import ensure_registration_qrcode, qrcode_object_name
+from app.crud import event, registration
+from app.crud.registration import EXPORT_COLUMNS
+from app.models.registration import (
+    PaymentStatus, Registration as RegistrationModel, RegistrationStatus
+)
 from app.schemas.registration import (
-    Registration, RegistrationCreate, RegistrationUpdate, RegistrationWithDetails
+    ExportFormat, Registration, RegistrationUpdate, RegistrationWithDetails
 )
+from app.schemas.user import CurrentUser
 
 router = APIRouter()
 
-
-async def _generate_registration_qrcode(
-    registration_id: UUID, event_id: UUID, user_id: UUID
-) -> str:
-    """Generate QR code for registration."""
-    # Data to encode in QR code
-    qr_data = {
-        "registration_id": str(registration_id),
-        "event_id": str(event_id),
-        "user_id": str(user_id),
-    }
-    
-    # Generate QR code and upload to S3
-    return await generate_qrcode(
-        data=qr_data,
-        bucket=BucketName.QRCODES,
-        object_name=f"registrations/{registration_id}.png",
-    )
+# fields= and expand= for the registration reads
+_registration_fields = FieldSelector(RegistrationWithDetails)
 
 
 @router.post("/{event_id}/register", response_model=Registration)
 async def register_for_event(
-    background_tasks: BackgroundTasks,
     event_id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_active_user),
+    current_user: CurrentUser = Depends(get_current_db_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Register for an event.
     """
-    # Check if event exists
-    db_event = await event.get(db=db, id=event_id)
-    if not db_event:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Event not found",
-        )
-    
-    # Get user
-    db_user = await user.get_by_email(db, email=current_user.email)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
-    # Check if already registered
-    existing_registration = await registration.get_by_event_and_user(
-        db=db, event_id=event_id, user_id=db_user.id
-    )
-    if existing_registration:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Already registered for this event",
-        )
-    
-    # Create registration
-    registration_in = RegistrationCreate(event_id=event_id)
-    new_registration = await registration.create_with_user(
-        db=db, obj_in=registration_in, user_id=db_user.id
-    )
-    
-    # Generate QR code in background
-    background_tasks.add_task(
-        _generate_registration_qrcode,
-        registration_id=new_registration.id,
-        event_id=event_id,
-        user_id=db_user.id,
+    # Claim a seat and create the registration and its QR code job atomically
+    new_registration = await registration.register(
+        db=db, event_id=event_id, user_id=current_user.id
     )
+    await response_cache.invalidate_item(EVENTS, event_id)
     
     return new_registration
 
@@ -97,55 +60,112 @@ async def register_for_event(
 async def read_user_registrations(
     skip: int = 0,
     limit: int = 100,
-    current_user: TokenPayload = Depends(get_current_active_user),
+    shape: Shape = Depends(_registration_fields),
+    current_user: CurrentUser = Depends(get_current_db_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Get current user's registrations.
-    """
-    db_user = await user.get_by_email(db, email=current_user.email)
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
     
-    return await registration.get_by_user(
-        db=db, user_id=db_user.id, skip=skip, limit=limit
+    fields= and expand= narrow the response; by default each registration
+    embeds its event and user.
+    """
+    db_registrations = await registration.get_by_user(
+        db=db,
+        user_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        options=load_options(RegistrationModel, shape),
+    )
+    return Response(
+        content=dump_trusted(List[RegistrationWithDetails], db_registrations, shape=shape),
+        media_type="application/json",
     )
 
 
 @router.get("/{id}", response_model=RegistrationWithDetails)
 async def read_registration(
     id: UUID = Path(...),
-    current_user: TokenPayload = Depends(get_current_active_user),
+    shape: Shape = Depends(_registration_fields),
+    current_user: CurrentUser = Depends(get_current_db_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Get registration by ID.
+    
+    fields= and expand= narrow the response; by default it embeds the
+    event and the user.
     """
-    db_user = await user.get_by_email(db, email=current_user.email)
-    if not db_user:
+    db_registration = await registration.get_with_details(
+        # user_id is read for the permission check
+        db=db, id=id, options=load_options(RegistrationModel, shape, RegistrationModel.user_id)
+    )
+    if not db_registration:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
+            detail="Registration not found",
         )
     
-    db_registration = await registration.get_with_details(db=db, id=id)
+    # Check if user is authorized to view this registration
+    if db_registration.user_id != current_user.id and "host" not in current_user.cognito_groups:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    
+    return Response(
+        content=dump_trusted(RegistrationWithDetails, db_registration, shape=shape),
+        media_type="application/json",
+    )
+
+
+@router.get("/{id}/qr", response_class=RedirectResponse)
+async def read_registration_qrcode(
+    id: UUID = Path(...),
+    current_user: CurrentUser = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Get a registration's QR code image, rendering it on first request.
+    
+    Redirects to a short-lived download URL for the stored PNG. Only
+    confirmed registrations have a ticket; others get 409.
+    """
+    db_registration = await registration.get(db=db, id=id)
     if not db_registration:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Registration not found",
         )
     
-    # Check if user is authorized to view this registration
-    if db_registration.user_id != db_user.id and "host" not in current_user.cognito_groups:
+    if db_registration.user_id != current_user.id and "host" not in current_user.cognito_groups:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions",
         )
     
-    return db_registration
+    # Waitlisted and cancelled registrations have no seat to admit
+    if db_registration.status != RegistrationStatus.CONFIRMED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Only confirmed registrations have a ticket",
+        )
+    
+    if not db_registration.qr_code_url:
+        # Hand the connection back first: the render takes its own, and a rush
+        # of waiting requests must not hold the whole pool while it runs
+        await db.commit()
+        await ensure_registration_qrcode(id)
+    
+    return RedirectResponse(
+        await generate_presigned_download_url(
+            bucket=BucketName.QRCODES,
+            object_name=qrcode_object_name(id),
+            expiration=settings.QR_DOWNLOAD_URL_EXPIRATION,
+            response_content_type="image/png",
+        ),
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+    )
 
 
 @router.get("/event/{event_id}", response_model=List[RegistrationWithDetails])
@@ -153,11 +173,15 @@ async def read_event_registrations(
     event_id: UUID = Path(...),
     skip: int = 0,
     limit: int = 100,
+    shape: Shape = Depends(_registration_fields),
     current_user: TokenPayload = Depends(get_current_host_user),
     db: AsyncSession = Depends(get_db),
 ) -> Any:
     """
     Get registrations for an event (host only).
+    
+    fields= and expand= narrow the response, e.g. for a door list:
+    fields=status,checkin_start,user.name&expand=user
     """
     # Check if event exists
     db_event = await event.get(db=db, id=event_id)
@@ -167,11 +191,111 @@ async def read_event_registrations(
             detail="Event not found",
         )
     
-    return await registration.get_by_event(
-        db=db, event_id=event_id, skip=skip, limit=limit
+    db_registrations = await registration.get_by_event(
+        db=db,
+        event_id=event_id,
+        skip=skip,
+        limit=limit,
+        options=load_options(RegistrationModel, shape),
+    )
+    return Response(
+        content=dump_trusted(List[RegistrationWithDetails], db_registrations, shape=shape),
+        media_type="application/json",
+    )
+
+
+def _export_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+async def _export_chunks(event_id: UUID, format: ExportFormat) -> AsyncIterator[str]:
+    """Encode an event's registrations as CSV or NDJSON, a batch of rows per chunk."""
+    # The request's session closes before the body is streamed, so use our own
+    async with AsyncSessionLocal() as db:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == ExportFormat.CSV:
+            writer.writerow(EXPORT_COLUMNS)
+        rows = 0
+        async for row in registration.stream_export_rows(
+            db=db, event_id=event_id, batch_size=settings.EXPORT_BATCH_SIZE
+        ):
+            values = [_export_value(value) for value in row]
+            if format == ExportFormat.CSV:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values))))
+                buffer.write("\n")
+            rows += 1
+            if rows % settings.EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+
+@router.get("/event/{event_id}/export")
+async def export_event_registrations(
+    event_id: UUID = Path(...),
+    format: ExportFormat = ExportFormat.CSV,
+    current_user: TokenPayload = Depends(get_current_host_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Stream all of an event's registrations as CSV or NDJSON (host only).
+    """
+    db_event = await event.get(db=db, id=event_id)
+    if not db_event:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Event not found",
+        )
+    
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _export_chunks(event_id, format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="registrations-{event_id}.{format.value}"'
+        },
     )
 
 
+@router.post("/{id}/cancel", response_model=Registration)
+async def cancel_registration(
+    id: UUID = Path(...),
+    current_user: CurrentUser = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Cancel a registration (owner or host).
+    
+    A freed seat goes to the earliest waitlisted registration for the event.
+    """
+    db_registration = await registration.get(db=db, id=id)
+    if not db_registration:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Registration not found",
+        )
+    
+    if db_registration.user_id != current_user.id and "host" not in current_user.cognito_groups:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    
+    await registration.cancel(db=db, db_obj=db_registration)
+    await response_cache.invalidate_item(EVENTS, db_registration.event_id)
+    return db_registration
+
+
 @router.patch("/{id}/update-payment", response_model=Registration)
 async def update_payment_status(
     status: PaymentStatus,
@@ -189,9 +313,11 @@ async def update_payment_status(
             detail="Registration not found",
         )
     
-    return await registration.update_payment_status(
+    db_registration = await registration.update_payment_status(
         db=db, db_obj=db_registration, status=status
     )
+    await response_cache.invalidate_item(EVENTS, db_registration.event_id)
+    return db_registration
 
 
 @router.patch("/{id}/checkin-start", response_model=Registration)
@@ -210,7 +336,9 @@ async def mark_checkin_start(
             detail="Registration not found",
         )
     
-    return await registration.mark_checkin_start(db=db, db_obj=db_registration)
+    db_registration = await registration.mark_checkin_start(db=db, db_obj=db_registration)
+    await response_cache.invalidate_item(EVENTS, db_registration.event_id)
+    return db_registration
 
 
 @router.patch("/{id}/checkin-end", response_model=Registration)
@@ -229,4 +357,6 @@ async def mark_checkin_end(
             detail="Registration not found",
         )
     
-    return await registration.mark_checkin_end(db=db, db_obj=db_registration)
\ No newline at end of file
+    db_registration = await registration.mark_checkin_end(db=db, db_obj=db_registration)
+    await response_cache.invalidate_item(EVENTS, db_registration.event_id)
+    return db_registration
\ No newline at end of file
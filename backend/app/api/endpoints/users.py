@@ -6,11 +6,16 @@ from typing import Any, Dict, List
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_current_db_user
 from app.core.auth import get_current_active_user, TokenPayload
 from app.core.database import get_db
-from app.core.storage import BucketName, upload_file_to_s3
+from app.core.images import AVATAR, replace_image
+from app.core.storage import (
+    BucketName, confirm_upload, create_upload_slot, new_object_key, upload_file_to_s3,
+)
 from app.crud import user
-from app.schemas.user import User, UserUpdate
+from app.schemas.upload import UploadConfirm, UploadSlot, UploadSlotRequest
+from app.schemas.user import CurrentUser, User, UserUpdate
 
 router = APIRouter()
 
@@ -47,7 +52,11 @@ async def update_user_me(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    return await user.update(db=db, db_obj=db_user, obj_in=user_in)
+    update_data = user_in.model_dump(exclude_unset=True)
+    avatar_url = update_data.get("profile_pic_url", db_user.profile_pic_url)
+    if avatar_url != db_user.profile_pic_url:
+        update_data.update(replace_image(db, AVATAR, db_user, avatar_url))
+    return await user.update(db=db, db_obj=db_user, obj_in=update_data)
 
 
 @router.post("/me/avatar", response_model=User)
@@ -74,7 +83,43 @@ async def upload_avatar(
         content_type=avatar.content_type,
     )
     
-    # Update user
+    # Update user; the old avatar is removed from storage once this commits,
+    # and the new one's variants are rendered by the job worker
     return await user.update(
-        db=db, db_obj=db_user, obj_in={"profile_pic_url": avatar_url}
-    )
\ No newline at end of file
+        db=db, db_obj=db_user, obj_in=replace_image(db, AVATAR, db_user, avatar_url)
+    )
+
+
+@router.post("/me/avatar/uploads", response_model=UploadSlot)
+async def create_avatar_upload(
+    slot_in: UploadSlotRequest,
+    current_user: CurrentUser = Depends(get_current_db_user),
+) -> Any:
+    """
+    Get a presigned PUT to upload an avatar directly to storage.
+    """
+    return await create_upload_slot(
+        bucket=BucketName.PROFILEPICS,
+        object_name=new_object_key(f"{current_user.id}/", slot_in.filename),
+        content_type=slot_in.content_type,
+    )
+
+
+@router.post("/me/avatar/uploads/confirm", response_model=User)
+async def confirm_avatar_upload(
+    upload_in: UploadConfirm,
+    current_user: CurrentUser = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """
+    Set the avatar to a finished direct upload.
+    """
+    avatar_url = await confirm_upload(
+        bucket=BucketName.PROFILEPICS,
+        object_name=upload_in.object_key,
+        prefix=f"{current_user.id}/",
+    )
+    db_user = await user.get(db, id=current_user.id)
+    return await user.update(
+        db=db, db_obj=db_user, obj_in=replace_image(db, AVATAR, db_user, avatar_url)
+    )
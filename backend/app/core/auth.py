@@ -1,10 +1,13 @@
 """
 Authentication utilities for AWS Cognito.
 """
+import asyncio
 import base64
+import hashlib
 import json
+import logging
 import time
-from typing import Dict, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 import httpx
 import jwt
@@ -15,6 +18,10 @@ from jwt.algorithms import RSAAlgorithm
 from pydantic import BaseModel
 
 from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.metrics import COGNITO_LATENCY, TOKEN_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
 
 # Define security scheme for OAuth2 with Cognito
 # Make oauth2 optional (auto_error=False) so we can fall back to dev auth via headers
@@ -29,22 +36,132 @@ oauth2_scheme = OAuth2AuthorizationCodeBearer(
     auto_error=False,
 )
 
-# Cache for JWT public keys
-jwk_keys: Dict = {}
 
+class JWKSKeyStore:
+    """
+    Cache of the Cognito signing keys, parsed once and looked up by kid.
+    
+    Keys are refreshed when older than the TTL or when a token names an
+    unknown kid (e.g. after a key rotation). Concurrent refreshes collapse
+    into a single fetch, and kid-miss refreshes are throttled so that tokens
+    with made-up kids cannot hammer the JWKS endpoint.
+    """
 
-async def get_cognito_jwk():
-    """Get the JSON Web Key (JWK) for validating Cognito tokens."""
-    global jwk_keys
-    if not jwk_keys:
-        async with httpx.AsyncClient() as client:
-            keys_url = (
-                f"https://cognito-idp.{settings.AWS_REGION}.amazonaws.com/"
-                f"{settings.COGNITO_USER_POOL_ID}/.well-known/jwks.json"
+    def __init__(
+        self,
+        url: str,
+        *,
+        ttl: float,
+        min_refresh_interval: float,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Initialize the key store.
+        
+        Args:
+            url: JWKS URL
+            ttl: Seconds before cached keys are refreshed
+            min_refresh_interval: Minimum seconds between fetches while keys are cached
+            client: HTTP client to fetch with; one is created on first use
+        """
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._client = client
+        self._keys: Dict[str, Any] = {}
+        self._jwks: List[Dict] = []
+        self._fetched_at: Optional[float] = None
+        self._attempted_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def jwks(self) -> List[Dict]:
+        """The raw JSON Web Keys from the last successful fetch."""
+        return self._jwks
+
+    @staticmethod
+    def _since(timestamp: Optional[float]) -> float:
+        if timestamp is None:
+            return float("inf")
+        return time.monotonic() - timestamp
+
+    async def get_key(self, kid: str) -> Optional[Any]:
+        """
+        Get the parsed public key for a key ID.
+        
+        Args:
+            kid: Key ID from the token header
+        
+        Returns:
+            The public key, or None if the JWKS does not contain the kid
+        """
+        key = self._keys.get(kid)
+        if key is not None and self._since(self._fetched_at) < self.ttl:
+            return key
+        await self.refresh()
+        return self._keys.get(kid)
+
+    async def refresh(self) -> None:
+        """
+        Fetch the JWKS, unless another caller already did while we waited.
+        
+        While keys are cached, fetches are at least min_refresh_interval
+        apart and a failed fetch keeps serving the cached keys.
+        """
+        seen = self._attempted_at
+        async with self._lock:
+            if self._attempted_at != seen:
+                return
+            if self._keys and self._since(self._attempted_at) < self.min_refresh_interval:
+                return
+            self._attempted_at = time.monotonic()
+            started = time.perf_counter()
+            try:
+                response = await self._get_client().get(self.url)
+                response.raise_for_status()
+                jwks = response.json()["keys"]
+            except (httpx.HTTPError, KeyError, ValueError):
+                COGNITO_LATENCY.labels(operation="jwks", outcome="error").observe(
+                    time.perf_counter() - started
+                )
+                if not self._keys:
+                    raise
+                logger.warning("JWKS refresh failed; keeping cached keys", exc_info=True)
+                return
+            COGNITO_LATENCY.labels(operation="jwks", outcome="ok").observe(
+                time.perf_counter() - started
             )
-            response = await client.get(keys_url)
-            jwk_keys = response.json()["keys"]
-    return jwk_keys
+            self._keys = {key["kid"]: RSAAlgorithm.from_jwk(json.dumps(key)) for key in jwks}
+            self._jwks = jwks
+            self._fetched_at = time.monotonic()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=5.0)
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+jwks_store = JWKSKeyStore(
+    url=(
+        f"https://cognito-idp.{settings.AWS_REGION}.amazonaws.com/"
+        f"{settings.COGNITO_USER_POOL_ID}/.well-known/jwks.json"
+    ),
+    ttl=settings.COGNITO_JWKS_TTL_SECONDS,
+    min_refresh_interval=settings.COGNITO_JWKS_MIN_REFRESH_SECONDS,
+)
+
+
+async def get_cognito_jwk():
+    """Get the JSON Web Keys (JWK) for validating Cognito tokens."""
+    if not jwks_store.jwks:
+        await jwks_store.refresh()
+    return jwks_store.jwks
 
 
 class TokenPayload(BaseModel):
@@ -59,30 +176,81 @@ class TokenPayload(BaseModel):
     cognito_groups: Optional[list] = None
 
 
+class TokenCache(TTLCache):
+    """
+    Bounded LRU cache of verified token payloads.
+    
+    Entries are keyed by a SHA-256 of the token, so raw tokens are not kept
+    in memory, and expire at the token's own exp. Only tokens that passed
+    verification are stored. Lookups are counted in token_cache_requests_total.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of cached tokens
+        """
+        # Every entry is set with its own ttl, from the token's exp
+        super().__init__(maxsize=maxsize, ttl=0)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[TokenPayload]:
+        """
+        Get the cached payload for a token.
+        
+        Args:
+            token: Raw JWT
+        
+        Returns:
+            The payload, or None if the token is not cached or has expired
+        """
+        payload = super().get(self._key(token))
+        TOKEN_CACHE_REQUESTS.labels(result="miss" if payload is None else "hit").inc()
+        return payload
+
+    def set(self, token: str, payload: TokenPayload) -> None:
+        """
+        Cache the payload of a verified token until it expires.
+        
+        Args:
+            token: Raw JWT
+            payload: Verified payload
+        """
+        super().set(self._key(token), payload, ttl=payload.exp - time.time())
+
+
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE)
+
+
 async def decode_token(token: str) -> TokenPayload:
     """Decode and verify the JWT token."""
-    # Get the header from token
-    header = json.loads(
-        base64.b64decode(token.split(".")[0] + "==").decode("utf-8")
-    )
-    
-    # Get the kid (key ID)
-    kid = header["kid"]
-    
-    # Get JWKs
-    keys = await get_cognito_jwk()
+    # Get the kid (key ID) from the token header. Only the header segment is
+    # decoded here; jwt.get_unverified_header would decode the whole token.
+    try:
+        header_segment = token.split(".", 1)[0]
+        header = json.loads(
+            base64.urlsafe_b64decode(header_segment + "=" * (-len(header_segment) % 4))
+        )
+        kid = header["kid"]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
     
-    # Find the key matching kid
-    key = next((k for k in keys if k["kid"] == kid), None)
-    if not key:
+    # Find the parsed public key matching kid
+    public_key = await jwks_store.get_key(kid)
+    if public_key is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Key not found",
         )
     
-    # Get public key
-    public_key = RSAAlgorithm.from_jwk(json.dumps(key))
-    
     # Validate token
     try:
         payload = jwt.decode(
@@ -125,9 +293,14 @@ async def get_current_user(token: str = Depends(oauth2_scheme), request: Request
     If DEV_AUTH=true in environment and headers `x-dev-email` (required) are provided, build a
     TokenPayload from headers. This allows local development without Cognito.
     """
-    # If a token is present, decode as usual
+    # If a token is present, decode as usual. The frontend sends the same
+    # token on every call, so verified payloads are cached until they expire.
     if token:
-        return await decode_token(token)
+        token_data = token_cache.get(token)
+        if token_data is None:
+            token_data = await decode_token(token)
+            token_cache.set(token, token_data)
+        return token_data
 
     # Dev auth fallback
     if os.getenv("DEV_AUTH", "false").lower() == "true" and request is not None:
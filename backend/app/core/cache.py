@@ -0,0 +1,124 @@
+"""
+In-process caches.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire a number of seconds after being set.
+    
+    The cache is per worker process, so callers that change the underlying
+    data must invalidate the keys they touch; other workers pick the change
+    up once their entries expire.
+    """
+    
+    def __init__(self, *, maxsize: int, ttl: float):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Seconds an entry stays valid, unless set() is given its own
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            The value, or None if it is missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+    
+    def set(self, key: Hashable, value: Any, *, ttl: Optional[float] = None) -> None:
+        """
+        Cache a value, evicting the least recently used entry when full.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Seconds this entry stays valid; defaults to the cache's ttl
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def delete(self, *keys: Hashable) -> None:
+        """Drop the given keys if cached."""
+        for key in keys:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one.
+    
+    The first caller for a key starts the work; callers arriving while it
+    runs await the same result. The work is shielded, so a caller that goes
+    away does not cancel it for the others.
+    """
+    
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn for key unless a call for key is already in flight.
+        
+        Args:
+            key: Key identifying the work
+            fn: Coroutine function doing the work
+        
+        Returns:
+            The result of the in-flight call
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(future)
+    
+    def in_flight(self) -> int:
+        """Number of keys with a call in flight."""
+        return len(self._calls)
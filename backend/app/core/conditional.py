@@ -0,0 +1,95 @@
+"""
+Conditional GET for the public read endpoints.
+
+A page's version is taken from max(updated_at) and the row count of the
+rows it shows from each table, in one query that loads no rows. A list
+page also hashes the ID and updated_at of the rows on it, so only writes
+to those rows and the rows they embed, or rows entering or leaving the
+page, change its version.
+The version becomes a weak ETag and a Last-Modified date; a request whose
+If-None-Match holds the current ETag gets a bodyless 304.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+# (model, *where criteria): the rows of a table a page is built from
+VersionSource = Tuple[Any, ...]
+
+
+class ResourceVersion(NamedTuple):
+    """Version of the data behind a page."""
+    etag: str
+    last_modified: Optional[datetime]
+
+
+async def resource_version(
+    db: AsyncSession, *sources: VersionSource, page: Optional[Select] = None
+) -> ResourceVersion:
+    """
+    Compute the version of the rows a page is built from.
+    
+    The count catches deletes, which leave max(updated_at) unchanged.
+    
+    Args:
+        db: Database session
+        sources: (model, *criteria) tuples, e.g. (Registration, Registration.event_id == id)
+        page: For a list page, a select of the ID and updated_at of each row
+            it shows, in order
+    
+    Returns:
+        The ETag and Last-Modified date
+    """
+    columns = []
+    for model, *criteria in sources:
+        columns.append(select(func.max(model.updated_at)).where(*criteria).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).where(*criteria).scalar_subquery())
+    row = tuple((await db.execute(select(*columns))).one()) if columns else ()
+    stamps = [stamp for stamp in row[0::2] if stamp is not None]
+    if page is not None:
+        rows = (await db.execute(page)).all()
+        row += tuple(tuple(page_row) for page_row in rows)
+        stamps += [updated_at for _, updated_at in rows if updated_at is not None]
+
+    digest = hashlib.sha1(repr(row).encode("utf-8")).hexdigest()[:20]
+    return ResourceVersion(etag=f'W/"{digest}"', last_modified=max(stamps, default=None))
+
+
+def version_headers(version: ResourceVersion) -> Dict[str, str]:
+    """ETag and Last-Modified for a version, and no-cache so browsers revalidate each time."""
+    headers = {"ETag": version.etag, "Cache-Control": "no-cache"}
+    if version.last_modified is not None:
+        last_modified = version.last_modified
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, version: ResourceVersion) -> bool:
+    """
+    Whether the client already holds this version.
+    
+    Only If-None-Match is honoured: a delete does not move Last-Modified
+    forward, so If-Modified-Since could wrongly answer 304 after one.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" match
+    current = version.etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+
+def not_modified_response(version: ResourceVersion) -> Response:
+    """A bodyless 304 carrying the current validators."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=version_headers(version))
+
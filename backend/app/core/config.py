@@ -54,6 +54,34 @@ class Settings(BaseSettings):
             # Use SQLite as fallback
             return "sqlite+aiosqlite:///./test.db"
 
+    # Read replicas for read-only endpoints; empty sends every read to DATABASE_URI
+    DATABASE_REPLICA_URIS: List[str] = []
+    # After a write, the client reads from the primary for this long
+    READ_YOUR_WRITES_SECONDS: int = 5
+
+    @field_validator("DATABASE_REPLICA_URIS", mode="before")
+    def assemble_replica_uris(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
+        if isinstance(v, str) and not v.startswith("["):
+            return [i.strip() for i in v.split(",") if i.strip()]
+        elif isinstance(v, (list, str)):
+            return v
+        raise ValueError(v)
+
+    # Connection pool (ignored for SQLite, which keeps the dialect's default pool)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 30 * 60
+    
+    # SQL logging
+    DB_ECHO: bool = False
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_SLOW_QUERY_SAMPLE_RATE: float = 1.0
+    # Per-request query stats: X-DB-Queries header (dev) and N+1 warnings
+    DB_QUERY_STATS_HEADER: bool = False
+    DB_REPEATED_QUERY_THRESHOLD: int = 5
+
     # AWS
     AWS_REGION: str = "us-east-1"
     AWS_ACCESS_KEY_ID: Optional[str] = "test_access_key"
@@ -63,11 +91,51 @@ class Settings(BaseSettings):
     S3_BUCKET_GALLERY: str = "test-gallery"
     S3_BUCKET_QRCODES: str = "test-qrcodes"
     S3_BUCKET_PROFILEPICS: str = "test-profilepics"
+    S3_ENDPOINT_URL: Optional[str] = None
+    S3_MAX_WORKERS: int = 10
+    S3_UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
+    MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024
+    S3_UPLOAD_URL_EXPIRATION: int = 15 * 60
+    
+    # Response cache for public GETs; a TTL of 0 disables it
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_STALE_SECONDS: int = 5 * 60
+    RESPONSE_CACHE_MAX_SIZE: int = 1000
+    
+    # Exports
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # QR codes
+    QR_RENDER_WORKERS: int = 2
+    QR_RENDER_MAX_PENDING: int = 64
+    QR_SIGNING_KEY: Optional[str] = None
+    QR_DOWNLOAD_URL_EXPIRATION: int = 5 * 60
+    
+    # Image variants, rendered by the job worker; sizes are the longest edge in pixels
+    IMAGE_VARIANT_SIZES: Dict[str, int] = {"thumb": 320, "medium": 1024, "large": 2048}
+    IMAGE_RENDER_WORKERS: int = 2
+    IMAGE_RENDER_MAX_PENDING: int = 4
+    IMAGE_MAX_PIXELS: int = 50_000_000
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_JPEG_QUALITY: int = 82
+    
+    # Job queue worker (python -m app.worker)
+    JOB_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: int = 5 * 60
+    JOB_MAX_ATTEMPTS: int = 8
+    JOB_RETRY_BASE_SECONDS: float = 5.0
+    JOB_RETRY_MAX_SECONDS: float = 60 * 60
     
     # Cognito
     COGNITO_USER_POOL_ID: str = "us-east-1_test"
     COGNITO_CLIENT_ID: str = "test_client_id"
     COGNITO_DOMAIN: str = "test-domain.auth.us-east-1.amazoncognito.com"
+    COGNITO_JWKS_TTL_SECONDS: int = 60 * 60
+    COGNITO_JWKS_MIN_REFRESH_SECONDS: int = 30
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
     
     # LocalStack
     LOCALSTACK_DOCKER_NAME: Optional[str] = None
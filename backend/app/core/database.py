@@ -1,25 +1,192 @@
 """
 Database session management and SQLAlchemy setup
 """
+import itertools
+import logging
 import os
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List
+
+from fastapi import Request
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT, DB_POOL_CONNECTIONS
+from app.core.query_stats import install_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Counters for connection checkouts and the time spent waiting for them."""
+
+    def __init__(self):
+        """Initialize with zeroed counters."""
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float, *, timed_out: bool = False) -> None:
+        """Record one checkout and how long it waited for a connection."""
+        DB_POOL_CHECKOUT_WAIT.labels(outcome="timeout" if timed_out else "ok").observe(seconds)
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waits for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _engine_options(uri: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if not uri.startswith("sqlite"):
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return options
+
+
+def install_slow_query_log(sync_engine: Engine, *, threshold_ms: float, sample_rate: float) -> None:
+    """
+    Log statements slower than threshold_ms, sampling sample_rate of them.
+    
+    Args:
+        sync_engine: Engine to instrument
+        threshold_ms: Minimum duration worth logging
+        sample_rate: Fraction (0-1) of slow statements that are logged
+    """
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _log_if_slow(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_started"].pop()) * 1000
+        if elapsed_ms >= threshold_ms and random.random() < sample_rate:
+            logger.warning("Slow query (%.1f ms): %s", elapsed_ms, statement[:1000])
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _discard_timer(context):
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+
+def publish_pool_gauges() -> None:
+    """Set the pool connection gauges from this worker's pool."""
+    stats = pool_stats()
+    if "checked_out" in stats:
+        DB_POOL_CONNECTIONS.labels(state="checked_out").set(stats["checked_out"])
+        DB_POOL_CONNECTIONS.labels(state="idle").set(stats["idle"])
+        DB_POOL_CONNECTIONS.labels(state="overflow").set(stats["overflow"])
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Current pool occupancy and checkout wait times.
+    
+    Utilisation is checked-out connections over the most the pool will open
+    (pool_size + max_overflow); sustained values near 1 with growing waits
+    mean the pool is too small for the worker's concurrency.
+    """
+    pool = engine.sync_engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        return stats
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    stats.update(
+        size=pool.size(),
+        max_overflow=pool._max_overflow,
+        checked_out=pool.checkedout(),
+        idle=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        utilisation=pool.checkedout() / capacity if capacity else 0.0,
+        checkouts=metrics.checkouts,
+        timeouts=metrics.timeouts,
+        wait_seconds_total=metrics.wait_seconds_total,
+        wait_seconds_max=metrics.wait_seconds_max,
+        wait_seconds_mean=(
+            metrics.wait_seconds_total / metrics.checkouts if metrics.checkouts else 0.0
+        ),
+    )
+    return stats
+
 
 # Determine which database URI to use
 database_uri = os.getenv("DATABASE_URI", str(settings.DATABASE_URI))
 
+
+
+def _create_engine(uri: str) -> AsyncEngine:
+    engine = create_async_engine(uri, **_engine_options(uri))
+    install_slow_query_log(
+        engine.sync_engine,
+        threshold_ms=settings.DB_SLOW_QUERY_MS,
+        sample_rate=settings.DB_SLOW_QUERY_SAMPLE_RATE,
+    )
+    install_query_stats(engine.sync_engine)
+    return engine
+
+
+def _session_factory(engine: AsyncEngine) -> sessionmaker:
+    return sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
 # Create async engine
-engine = create_async_engine(database_uri, echo=True)
+engine = _create_engine(database_uri)
 
 # Create async session factory
-AsyncSessionLocal = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-)
+AsyncSessionLocal = _session_factory(engine)
+
+# Read replicas, used round-robin by get_read_db
+replica_engines: List[AsyncEngine] = [_create_engine(uri) for uri in settings.DATABASE_REPLICA_URIS]
+_replica_sessions = itertools.cycle([_session_factory(replica) for replica in replica_engines])
+
+# Set on responses to writes; while present, reads go to the primary
+READ_PRIMARY_COOKIE = "read_primary"
 
 # Base class for SQLAlchemy models
 Base = declarative_base()
@@ -33,4 +200,49 @@ async def get_db():
             await session.commit()
         except Exception:
             await session.rollback()
-            raise
\ No newline at end of file
+            raise
+
+
+async def _open_read_session(*, use_replicas: bool = True) -> AsyncSession:
+    if use_replicas:
+        for _ in replica_engines:
+            session = next(_replica_sessions)()
+            try:
+                await session.connection()
+                return session
+            except (exc.DBAPIError, OSError):
+                logger.warning("Read replica unavailable, trying the next one", exc_info=True)
+                await session.close()
+    return AsyncSessionLocal()
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """Open a read-only session on the next reachable replica, else the primary."""
+    session = await _open_read_session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Yield a session for a read-only handler.
+    
+    Uses the next read replica, or the primary when no replica is
+    configured or reachable, or when the client wrote within the last
+    READ_YOUR_WRITES_SECONDS (so it sees its own changes despite
+    replication lag). Nothing is committed.
+    """
+    session = await _open_read_session(use_replicas=READ_PRIMARY_COOKIE not in request.cookies)
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def dispose_engines() -> None:
+    """Close the primary's and the replicas' connection pools."""
+    for db_engine in [engine, *replica_engines]:
+        await db_engine.dispose()
@@ -0,0 +1,185 @@
+"""
+Sparse fieldsets for the read endpoints.
+
+fields= names the columns to return, e.g. fields=title,date_time or, for an
+expanded relationship, fields=created_by.name. expand= names the
+relationships to embed, e.g. expand=created_by,registrations; each endpoint
+has a default that matches its full response schema. The id of every
+object is always returned.
+
+The selection becomes a Shape: a dict from field name to None for a column,
+or to the nested Shape of an expanded relationship. load_options turns it
+into SQLAlchemy loader options, so unselected columns are not read and
+unexpanded relationships are not queried, and dump_trusted serializes
+only the fields in it.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, Type
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import Column, inspect
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from app.core.serialization import field_plan
+
+# Field name -> None for a column, or the Shape of an expanded relationship
+Shape = Dict[str, Optional["Shape"]]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    if value is None:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _bad_request(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+class FieldSelector:
+    """
+    Parses fields= and expand= against a response schema.
+    
+    An instance is a FastAPI dependency returning the requested Shape:
+    
+        shape: Shape = Depends(FieldSelector(EventWithRelations))
+    """
+
+    def __init__(self, schema: Type[BaseModel], *, default_expand: Optional[Iterable[str]] = None):
+        """
+        Initialize the selector.
+        
+        Args:
+            schema: The endpoint's full response schema
+            default_expand: Relationships embedded when expand= is not given;
+                defaults to every relationship in the schema
+        """
+        self.schema = schema
+        if default_expand is None:
+            default_expand = self._relationship_paths(schema)
+        self.default_expand = tuple(default_expand)
+
+    def __call__(
+        self,
+        fields: Optional[str] = Query(
+            None, description="Comma-separated fields to return, e.g. title,created_by.name"
+        ),
+        expand: Optional[str] = Query(
+            None, description="Comma-separated relationships to embed; empty for none"
+        ),
+    ) -> Shape:
+        return self.shape(fields, expand)
+
+    def shape(
+        self,
+        fields: Optional[str],
+        expand: Optional[str],
+        *,
+        default_expand: Optional[Iterable[str]] = None,
+    ) -> Shape:
+        """
+        Build the Shape for a request.
+        
+        Args:
+            fields: The fields= parameter; None selects every column
+            expand: The expand= parameter; None embeds the default relationships
+            default_expand: Overrides the selector's default for this request
+        
+        Returns:
+            The Shape to load and serialize
+        
+        Raises:
+            HTTPException: If a field or relationship is not in the schema
+        """
+        if expand is None:
+            expand_paths = list(self.default_expand if default_expand is None else default_expand)
+        else:
+            expand_paths = _split(expand)
+
+        expanded: Set[str] = set()
+        for path in expand_paths:
+            schema = self.schema
+            parts = path.split(".")
+            for depth, name in enumerate(parts):
+                nested = self._relationships(schema).get(name)
+                if nested is None:
+                    raise _bad_request(f"Cannot expand {path}")
+                schema = nested
+                # Expanding a.b also expands a
+                expanded.add(".".join(parts[: depth + 1]))
+
+        selected: Dict[str, Set[str]] = {}
+        for path in _split(fields):
+            parent, _, name = path.rpartition(".")
+            if parent and parent not in expanded:
+                raise _bad_request(f"Expand {parent} to select {path}")
+            schema = self.schema
+            for part in parent.split(".") if parent else ():
+                schema = self._relationships(schema)[part]
+            if name in self._relationships(schema):
+                raise _bad_request(f"{path} is a relationship; use expand={path}")
+            if name not in schema.model_fields:
+                raise _bad_request(f"Unknown field {path}")
+            selected.setdefault(parent, set()).add(name)
+
+        return self._build(self.schema, "", selected, expanded)
+
+    @classmethod
+    def _build(
+        cls, schema: Type[BaseModel], path: str, selected: Dict[str, Set[str]], expanded: Set[str]
+    ) -> Shape:
+        picked = selected.get(path)
+        shape: Shape = {}
+        for name, nested, _, _ in field_plan(schema):
+            child = f"{path}.{name}" if path else name
+            if nested is None:
+                if picked is None or name in picked or name == "id":
+                    shape[name] = None
+            elif child in expanded:
+                shape[name] = cls._build(nested, child, selected, expanded)
+        return shape
+
+    @staticmethod
+    def _relationships(schema: Type[BaseModel]) -> Dict[str, Type[BaseModel]]:
+        return {name: nested for name, nested, _, _ in field_plan(schema) if nested is not None}
+
+    @classmethod
+    def _relationship_paths(cls, schema: Type[BaseModel], prefix: str = "") -> List[str]:
+        paths = []
+        for name, nested in cls._relationships(schema).items():
+            paths.append(prefix + name)
+            paths.extend(cls._relationship_paths(nested, f"{prefix}{name}."))
+        return paths
+
+
+def load_options(model: Any, shape: Shape, *always: Any) -> List[Any]:
+    """
+    Loader options that read exactly the columns and relationships in a Shape.
+    
+    Collections are loaded with selectinload, so the parent rows are not
+    repeated per child; single objects are joined in.
+    
+    Args:
+        model: ORM model the query selects
+        shape: The requested Shape
+        always: Further columns of the model to load, e.g. for pagination
+    
+    Returns:
+        Options to pass to Select.options()
+    """
+    mapper = inspect(model)
+    # Only real columns: query_expression() attributes are set with with_expression
+    columns = [
+        getattr(model, name)
+        for name, nested in shape.items()
+        if nested is None and isinstance(mapper.columns.get(name), Column)
+    ]
+    options: List[Any] = [load_only(*columns, *always)] if columns or always else []
+    for name, nested in shape.items():
+        if nested is None:
+            continue
+        attribute = getattr(model, name)
+        relationship = attribute.property
+        loader = selectinload(attribute) if relationship.uselist else joinedload(attribute)
+        options.append(loader.options(*load_options(relationship.mapper.class_, nested)))
+    return options
@@ -0,0 +1,348 @@
+"""
+Resized variants of uploaded images.
+
+Gallery images, event covers and avatars are stored as uploaded, which is
+often a full-size camera photo. Each upload queues a RENDER_IMAGE_VARIANTS
+job that renders a variant per IMAGE_VARIANT_SIZES entry, as WebP and as
+JPEG. The job runs on a process pool in the job worker, stores the variants
+under variants/<original key>/ and records their URLs on the row.
+Variants are rotated upright, and their EXIF metadata (camera details, GPS
+position) is dropped. Until the job has run the variants column is null,
+and clients use the original.
+"""
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from PIL import Image, ImageOps
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.jobs import RENDER_IMAGE_VARIANTS, SessionFactory, enqueue_job, job_handler
+from app.core.storage import BucketName, delete_object_later, storage
+from app.models import Event, Gallery, User
+
+logger = logging.getLogger(__name__)
+
+# Format -> content type, for every variant size
+VARIANT_FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+class InvalidImage(ValueError):
+    """Raised when an upload cannot be decoded as an image, or is too large to."""
+
+
+class ImageTarget(NamedTuple):
+    """
+    A column holding an uploaded image, and the column recording its variants.
+
+    owner_prefix gives the key prefix a row's own uploads are stored under.
+    The image column can be set to any URL, so only keys under it are ever
+    deleted on the row's behalf.
+    """
+    name: str
+    model: Any
+    url_column: str
+    variants_column: str
+    bucket: BucketName
+    owner_prefix: Callable[[Any], str]
+
+
+GALLERY_IMAGE = ImageTarget(
+    "gallery", Gallery, "image_url", "image_variants", BucketName.GALLERY,
+    lambda row: f"gallery/{row.uploaded_by_id}/",
+)
+EVENT_COVER = ImageTarget(
+    "event_cover", Event, "cover_image_url", "cover_image_variants", BucketName.GALLERY,
+    lambda row: f"events/{row.id}/",
+)
+AVATAR = ImageTarget(
+    "avatar", User, "profile_pic_url", "profile_pic_variants", BucketName.PROFILEPICS,
+    lambda row: f"{row.id}/",
+)
+
+_targets = {target.name: target for target in (GALLERY_IMAGE, EVENT_COVER, AVATAR)}
+
+
+def _encode(image: Image.Image, format: str, **params: Any) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+
+def render_image_variants(
+    data: bytes,
+    sizes: Dict[str, int],
+    *,
+    max_pixels: int,
+    webp_quality: int,
+    jpeg_quality: int,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Render resized WebP and JPEG copies of an image.
+
+    Runs in the render pool's worker processes, so it must stay a
+    module-level function. Images are never scaled up, and no EXIF metadata
+    is written.
+
+    Args:
+        data: The uploaded image
+        sizes: Size name -> longest edge in pixels
+        max_pixels: Largest image, in pixels, that is decoded
+        webp_quality: WebP quality, 1-100
+        jpeg_quality: JPEG quality, 1-100
+
+    Returns:
+        Size name -> width, height, and the encoded webp and jpeg bytes
+
+    Raises:
+        InvalidImage: If data is not an image, or has more than max_pixels
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            # Only the header has been read so far
+            if original.width * original.height > max_pixels:
+                raise InvalidImage(f"Image has more than {max_pixels} pixels")
+            # JPEGs are downscaled while decoding, which is much faster
+            largest = max(sizes.values())
+            original.draft("RGB", (largest, largest))
+            # Apply the EXIF orientation, since the variants carry no EXIF
+            image = ImageOps.exif_transpose(original)
+            icc_profile = original.info.get("icc_profile")
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+    except (OSError, SyntaxError, Image.DecompressionBombError) as e:
+        raise InvalidImage(str(e)) from e
+
+    variants = {}
+    # Largest first, each resized from the one before
+    for name, edge in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        image = image.copy()
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        flat = image
+        if has_alpha:
+            # JPEG has no alpha channel; show transparent areas as white
+            flat = Image.new("RGB", image.size, "white")
+            flat.paste(image, mask=image.getchannel("A"))
+        variants[name] = {
+            "width": image.width,
+            "height": image.height,
+            "webp": _encode(image, "WEBP", quality=webp_quality, icc_profile=icc_profile),
+            "jpeg": _encode(
+                flat, "JPEG", quality=jpeg_quality, optimize=True, progressive=True,
+                icc_profile=icc_profile,
+            ),
+        }
+    return variants
+
+
+class ImageRenderer:
+    """
+    Renders image variants on a process pool.
+
+    Decoding and resizing a camera photo takes a CPU for a good fraction of
+    a second, so it runs in separate processes instead of on the event
+    loop. At most max_pending images are queued on the pool, which also
+    bounds the memory held by images waiting their turn.
+    """
+
+    def __init__(self, *, max_workers: int, max_pending: int):
+        """
+        Initialize the renderer.
+
+        Args:
+            max_workers: Number of render processes
+            max_pending: Maximum number of images submitted to the pool at once
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def render(self, data: bytes) -> Dict[str, Dict[str, Any]]:
+        """
+        Render the variants of an image with the configured sizes and quality.
+
+        Args:
+            data: The uploaded image
+
+        Returns:
+            See render_image_variants
+
+        Raises:
+            InvalidImage: If data is not an image, or is too large
+        """
+        async with self._get_slots():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(),
+                partial(
+                    render_image_variants,
+                    data,
+                    settings.IMAGE_VARIANT_SIZES,
+                    max_pixels=settings.IMAGE_MAX_PIXELS,
+                    webp_quality=settings.IMAGE_WEBP_QUALITY,
+                    jpeg_quality=settings.IMAGE_JPEG_QUALITY,
+                ),
+            )
+
+    def close(self) -> None:
+        """Shut down the render processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._slots = None
+
+
+image_renderer = ImageRenderer(
+    max_workers=settings.IMAGE_RENDER_WORKERS, max_pending=settings.IMAGE_RENDER_MAX_PENDING
+)
+
+
+def variant_key(key: str, name: str, format: str) -> str:
+    """Object key of one variant of the object stored under key."""
+    return f"variants/{key}/{name}.{format}"
+
+
+def queue_image_variants(db: AsyncSession, target: ImageTarget, row: Any, url: Optional[str]) -> None:
+    """
+    Queue rendering the variants of a row's image.
+
+    The job is added to the session, so it runs once the caller commits.
+    Only images under the row's owner prefix get variants: rendering one the
+    row merely points to would write under someone else's key.
+
+    Args:
+        db: Database session
+        target: Which image of the row
+        row: The row
+        url: The image's URL, as stored on the row
+    """
+    key = storage.object_key(target.bucket, url) if url else None
+    if key is not None and key.startswith(target.owner_prefix(row)):
+        enqueue_job(db, RENDER_IMAGE_VARIANTS, {"target": target.name, "id": str(row.id), "url": url})
+
+
+def delete_image_later(
+    db: AsyncSession, target: ImageTarget, row: Any, *, keep: Optional[str] = None
+) -> None:
+    """
+    Queue the deletion of a row's image and its variants once the session commits.
+
+    Only objects under the row's owner prefix are deleted, so a row pointed
+    at someone else's image never removes it.
+
+    Args:
+        db: Database session
+        target: Which image of the row
+        row: The row, still pointing at the image
+        keep: The URL that replaces it; a re-upload to the same key keeps
+            the image, and its variants are rendered again in place
+    """
+    url = getattr(row, target.url_column)
+    if url is None or url == keep:
+        return
+    prefix = target.owner_prefix(row)
+    delete_object_later(db, target.bucket, url, prefix=prefix)
+    for variant in (getattr(row, target.variants_column) or {}).values():
+        for format in VARIANT_FORMATS:
+            delete_object_later(
+                db, target.bucket, variant.get(format), prefix=f"variants/{prefix}"
+            )
+
+
+def replace_image(db: AsyncSession, target: ImageTarget, row: Any, url: Optional[str]) -> Dict[str, Any]:
+    """
+    Queue the storage work for pointing an existing row at a new image.
+
+    The old image and its variants are deleted, and the new image's
+    variants rendered, once the caller commits. Both only happen for
+    images under the row's owner prefix, since clients can set the column
+    to any URL.
+
+    Args:
+        db: Database session
+        target: Which image of the row
+        row: The row, still pointing at its old image
+        url: The new image's URL
+
+    Returns:
+        The column values to set on the row
+    """
+    delete_image_later(db, target, row, keep=url)
+    queue_image_variants(db, target, row, url)
+    return {target.url_column: url, target.variants_column: None}
+
+
+async def _is_current(session_factory: SessionFactory, target: ImageTarget, id: UUID, url: str) -> bool:
+    async with session_factory() as db:
+        current = await db.scalar(
+            select(getattr(target.model, target.url_column)).where(target.model.id == id)
+        )
+    return current == url
+
+
+@job_handler(RENDER_IMAGE_VARIANTS)
+async def _render_image_variants_job(payload: Dict[str, Any], session_factory: SessionFactory) -> None:
+    target = _targets[payload["target"]]
+    id, url = UUID(payload["id"]), payload["url"]
+    key = storage.object_key(target.bucket, url)
+    # A row that has moved on to another image, or is gone, is a no-op
+    if key is None or not await _is_current(session_factory, target, id, url):
+        return
+    data = await storage.download(target.bucket, key)
+    if data is None:
+        return
+    try:
+        rendered = await image_renderer.render(data)
+    except InvalidImage:
+        # Retrying would not help; clients keep using the original
+        logger.warning("Not rendering variants of %s", url, exc_info=True)
+        return
+
+    uploads: List[Tuple[str, str, bytes]] = [
+        (name, format, variant[format])
+        for name, variant in rendered.items()
+        for format in VARIANT_FORMATS
+    ]
+    urls = await asyncio.gather(*(
+        storage.upload(
+            target.bucket, variant_key(key, name, format), body, VARIANT_FORMATS[format]
+        )
+        for name, format, body in uploads
+    ))
+    variants: Dict[str, Dict[str, Any]] = {
+        name: {"width": variant["width"], "height": variant["height"]}
+        for name, variant in rendered.items()
+    }
+    for (name, format, _), variant_url in zip(uploads, urls):
+        variants[name][format] = variant_url
+
+    async with session_factory() as db:
+        model = target.model
+        result = await db.execute(
+            update(model)
+            .where(model.id == id, getattr(model, target.url_column) == url)
+            .values({target.variants_column: variants})
+        )
+        if result.rowcount == 0:
+            # Replaced or deleted while rendering
+            for variant in variants.values():
+                for format in VARIANT_FORMATS:
+                    delete_object_later(db, target.bucket, variant[format])
+        await db.commit()
@@ -0,0 +1,316 @@
+"""
+Durable background jobs.
+
+Work that has to survive a restart is written to the jobs table and run by
+python -m app.worker. Workers claim due jobs with SELECT ... FOR UPDATE
+SKIP LOCKED, so any number of them can poll the table without two taking
+the same job. A claimed job is leased for JOB_LEASE_SECONDS; if its worker
+dies, another claims it once the lease runs out.
+
+A job that raises is retried with exponential backoff until it has made
+max_attempts attempts, then kept as FAILED with its last error. Finished
+jobs are deleted. A job can run twice (after a crash, or a lease that ran
+out mid-run), so handlers must be idempotent.
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Any, AsyncContextManager, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set,
+)
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import (
+    JOB_DURATION, JOB_QUEUE_DELAY, JOBS_IN_FLIGHT, JOBS_PROCESSED, sample_totals,
+)
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Job kinds
+RENDER_QRCODE = "render_qrcode"
+DELETE_OBJECT = "delete_object"
+RENDER_IMAGE_VARIANTS = "render_image_variants"
+
+SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
+JobHandler = Callable[[Dict[str, Any], SessionFactory], Awaitable[None]]
+
+
+class ClaimedJob(NamedTuple):
+    """A job a worker has claimed, detached from the session that claimed it."""
+    id: Any
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register the coroutine that runs jobs of a kind.
+
+    It receives the job's payload and the worker's session factory, which it
+    opens its sessions with, as endpoints get theirs from get_db.
+    """
+    def register(handler: JobHandler) -> JobHandler:
+        _handlers[kind] = handler
+        return handler
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: Dict[str, Any],
+    *,
+    delay: float = 0,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    """
+    Add a job to the session.
+
+    The job is queued when the session commits, so enqueueing in the same
+    transaction as a write means the job exists exactly when the write does.
+
+    Args:
+        db: Database session
+        kind: Job kind, e.g. RENDER_QRCODE
+        payload: JSON-serializable arguments for the handler
+        delay: Seconds before the job is due
+        max_attempts: Attempts before giving up; defaults to JOB_MAX_ATTEMPTS
+
+    Returns:
+        The pending job
+    """
+    job = Job(
+        kind=kind,
+        payload=payload,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_at=_now() + timedelta(seconds=delay),
+    )
+    db.add(job)
+    return job
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Seconds to wait before retrying a job that has failed attempts times.
+
+    Doubles from JOB_RETRY_BASE_SECONDS up to JOB_RETRY_MAX_SECONDS, with
+    jitter so jobs that failed together do not all retry together.
+    """
+    delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def claim_jobs(db: AsyncSession, *, limit: int, lease: float) -> List[ClaimedJob]:
+    """
+    Claim up to limit due jobs for this worker and commit.
+
+    Rows locked by another worker's claim are skipped rather than waited on.
+    A RUNNING job whose lease has expired is claimed again.
+
+    Args:
+        db: Database session
+        limit: Maximum number of jobs to claim
+        lease: Seconds the jobs stay claimed
+
+    Returns:
+        The claimed jobs, attempts already counted
+    """
+    now = _now()
+    query = (
+        select(Job)
+        .where(or_(
+            and_(Job.status == JobStatus.QUEUED, Job.run_at <= now),
+            and_(Job.status == JobStatus.RUNNING, Job.locked_until < now),
+        ))
+        .order_by(Job.run_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    claimed = []
+    for job in (await db.scalars(query)).all():
+        JOB_QUEUE_DELAY.labels(kind=job.kind).observe(max((now - _as_utc(job.run_at)).total_seconds(), 0))
+        job.status = JobStatus.RUNNING
+        job.attempts += 1
+        job.locked_until = now + timedelta(seconds=lease)
+        claimed.append(ClaimedJob(job.id, job.kind, job.payload, job.attempts, job.max_attempts))
+    await db.commit()
+    return claimed
+
+
+def job_stats() -> Dict[str, float]:
+    """
+    Jobs run by outcome, and jobs being run, from the worker metrics.
+
+    Built from jobs_processed_total and jobs_in_flight rather than the jobs
+    table, so it costs no query. It covers the processes whose samples
+    this one can read: itself, or all of them sharing PROMETHEUS_MULTIPROC_DIR.
+
+    Returns:
+        succeeded, retried and failed counts, and in_flight
+    """
+    processed = sample_totals("jobs_processed_total", "outcome")
+    return {
+        **{outcome: processed.get(outcome, 0.0) for outcome in ("succeeded", "retried", "failed")},
+        "in_flight": sum(sample_totals("jobs_in_flight", "kind").values()),
+    }
+
+
+class JobWorker:
+    """
+    Runs queued jobs, at most concurrency at a time.
+
+    Each job's handler runs as its own task and opens its own sessions from
+    the worker's session factory; the worker itself only uses the database
+    to claim jobs and record their outcome.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int,
+        poll_interval: float,
+        lease: float,
+        session_factory: SessionFactory = AsyncSessionLocal,
+    ):
+        """
+        Initialize the worker.
+
+        Args:
+            concurrency: Maximum number of jobs running at once
+            poll_interval: Seconds between polls while the queue is empty
+            lease: Seconds a claimed job stays claimed
+            session_factory: Opens the sessions used to claim and settle jobs,
+                and is passed to handlers for theirs
+        """
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.session_factory = session_factory
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """
+        Claim and run jobs until stop is set, then wait for the running ones.
+
+        Args:
+            stop: Set to shut down
+        """
+        running: Set["asyncio.Task[None]"] = set()
+        while not stop.is_set():
+            free = self.concurrency - len(running)
+            if free > 0:
+                for job in await self._claim(free):
+                    task = asyncio.create_task(self.execute(job))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+            if len(running) >= self.concurrency:
+                # Claim again as soon as a slot frees up
+                await self._wait(stop, running, timeout=None)
+            else:
+                await self._wait(stop, (), timeout=self.poll_interval)
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def run_pending(self) -> int:
+        """
+        Run due jobs until none are left, for one-off runs and tests.
+
+        Returns:
+            Number of jobs run
+        """
+        total = 0
+        while True:
+            jobs = await self._claim(self.concurrency)
+            if not jobs:
+                return total
+            await asyncio.gather(*(self.execute(job) for job in jobs))
+            total += len(jobs)
+
+    async def execute(self, job: ClaimedJob) -> str:
+        """
+        Run a claimed job and record the outcome.
+
+        Args:
+            job: A job returned by claim_jobs
+
+        Returns:
+            succeeded, retried or failed
+        """
+        handler = _handlers.get(job.kind)
+        JOBS_IN_FLIGHT.labels(kind=job.kind).inc()
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                # Retried: a worker from an older release may have claimed it
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            await handler(job.payload, self.session_factory)
+        except Exception as e:
+            logger.warning("Job %s (%s) attempt %d failed", job.id, job.kind, job.attempts, exc_info=True)
+            outcome = await self._settle_failure(job, e)
+        else:
+            outcome = "succeeded"
+            await self._settle(job, delete(Job))
+        finally:
+            JOBS_IN_FLIGHT.labels(kind=job.kind).dec()
+            JOB_DURATION.labels(kind=job.kind).observe(time.perf_counter() - started)
+        JOBS_PROCESSED.labels(kind=job.kind, outcome=outcome).inc()
+        return outcome
+
+    async def _claim(self, limit: int) -> List[ClaimedJob]:
+        try:
+            async with self.session_factory() as db:
+                return await claim_jobs(db, limit=limit, lease=self.lease)
+        except Exception:
+            logger.warning("Claiming jobs failed", exc_info=True)
+            return []
+
+    async def _settle_failure(self, job: ClaimedJob, error: Exception) -> str:
+        values: Dict[str, Any] = {"last_error": f"{type(error).__name__}: {error}", "locked_until": None}
+        if job.attempts >= job.max_attempts:
+            outcome = "failed"
+            values["status"] = JobStatus.FAILED
+        else:
+            outcome = "retried"
+            values["status"] = JobStatus.QUEUED
+            values["run_at"] = _now() + timedelta(seconds=retry_delay(job.attempts))
+        await self._settle(job, update(Job).values(**values))
+        return outcome
+
+    async def _settle(self, job: ClaimedJob, statement: Any) -> None:
+        # Matching attempts leaves a job alone that was reclaimed after its lease ran out
+        statement = statement.where(Job.id == job.id, Job.attempts == job.attempts)
+        try:
+            async with self.session_factory() as db:
+                await db.execute(statement.execution_options(synchronize_session=False))
+                await db.commit()
+        except Exception:
+            # The job is claimed again once its lease runs out
+            logger.warning("Recording the outcome of job %s failed", job.id, exc_info=True)
+
+    @staticmethod
+    async def _wait(stop: asyncio.Event, tasks: Iterable["asyncio.Task[None]"], *, timeout: Optional[float]) -> None:
+        stopping = asyncio.ensure_future(stop.wait())
+        try:
+            await asyncio.wait({stopping, *tasks}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            stopping.cancel()
@@ -0,0 +1,135 @@
+"""
+Prometheus metrics.
+
+Under gunicorn, set PROMETHEUS_MULTIPROC_DIR to an empty directory shared by
+the workers; each worker then writes its samples there and /metrics
+aggregates all of them, whichever worker serves the scrape.
+"""
+import os
+from typing import Dict
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest,
+)
+from prometheus_client import multiprocess
+
+# Request latencies range from sub-millisecond cache hits to multi-second uploads
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool.",
+    ["outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Database connections by state.",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+STORAGE_LATENCY = Histogram(
+    "storage_operation_duration_seconds",
+    "S3 call latency by operation and outcome.",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+COGNITO_LATENCY = Histogram(
+    "cognito_request_duration_seconds",
+    "Cognito call latency by operation and outcome.",
+    ["operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests",
+    "Response cache lookups by collection and result (hit, stale or miss).",
+    ["collection", "result"],
+)
+
+TOKEN_CACHE_REQUESTS = Counter(
+    "token_cache_requests",
+    "Verified token cache lookups by result (hit or miss).",
+    ["result"],
+)
+
+JOBS_PROCESSED = Counter(
+    "jobs_processed",
+    "Background jobs run by kind and outcome (succeeded, retried or failed).",
+    ["kind", "outcome"],
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Background job run time by kind.",
+    ["kind"],
+    buckets=LATENCY_BUCKETS,
+)
+JOB_QUEUE_DELAY = Histogram(
+    "job_queue_delay_seconds",
+    "Time from a job falling due to a worker claiming it.",
+    ["kind"],
+    buckets=LATENCY_BUCKETS + (60.0, 300.0),
+)
+JOBS_IN_FLIGHT = Gauge(
+    "jobs_in_flight",
+    "Background jobs being run.",
+    ["kind"],
+    multiprocess_mode="livesum",
+)
+
+
+def _collecting_registry() -> CollectorRegistry:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> bytes:
+    """
+    Render all metrics in the Prometheus text format.
+    
+    Returns:
+        The exposition body; serve it with CONTENT_TYPE_LATEST
+    """
+    return generate_latest(_collecting_registry())
+
+
+def sample_totals(sample_name: str, label: str) -> Dict[str, float]:
+    """
+    Sum a metric's samples by the values of one label.
+    
+    Reads the same samples as render_metrics, so in multiprocess mode the
+    totals cover every worker.
+    
+    Args:
+        sample_name: Sample name, e.g. jobs_processed_total for a Counter
+        label: Label to group by
+    
+    Returns:
+        Label value -> sum of the samples carrying it
+    """
+    totals: Dict[str, float] = {}
+    for metric in _collecting_registry().collect():
+        for sample in metric.samples:
+            if sample.name == sample_name:
+                value = sample.labels[label]
+                totals[value] = totals.get(value, 0.0) + sample.value
+    return totals
@@ -0,0 +1,261 @@
+"""
+ASGI middleware.
+"""
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.database import READ_PRIMARY_COOKIE, publish_pool_gauges
+from app.core.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT
+from app.core.query_stats import QueryStats, start_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+def route_template(scope: Dict[str, Any], default: Optional[str] = None) -> str:
+    """The matched route's path template, else default (the raw path if None)."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return default or scope["path"]
+    # Newer FastAPI versions leave an included router's prefix off route.path;
+    # recover it from the part of the request path in front of the route's own
+    path_format = getattr(route, "path_format", template)
+    params = {name: str(value) for name, value in scope.get("path_params", {}).items()}
+    try:
+        suffix = path_format.format(**params)
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if suffix and not path.endswith(suffix):
+        return template
+    return path[:len(path) - len(suffix)] + template
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject multipart request bodies larger than the upload limit.
+    
+    Starlette spools a multipart body to disk before the handler runs, so
+    the handler's own size check comes too late to spare the worker. This
+    rejects a too-large Content-Length up front and cuts off chunked bodies
+    as soon as they pass the limit.
+    """
+
+    def __init__(self, app: Callable, *, max_body_size: int):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The ASGI app
+            max_body_size: Maximum request body size in bytes
+        """
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+        
+        content_length = self._header(scope, b"content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > self.max_body_size:
+                await self._reject(send)
+                return
+        
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive() -> Dict[str, Any]:
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    if not response_started:
+                        rejected = True
+                        await self._reject(send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Dict[str, Any]) -> None:
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # The app fails on the cut-off body; the 413 has already gone out
+            if not rejected:
+                raise
+
+    @staticmethod
+    def _header(scope: Dict[str, Any], name: bytes) -> Any:
+        for key, value in scope["headers"]:
+            if key == name:
+                return value.decode("latin-1")
+        return None
+
+    def _is_multipart(self, scope: Dict[str, Any]) -> bool:
+        content_type = self._header(scope, b"content-type") or ""
+        return content_type.startswith("multipart/form-data")
+
+    async def _reject(self, send: Callable) -> None:
+        body = json.dumps(
+            {"detail": f"Request body exceeds the maximum size of {self.max_body_size} bytes"}
+        ).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class QueryStatsMiddleware:
+    """
+    Count the SQL statements each request runs and flag likely N+1 patterns.
+    
+    Every request is logged with its query count and DB time. A statement
+    shape that runs more than repeated_threshold times is logged as a
+    warning. With header enabled (development), the figures are also sent
+    in an X-DB-Queries response header.
+    """
+
+    def __init__(self, app: Callable, *, header: bool, repeated_threshold: int):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The ASGI app
+            header: Whether to add the X-DB-Queries response header
+            repeated_threshold: Runs of one statement shape above which to warn
+        """
+        self.app = app
+        self.header = header
+        self.repeated_threshold = repeated_threshold
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = start_query_stats()
+
+        async def send_with_stats(message: Dict[str, Any]) -> None:
+            if self.header and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", self._summary(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            self._log(scope, stats)
+
+    def _summary(self, stats: QueryStats) -> str:
+        most_repeated = max(stats.shapes.values(), default=0)
+        return f"count={stats.count}; time_ms={stats.seconds * 1000:.1f}; max_repeat={most_repeated}"
+
+    def _log(self, scope: Dict[str, Any], stats: QueryStats) -> None:
+        route = f"{scope['method']} {route_template(scope)}"
+        logger.info("%s: %s", route, self._summary(stats))
+        for shape, runs in stats.repeated(self.repeated_threshold):
+            logger.warning("Possible N+1 in %s: statement ran %d times: %s", route, runs, shape[:500])
+
+
+class PrometheusMiddleware:
+    """
+    Record request latency per route template and status, and requests in flight.
+    
+    Requests that match no route share one "unmatched" label so that
+    scanners probing random paths cannot blow up the series count.
+    """
+
+    def __init__(self, app: Callable):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The ASGI app
+        """
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method=method)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            REQUEST_LATENCY.labels(
+                method=method,
+                route=route_template(scope, default="unmatched"),
+                status=str(status_code),
+            ).observe(time.perf_counter() - started)
+            publish_pool_gauges()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pin a client's reads to the primary for a short while after it writes.
+    
+    A successful POST, PUT, PATCH or DELETE sets a cookie that expires after
+    max_age seconds; get_read_db skips the replicas while it is present, so
+    the client sees its own writes even when the replicas lag behind.
+    """
+
+    WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+    def __init__(self, app: Callable, *, max_age: int):
+        """
+        Initialize the middleware.
+        
+        Args:
+            app: The ASGI app
+            max_age: Seconds to read from the primary after a write
+        """
+        self.app = app
+        self.max_age = max_age
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}=1; Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -1,66 +1,190 @@
 """
 QR Code generation utilities.
 """
+import asyncio
 import io
 import json
 import uuid
-from typing import Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
 import qrcode
-from fastapi import UploadFile
 
-from app.core.storage import BucketName, upload_file_to_s3
+from app.core.config import settings
+from app.core.storage import BucketName, storage
 
+QRData = Union[str, Dict[str, Any]]
 
-async def generate_qrcode(
-    data: Dict,
-    bucket: BucketName = BucketName.QRCODES,
-    object_name: Optional[str] = None,
-) -> str:
+
+def render_qrcode_png(data: QRData) -> bytes:
     """
-    Generate a QR code for the given data and upload to S3.
-    
+    Render data as a QR code PNG.
+
+    Runs in the render pool's worker processes, so it must stay a
+    module-level function.
+
     Args:
-        data: The data to encode in the QR code
-        bucket: The S3 bucket to store the QR code
-        object_name: The S3 object name for the QR code
-    
+        data: Text to encode, or a dict to encode as JSON
+
     Returns:
-        URL of the uploaded QR code
+        PNG image bytes
     """
-    # Serialize data to JSON
-    json_data = json.dumps(data)
-    
-    # Generate QR code
+    if not isinstance(data, str):
+        data = json.dumps(data)
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
         box_size=10,
         border=4,
     )
-    qr.add_data(json_data)
+    qr.add_data(data)
     qr.make(fit=True)
-    
+
     # Create an image from the QR Code
     img = qr.make_image(fill_color="black", back_color="white")
-    
+
     # Convert to bytes
     img_byte_arr = io.BytesIO()
     img.save(img_byte_arr, format="PNG")
-    img_byte_arr.seek(0)
-    
-    # Create a FastAPI UploadFile
-    filename = object_name or f"qrcode_{uuid.uuid4()}.png"
-    file = UploadFile(
-        filename=filename,
-        file=img_byte_arr,
-        content_type="image/png"
-    )
-    
-    # Upload to S3
-    return await upload_file_to_s3(
-        file=file,
+    return img_byte_arr.getvalue()
+
+
+def _render_many(items: Sequence[QRData]) -> List[bytes]:
+    return [render_qrcode_png(data) for data in items]
+
+
+class QRCodeRenderer:
+    """
+    Renders QR codes on a process pool shared by the worker.
+
+    Building the matrix and encoding the PNG is CPU-bound, so it runs in
+    separate processes instead of on the event loop. At most max_pending
+    render jobs are queued on the pool; further callers wait their turn.
+    """
+
+    def __init__(self, *, max_workers: int, max_pending: int, chunk_size: int = 32):
+        """
+        Initialize the renderer.
+
+        Args:
+            max_workers: Number of render processes
+            max_pending: Maximum number of jobs submitted to the pool at once
+            chunk_size: QR codes per job when rendering a batch
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        return self._slots
+
+    async def _submit(self, items: Sequence[QRData]) -> List[bytes]:
+        async with self._get_slots():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), _render_many, list(items))
+
+    async def render(self, data: QRData) -> bytes:
+        """
+        Render one QR code.
+
+        Args:
+            data: Text to encode, or a dict to encode as JSON
+
+        Returns:
+            PNG image bytes
+        """
+        return (await self._submit([data]))[0]
+
+    async def render_many(self, items: Sequence[QRData]) -> List[bytes]:
+        """
+        Render many QR codes, spread over the pool in chunks.
+
+        Args:
+            items: Payloads to encode
+
+        Returns:
+            PNG image bytes, in the order of items
+        """
+        chunks = [
+            items[start:start + self.chunk_size]
+            for start in range(0, len(items), self.chunk_size)
+        ]
+        rendered = await asyncio.gather(*(self._submit(chunk) for chunk in chunks))
+        return [png for chunk in rendered for png in chunk]
+
+    def close(self) -> None:
+        """Shut down the render processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._slots = None
+
+
+renderer = QRCodeRenderer(
+    max_workers=settings.QR_RENDER_WORKERS, max_pending=settings.QR_RENDER_MAX_PENDING
+)
+
+
+async def generate_qrcode(
+    data: QRData,
+    bucket: BucketName = BucketName.QRCODES,
+    object_name: Optional[str] = None,
+) -> str:
+    """
+    Generate a QR code for the given data and upload to S3.
+
+    Args:
+        data: The data to encode in the QR code
+        bucket: The S3 bucket to store the QR code
+        object_name: The S3 object name for the QR code
+
+    Returns:
+        URL of the uploaded QR code
+    """
+    png = await renderer.render(data)
+    return await storage.upload(
         bucket=bucket,
-        object_name=filename,
+        key=object_name or f"qrcode_{uuid.uuid4()}.png",
+        body=png,
         content_type="image/png",
-    )
\ No newline at end of file
+    )
+
+
+async def generate_qrcodes_batch(
+    items: Sequence[Tuple[QRData, str]],
+    bucket: BucketName = BucketName.QRCODES,
+) -> List[str]:
+    """
+    Generate many QR codes and upload them.
+
+    Each chunk's uploads start as soon as the chunk is rendered, so
+    rendering and uploading overlap.
+
+    Args:
+        items: (data, object name) pairs
+        bucket: The S3 bucket to store the QR codes
+
+    Returns:
+        URLs of the uploaded QR codes, in the order of items
+    """
+    async def render_and_upload(chunk: Sequence[Tuple[QRData, str]]) -> List[str]:
+        pngs = await renderer.render_many([data for data, _ in chunk])
+        return await asyncio.gather(*(
+            storage.upload(bucket=bucket, key=object_name, body=png, content_type="image/png")
+            for (_, object_name), png in zip(chunk, pngs)
+        ))
+
+    chunk_size = renderer.chunk_size
+    chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+    uploaded = await asyncio.gather(*(render_and_upload(chunk) for chunk in chunks))
+    return [url for chunk in uploaded for url in chunk]
@@ -0,0 +1,84 @@
+"""
+Per-request SQL query statistics.
+"""
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bind parameter lists (IN (?, ?, ?) and the like) vary in length, not shape
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so that repeats differing only in parameters compare equal."""
+    return _WHITESPACE.sub(" ", _PARAM_LIST.sub("(?)", statement)).strip()
+
+
+class QueryStats:
+    """Queries run while handling one request."""
+
+    def __init__(self):
+        """Initialize with no queries recorded."""
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        """Record one executed statement."""
+        self.count += 1
+        self.seconds += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes run more than threshold times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> QueryStats:
+    """Start collecting query statistics for the current request."""
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Statistics for the current request, if collecting."""
+    return _current.get()
+
+
+def install_query_stats(sync_engine: Engine) -> None:
+    """
+    Record every statement the engine runs against the current request's stats.
+    
+    SQLAlchemy's async greenlets inherit the calling task's context, so the
+    hooks see the context variable set by the request middleware.
+    
+    Args:
+        sync_engine: Engine to instrument
+    """
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        started = conn.info.get("query_stats_started")
+        if stats is not None and started:
+            stats.record(statement, time.perf_counter() - started.pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _discard_timer(context):
+        started = context.connection.info.get("query_stats_started") if context.connection else None
+        if started:
+            started.pop()
@@ -0,0 +1,334 @@
+"""
+Response cache for the public GET endpoints.
+
+Responses are cached as serialized JSON, keyed on path and query string,
+and tagged with the collection (list pages) or item (detail pages) they
+show. Write handlers invalidate the tags they touch. An entry is fresh for
+ttl seconds; for stale_ttl seconds after that it is still served while a
+single background refresh reloads it.
+
+The in-memory backend is per worker process: a write invalidates the
+worker that handled it, and other workers keep serving their copy until
+it goes stale. A shared backend can be plugged into ResponseCache instead.
+"""
+import abc
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import (
+    Any, AsyncContextManager, Awaitable, Callable, Dict, FrozenSet, Iterable, NamedTuple,
+    Optional, Set, Tuple,
+)
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import SingleFlight
+from app.core.conditional import (
+    ResourceVersion, is_not_modified, not_modified_response, version_headers,
+)
+from app.core.config import settings
+from app.core.database import READ_PRIMARY_COOKIE, read_session
+from app.core.metrics import RESPONSE_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Collections whose pages are cached
+EVENTS = "events"
+BLOG = "blog"
+GALLERY = "gallery"
+
+
+@dataclass
+class CachedResponse:
+    """A serialized JSON response body and the headers to send with it."""
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class CacheEntry(NamedTuple):
+    """A cached response and when it goes stale and expires (monotonic seconds)."""
+    response: CachedResponse
+    fresh_until: float
+    stale_until: float
+    tags: FrozenSet[str]
+
+
+Loader = Callable[[AsyncSession], Awaitable[CachedResponse]]
+
+
+def item_tag(collection: str, id: Any) -> str:
+    """Tag for the cached pages of one item in a collection."""
+    return f"{collection}:{id}"
+
+
+class CacheBackend(abc.ABC):
+    """Where ResponseCache keeps its entries. Subclass to store them elsewhere."""
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry for key, if any."""
+
+    @abc.abstractmethod
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry under key."""
+
+    @abc.abstractmethod
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        """Drop every entry carrying any of the tags."""
+
+    @abc.abstractmethod
+    async def clear(self) -> None:
+        """Drop every entry."""
+
+    @abc.abstractmethod
+    def size(self) -> int:
+        """Number of entries stored."""
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Bounded LRU of entries in this worker, with a tag index for invalidation."""
+
+    def __init__(self, *, maxsize: int):
+        """
+        Initialize the backend.
+        
+        Args:
+            maxsize: Maximum number of entries
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.stale_until <= time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        if self.maxsize <= 0:
+            return
+        self._drop(key)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._drop(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class ResponseCache:
+    """
+    TTL cache with stale-while-revalidate for serialized responses.
+    
+    A miss loads with the request's own session. A stale hit is answered
+    from the cache and reloaded once in the background with a session from
+    session_factory. A load that started before an invalidation is not
+    stored, so a write is never undone by a slow reader.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        ttl: float,
+        stale_ttl: float,
+        session_factory: Callable[[], AsyncContextManager[AsyncSession]] = read_session,
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            backend: Entry storage
+            ttl: Seconds an entry is served without reloading; 0 disables caching
+            stale_ttl: Seconds after going stale that an entry is still served while it reloads
+            session_factory: Opens the sessions used by background reloads
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.session_factory = session_factory
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._refreshes = SingleFlight()
+
+    async def get_or_load(
+        self, key: str, load: Loader, *, db: AsyncSession, collection: str, tags: Iterable[str]
+    ) -> Tuple[CachedResponse, str]:
+        """
+        Get a cached response, loading it on a miss.
+        
+        Args:
+            key: Cache key
+            load: Builds the response from a session
+            db: Session for a load on a miss
+            collection: Collection label for the hit metric
+            tags: Tags to invalidate the entry by
+        
+        Returns:
+            The response and how it was served: HIT, STALE or MISS
+        """
+        if self.ttl <= 0:
+            return await load(db), "MISS"
+
+        entry = await self.backend.get(key)
+        now = time.monotonic()
+        if entry is not None and now < entry.fresh_until:
+            self.hits += 1
+            RESPONSE_CACHE_REQUESTS.labels(collection=collection, result="hit").inc()
+            return entry.response, "HIT"
+        if entry is not None:
+            self.stale_hits += 1
+            RESPONSE_CACHE_REQUESTS.labels(collection=collection, result="stale").inc()
+            asyncio.ensure_future(self._refreshes.do(key, lambda: self._refresh(key, load, tags)))
+            return entry.response, "STALE"
+
+        self.misses += 1
+        RESPONSE_CACHE_REQUESTS.labels(collection=collection, result="miss").inc()
+        return await self._load_and_store(key, load, db, tags), "MISS"
+
+    async def _load_and_store(
+        self, key: str, load: Loader, db: AsyncSession, tags: Iterable[str]
+    ) -> CachedResponse:
+        generation = self._generation
+        response = await load(db)
+        if generation == self._generation:
+            now = time.monotonic()
+            await self.backend.set(key, CacheEntry(
+                response=response,
+                fresh_until=now + self.ttl,
+                stale_until=now + self.ttl + self.stale_ttl,
+                tags=frozenset(tags),
+            ))
+        return response
+
+    async def _refresh(self, key: str, load: Loader, tags: Iterable[str]) -> None:
+        try:
+            async with self.session_factory() as session:
+                await self._load_and_store(key, load, session, tags)
+        except Exception:
+            logger.warning("Background refresh of %s failed", key, exc_info=True)
+
+    async def invalidate(self, *tags: str) -> None:
+        """Drop every cached response carrying any of the tags."""
+        self._generation += 1
+        await self.backend.invalidate(tags)
+
+    async def invalidate_item(self, collection: str, id: Any) -> None:
+        """Drop the cached pages of an item and of its collection's lists."""
+        await self.invalidate(collection, item_tag(collection, id))
+
+    async def clear(self) -> None:
+        """Drop everything and reset the counters."""
+        self._generation += 1
+        await self.backend.clear()
+        self.hits = self.stale_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters, hit ratio and size for this worker."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "size": self.backend.size(),
+        }
+
+
+response_cache = ResponseCache(
+    InMemoryCacheBackend(maxsize=settings.RESPONSE_CACHE_MAX_SIZE),
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    stale_ttl=settings.RESPONSE_CACHE_STALE_SECONDS,
+)
+
+
+def cache_key(request: Request) -> str:
+    """Path plus sorted query parameters, so parameter order does not split entries."""
+    query = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+async def cached_response(
+    request: Request,
+    db: AsyncSession,
+    load: Loader,
+    *,
+    collection: str,
+    id: Any = None,
+    version: Optional[ResourceVersion] = None,
+) -> Response:
+    """
+    Answer a public GET from the response cache.
+    
+    Clients that wrote recently (see ReadYourWritesMiddleware) bypass the
+    cache, like they bypass the read replicas. The X-Cache header tells
+    whether the response was a HIT, STALE or MISS.
+    
+    With a version, the response carries its ETag and Last-Modified, a
+    matching If-None-Match is answered with a 304 before anything is
+    loaded or serialized, and the ETag is part of the cache key, so a
+    change made through another worker is never served from this one.
+    
+    Args:
+        request: The incoming request
+        db: The handler's session, used on a miss
+        load: Builds the response from a session
+        collection: EVENTS, BLOG or GALLERY
+        id: Item ID for a detail page; None for a list page
+        version: Version of the data behind the page, from resource_version
+    
+    Returns:
+        The JSON response, or a 304
+    """
+    headers: Dict[str, str] = {}
+    key = cache_key(request)
+    if version is not None:
+        if is_not_modified(request, version):
+            return not_modified_response(version)
+        headers = version_headers(version)
+        key = f"{key}#{version.etag}"
+    
+    if READ_PRIMARY_COOKIE in request.cookies:
+        cached, status = await load(db), "BYPASS"
+    else:
+        tags = [collection] if id is None else [item_tag(collection, id)]
+        cached, status = await response_cache.get_or_load(
+            key, load, db=db, collection=collection, tags=tags
+        )
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={**cached.headers, **headers, "X-Cache": status},
+    )
@@ -0,0 +1,120 @@
+"""
+JSON serialization fast paths.
+
+ORJSONResponse is the app's default response class. For the public read
+endpoints, whose rows come straight from our own queries, dump_trusted
+skips pydantic validation entirely: it walks a per-schema field plan built
+once, copies attributes off the ORM objects and hands the result to
+orjson. json_body is the validating path, through pre-built TypeAdapters.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+# Match pydantic's JSON output: UTC datetimes end in "Z"
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# (field name, nested schema or None, whether it is a list, default)
+FieldPlan = Tuple[Tuple[str, Optional[Type[BaseModel]], bool, Any], ...]
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    """Pre-built TypeAdapter for a schema such as List[EventWithCounts]."""
+    return TypeAdapter(schema)
+
+
+def json_body(schema: Any, value: Any) -> bytes:
+    """
+    Validate a value against a response schema and serialize it.
+    
+    Args:
+        schema: Pydantic model or type, e.g. List[EventWithCounts]
+        value: ORM objects or schema instances
+    
+    Returns:
+        JSON bytes
+    """
+    adapter = type_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True), by_alias=True)
+
+
+def _unwrap(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            raise TypeError(f"Unions of several types need the validating path: {annotation}")
+        annotation = args[0]
+    many = get_origin(annotation) in (list, List)
+    if many:
+        annotation = get_args(annotation)[0]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, many
+    return None, many
+
+
+@lru_cache(maxsize=None)
+def field_plan(schema: Type[BaseModel]) -> FieldPlan:
+    """The fields of a schema, with the nested schema of each relationship field."""
+    plan = []
+    for name, field in schema.model_fields.items():
+        nested, many = _unwrap(field.annotation)
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        plan.append((name, nested, many, default))
+    return tuple(plan)
+
+
+def _to_python(
+    schema: Type[BaseModel], obj: Any, shape: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    if obj is None:
+        return None
+    data = {}
+    for name, nested, many, default in field_plan(schema):
+        if shape is not None and name not in shape:
+            continue
+        value = getattr(obj, name, default)
+        if nested is not None and value is not None:
+            inner = None if shape is None else shape[name]
+            if many:
+                value = [_to_python(nested, item, inner) for item in value]
+            else:
+                value = _to_python(nested, value, inner)
+        data[name] = value
+    return data
+
+
+def dump_trusted(schema: Any, value: Any, *, shape: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Serialize ORM objects through a response schema without validating them.
+    
+    Only for rows loaded by our own queries with every field the schema
+    needs; the output matches json_body for such rows.
+    
+    Args:
+        schema: Pydantic model, or List of one
+        value: ORM object, or list of them
+        shape: Only serialize these fields (see app.core.fieldsets); the
+            rows then need only the fields in the shape
+    
+    Returns:
+        JSON bytes
+    """
+    model, many = _unwrap(schema)
+    if model is None:
+        raise TypeError(f"dump_trusted needs a pydantic model or a list of one: {schema}")
+    if many:
+        payload: Any = [_to_python(model, item, shape) for item in value]
+    else:
+        payload = _to_python(model, value, shape)
+    return orjson.dumps(payload, option=ORJSON_OPTIONS)
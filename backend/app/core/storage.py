@@ -1,15 +1,24 @@
 """
 AWS S3 utilities for file storage.
 """
+import asyncio
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
-from typing import Optional
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.jobs import DELETE_OBJECT, SessionFactory, enqueue_job, job_handler
+from app.core.metrics import STORAGE_LATENCY
 
 
 class BucketName(str, Enum):
@@ -19,14 +28,340 @@ class BucketName(str, Enum):
     PROFILEPICS = settings.S3_BUCKET_PROFILEPICS
 
 
+class ObjectTooLarge(Exception):
+    """Raised when an upload exceeds the maximum object size."""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"Object exceeds the maximum size of {max_size} bytes")
+        self.max_size = max_size
+
+
+def _is_missing(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+class StorageService:
+    """
+    Async front for S3 with one long-lived client per worker.
+    
+    boto3 clients are thread-safe, so a single client with a connection
+    pool sized to the executor serves every transfer. Blocking calls run on
+    a bounded thread pool, keeping the event loop free while S3 is slow.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int,
+        endpoint_url: Optional[str] = None,
+        client: Optional[Any] = None,
+    ):
+        """
+        Initialize the storage service.
+        
+        Args:
+            max_workers: Maximum number of concurrent S3 transfers
+            endpoint_url: S3-compatible endpoint (e.g. LocalStack); AWS when None
+            client: boto3 S3 client; one is created on first use
+        """
+        self.max_workers = max_workers
+        self.endpoint_url = endpoint_url
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        self._metrics: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def client(self) -> Any:
+        """The shared boto3 S3 client."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        region_name=settings.AWS_REGION,
+                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                        config=Config(max_pool_connections=self.max_workers),
+                    )
+        return self._client
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="storage"
+            )
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., Any], **kwargs: Any) -> Any:
+        """Run a blocking S3 call on the executor and record its outcome."""
+        metrics = self._metrics.setdefault(
+            operation, {"calls": 0, "errors": 0, "seconds": 0.0}
+        )
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await loop.run_in_executor(self._get_executor(), partial(func, **kwargs))
+            outcome = "ok"
+            return result
+        except Exception:
+            metrics["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._in_flight -= 1
+            metrics["calls"] += 1
+            metrics["seconds"] += elapsed
+            STORAGE_LATENCY.labels(operation=operation, outcome=outcome).observe(elapsed)
+
+    async def upload(
+        self,
+        bucket: str,
+        key: str,
+        body: Any,
+        content_type: Optional[str] = None,
+    ) -> str:
+        """
+        Upload bytes or a file-like object.
+        
+        Args:
+            bucket: Bucket to upload to
+            key: S3 object name
+            body: Bytes or a binary file-like object
+            content_type: Content type of the object
+        
+        Returns:
+            URL of the uploaded object
+        """
+        extra_args = {}
+        if content_type:
+            extra_args["ContentType"] = content_type
+        await self._run(
+            "upload", self.client.put_object, Body=body, Bucket=bucket, Key=key, **extra_args
+        )
+        return self.object_url(bucket, key)
+
+    async def upload_stream(
+        self,
+        bucket: str,
+        key: str,
+        read: Callable[[int], Awaitable[bytes]],
+        content_type: Optional[str] = None,
+        *,
+        part_size: int,
+        max_size: int,
+    ) -> str:
+        """
+        Upload a stream part by part, holding at most one part in memory.
+        
+        A stream that fits in one part is sent with a single PUT; anything
+        larger goes through an S3 multipart upload, which is aborted if the
+        stream fails or grows past max_size.
+        
+        Args:
+            bucket: Bucket to upload to
+            key: S3 object name
+            read: Coroutine returning up to n bytes, or b"" at the end
+            content_type: Content type of the object
+            part_size: Bytes per part; S3 requires at least 5 MiB
+            max_size: Maximum object size in bytes
+        
+        Returns:
+            URL of the uploaded object
+        
+        Raises:
+            ObjectTooLarge: If the stream is longer than max_size
+        """
+        async def read_exactly(size: int) -> bytes:
+            # Parts other than the last must be full, so top up short reads
+            data = b""
+            while len(data) < size:
+                more = await read(size - len(data))
+                if not more:
+                    break
+                data += more
+            return data
+        
+        # Read one byte past the part so a stream of exactly part_size is a single PUT
+        chunk = await read_exactly(part_size + 1)
+        if len(chunk) > max_size:
+            raise ObjectTooLarge(max_size)
+        if len(chunk) <= part_size:
+            return await self.upload(bucket, key, chunk, content_type)
+        
+        extra_args = {}
+        if content_type:
+            extra_args["ContentType"] = content_type
+        created = await self._run(
+            "create_multipart_upload",
+            self.client.create_multipart_upload,
+            Bucket=bucket,
+            Key=key,
+            **extra_args,
+        )
+        upload_id = created["UploadId"]
+        parts: List[Dict[str, Any]] = []
+        total = 0
+        try:
+            pending = chunk[part_size:]
+            chunk = chunk[:part_size]
+            while chunk:
+                total += len(chunk)
+                if total > max_size:
+                    raise ObjectTooLarge(max_size)
+                part = await self._run(
+                    "upload_part",
+                    self.client.upload_part,
+                    Body=chunk,
+                    Bucket=bucket,
+                    Key=key,
+                    PartNumber=len(parts) + 1,
+                    UploadId=upload_id,
+                )
+                parts.append({"ETag": part["ETag"], "PartNumber": len(parts) + 1})
+                chunk = pending + await read_exactly(part_size - len(pending))
+                pending = b""
+            await self._run(
+                "complete_multipart_upload",
+                self.client.complete_multipart_upload,
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            await self._run(
+                "abort_multipart_upload",
+                self.client.abort_multipart_upload,
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+            )
+            raise
+        return self.object_url(bucket, key)
+
+    async def head(self, bucket: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an object's metadata.
+        
+        Args:
+            bucket: The S3 bucket name
+            key: The S3 object name
+        
+        Returns:
+            The HeadObject response, or None if the object does not exist
+        """
+        try:
+            return await self._run("head", self.client.head_object, Bucket=bucket, Key=key)
+        except ClientError as e:
+            if _is_missing(e):
+                return None
+            raise
+
+    async def download(self, bucket: str, key: str) -> Optional[bytes]:
+        """
+        Download an object into memory.
+        
+        Args:
+            bucket: The S3 bucket name
+            key: The S3 object name
+        
+        Returns:
+            The object's bytes, or None if the object does not exist
+        """
+        def get_object(**kwargs: Any) -> bytes:
+            # Reading the body blocks too, so it stays on the executor
+            return self.client.get_object(**kwargs)["Body"].read()
+        
+        try:
+            return await self._run("download", get_object, Bucket=bucket, Key=key)
+        except ClientError as e:
+            if _is_missing(e):
+                return None
+            raise
+
+    async def delete(self, bucket: str, key: str) -> None:
+        """
+        Delete an object.
+        
+        Args:
+            bucket: The S3 bucket name
+            key: The S3 object name
+        """
+        await self._run("delete", self.client.delete_object, Bucket=bucket, Key=key)
+
+    async def presign(
+        self,
+        client_method: str,
+        params: Dict[str, Any],
+        expiration: int = 3600,
+        http_method: Optional[str] = None,
+    ) -> str:
+        """
+        Generate a presigned URL.
+        
+        Signing is local, but the first call may resolve credentials over
+        the network, so it also runs on the executor.
+        
+        Args:
+            client_method: S3 client method to presign, e.g. "put_object"
+            params: Parameters for the client method
+            expiration: Time in seconds for the URL to remain valid
+            http_method: HTTP method for the URL; defaults to the method's own
+        
+        Returns:
+            Presigned URL as string
+        """
+        kwargs: Dict[str, Any] = {
+            "ClientMethod": client_method,
+            "Params": params,
+            "ExpiresIn": expiration,
+        }
+        if http_method:
+            kwargs["HttpMethod"] = http_method
+        return await self._run("presign", self.client.generate_presigned_url, **kwargs)
+
+    def object_url(self, bucket: str, key: str) -> str:
+        """Public URL of an object."""
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{bucket}/{key}"
+        return f"https://{bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
+    def object_key(self, bucket: str, url: str) -> Optional[str]:
+        """Key of an object from its object_url, or None for a URL outside the bucket."""
+        prefix = self.object_url(bucket, "")
+        if url.startswith(prefix) and len(url) > len(prefix):
+            return url[len(prefix):]
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-operation call/error counts and seconds, plus transfers in flight."""
+        return {
+            "in_flight": self._in_flight,
+            "max_workers": self.max_workers,
+            "operations": {name: dict(values) for name, values in self._metrics.items()},
+        }
+
+    def close(self) -> None:
+        """Shut down the executor and drop the client."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._client = None
+
+
+storage = StorageService(
+    max_workers=settings.S3_MAX_WORKERS, endpoint_url=settings.S3_ENDPOINT_URL
+)
+
+
 def get_s3_client():
-    """Get a boto3 S3 client."""
-    return boto3.client(
-        "s3",
-        region_name=settings.AWS_REGION,
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    )
+    """Get the shared boto3 S3 client."""
+    return storage.client
 
 
 async def upload_file_to_s3(
@@ -52,37 +387,40 @@ async def upload_file_to_s3(
         suffix = file.filename.split(".")[-1] if "." in file.filename else ""
         object_name = f"{uuid.uuid4()}.{suffix}" if suffix else str(uuid.uuid4())
     
-    # Get the file data
-    file_data = await file.read()
+    # Reject uploads we already know are too large before sending anything
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the maximum size of {settings.MAX_UPLOAD_SIZE} bytes",
+        )
     
-    # Upload the file
-    s3_client = get_s3_client()
+    # Stream the file to S3 part by part
     try:
-        extra_args = {}
-        if content_type:
-            extra_args["ContentType"] = content_type
-        
-        s3_client.put_object(
-            Body=file_data,
-            Bucket=bucket,
-            Key=object_name,
-            **extra_args
+        url = await storage.upload_stream(
+            bucket=bucket,
+            key=object_name,
+            read=file.read,
+            content_type=content_type,
+            part_size=settings.S3_UPLOAD_PART_SIZE,
+            max_size=settings.MAX_UPLOAD_SIZE,
+        )
+    except ObjectTooLarge as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the maximum size of {e.max_size} bytes",
         )
-        
-        # Reset file read pointer
-        await file.seek(0)
-        
-        # Return the URL
-        return f"https://{bucket}.s3.{settings.AWS_REGION}.amazonaws.com/{object_name}"
-    
     except ClientError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading file to S3: {str(e)}",
         )
+    
+    # Reset file read pointer
+    await file.seek(0)
+    return url
 
 
-def create_presigned_url(
+async def create_presigned_url(
     bucket: BucketName, 
     object_name: str, 
     expiration: int = 3600,
@@ -100,16 +438,15 @@ def create_presigned_url(
     Returns:
         Presigned URL as string
     """
-    s3_client = get_s3_client()
     try:
-        return s3_client.generate_presigned_url(
-            ClientMethod=f"{http_method.lower()}_object",
-            Params={
+        return await storage.presign(
+            f"{http_method.lower()}_object",
+            {
                 "Bucket": bucket,
                 "Key": object_name,
             },
-            ExpiresIn=expiration,
-            HttpMethod=http_method.upper(),
+            expiration=expiration,
+            http_method=http_method.upper(),
         )
     except ClientError as e:
         raise HTTPException(
@@ -118,7 +455,7 @@ def create_presigned_url(
         )
 
 
-def generate_presigned_download_url(
+async def generate_presigned_download_url(
     bucket: BucketName,
     object_name: str,
     expiration: int = 3600,
@@ -136,7 +473,6 @@ def generate_presigned_download_url(
     Returns:
         Presigned download URL as string
     """
-    s3_client = get_s3_client()
     params = {
         "Bucket": bucket,
         "Key": object_name,
@@ -146,11 +482,7 @@ def generate_presigned_download_url(
         params["ResponseContentType"] = response_content_type
     
     try:
-        return s3_client.generate_presigned_url(
-            ClientMethod="get_object",
-            Params=params,
-            ExpiresIn=expiration,
-        )
+        return await storage.presign("get_object", params, expiration=expiration)
     except ClientError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -158,7 +490,109 @@ def generate_presigned_download_url(
         )
 
 
-def delete_s3_object(bucket: BucketName, object_name: str) -> bool:
+def new_object_key(prefix: str, filename: str) -> str:
+    """
+    Build a unique object key under a prefix, keeping the file's extension.
+    
+    Args:
+        prefix: Key prefix, e.g. "gallery/<user id>/"
+        filename: Client-side file name
+    
+    Returns:
+        Object key
+    """
+    suffix = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return f"{prefix}{uuid.uuid4()}.{suffix}" if suffix else f"{prefix}{uuid.uuid4()}"
+
+
+async def create_upload_slot(
+    bucket: BucketName,
+    object_name: str,
+    content_type: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Create a presigned PUT for a client to upload an object directly.
+    
+    Args:
+        bucket: The S3 bucket name
+        object_name: The S3 object name
+        content_type: Content type the client must send with the PUT
+    
+    Returns:
+        Upload slot with the presigned URL, object key and required headers
+    """
+    params = {
+        "Bucket": bucket,
+        "Key": object_name,
+    }
+    headers = {}
+    if content_type:
+        params["ContentType"] = content_type
+        headers["Content-Type"] = content_type
+    
+    try:
+        upload_url = await storage.presign(
+            "put_object",
+            params,
+            expiration=settings.S3_UPLOAD_URL_EXPIRATION,
+            http_method="PUT",
+        )
+    except ClientError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating presigned URL: {str(e)}",
+        )
+    return {
+        "upload_url": upload_url,
+        "object_key": object_name,
+        "headers": headers,
+        "expires_in": settings.S3_UPLOAD_URL_EXPIRATION,
+    }
+
+
+async def confirm_upload(bucket: BucketName, object_name: str, *, prefix: str) -> str:
+    """
+    Check that a client finished a direct upload and that it is within limits.
+    
+    An object over MAX_UPLOAD_SIZE is deleted, since a presigned PUT cannot
+    bound the size up front.
+    
+    Args:
+        bucket: The S3 bucket name
+        object_name: The S3 object name
+        prefix: Key prefix the caller is allowed to confirm
+    
+    Returns:
+        URL of the uploaded object
+    """
+    if not object_name.startswith(prefix) or ".." in object_name:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Object key does not belong to this upload",
+        )
+    
+    try:
+        head = await storage.head(bucket=bucket, key=object_name)
+        if head is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Upload not found; PUT the file to the upload URL first",
+            )
+        if head["ContentLength"] > settings.MAX_UPLOAD_SIZE:
+            await storage.delete(bucket=bucket, key=object_name)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds the maximum size of {settings.MAX_UPLOAD_SIZE} bytes",
+            )
+    except ClientError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking upload in S3: {str(e)}",
+        )
+    return storage.object_url(bucket, object_name)
+
+
+async def delete_s3_object(bucket: BucketName, object_name: str) -> bool:
     """
     Delete an object from S3.
     
@@ -169,12 +603,45 @@ def delete_s3_object(bucket: BucketName, object_name: str) -> bool:
     Returns:
         True if object was deleted, else False
     """
-    s3_client = get_s3_client()
     try:
-        s3_client.delete_object(Bucket=bucket, Key=object_name)
+        await storage.delete(bucket=bucket, key=object_name)
         return True
     except ClientError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting object from S3: {str(e)}",
-        )
\ No newline at end of file
+        )
+
+
+def delete_object_later(
+    db: AsyncSession,
+    bucket: BucketName,
+    url: Optional[str],
+    *,
+    keep: Optional[str] = None,
+    prefix: Optional[str] = None,
+) -> None:
+    """
+    Queue the deletion of a stored object that a row no longer points to.
+    
+    The job is added to the session, so it only runs if the change that
+    dropped the object commits. URLs outside the bucket are ignored.
+    
+    Args:
+        db: Database session
+        bucket: The S3 bucket name
+        url: The object's URL, as returned by the upload
+        keep: The URL that replaces it; nothing is deleted if it is the same
+            object, e.g. a re-upload to the same key
+        prefix: Key prefix of the objects the row owns; a URL the row merely
+            points to, such as another user's upload, is left in place
+    """
+    key = storage.object_key(bucket, url) if url and url != keep else None
+    if key is not None and (prefix is None or key.startswith(prefix)):
+        enqueue_job(db, DELETE_OBJECT, {"bucket": bucket.value, "key": key})
+
+
+@job_handler(DELETE_OBJECT)
+async def _delete_object_job(payload: Dict[str, Any], session_factory: SessionFactory) -> None:
+    # Deleting a missing key succeeds, so a rerun is harmless
+    await storage.delete(bucket=payload["bucket"], key=payload["key"])
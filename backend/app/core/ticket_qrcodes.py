@@ -0,0 +1,80 @@
+"""
+QR code images of registration tickets.
+
+Each registration queues a RENDER_QRCODE job when it is created. The job
+draws the registration's signed ticket as a QR code, stores the PNG under
+registrations/<registration ID>.png and records its URL on the row. A
+ticket viewed before the job has run is rendered on the spot instead.
+"""
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from app.core.cache import SingleFlight
+from app.core.database import AsyncSessionLocal
+from app.core.jobs import RENDER_QRCODE, SessionFactory, job_handler
+from app.core.qrcode_utils import generate_qrcode
+from app.core.response_cache import EVENTS, response_cache
+from app.core.storage import BucketName
+from app.core.tickets import encode_ticket
+from app.crud import registration
+
+# Registration ID -> QR render in flight on this worker
+_qrcode_flights = SingleFlight()
+
+
+def qrcode_object_name(registration_id: UUID) -> str:
+    """Object name of a registration's QR code in the QRCODES bucket."""
+    return f"registrations/{registration_id}.png"
+
+
+async def _generate_registration_qrcode(registration_id: UUID, event_id: UUID) -> str:
+    """Generate QR code for registration."""
+    # Generate a QR code of the signed ticket and upload to S3
+    return await generate_qrcode(
+        data=encode_ticket(registration_id, event_id),
+        bucket=BucketName.QRCODES,
+        object_name=qrcode_object_name(registration_id),
+    )
+
+
+async def _store_registration_qrcode(
+    registration_id: UUID, session_factory: Optional[SessionFactory] = None
+) -> Optional[str]:
+    """
+    Render, upload and persist a registration's QR code unless it already has one.
+
+    The registration row stays locked while rendering, so workers racing on
+    the same registration render it once; the rest find the stored URL.
+    The session comes from session_factory, AsyncSessionLocal by default.
+    """
+    async with (session_factory or AsyncSessionLocal)() as db:
+        db_registration = await registration.lock(db=db, id=registration_id)
+        if not db_registration:
+            await db.rollback()
+            return None
+        rendered = not db_registration.qr_code_url
+        if rendered:
+            db_registration.qr_code_url = await _generate_registration_qrcode(
+                registration_id=db_registration.id, event_id=db_registration.event_id
+            )
+        qr_code_url = db_registration.qr_code_url
+        event_id = db_registration.event_id
+        await db.commit()
+    if rendered:
+        await response_cache.invalidate_item(EVENTS, event_id)
+    return qr_code_url
+
+
+async def ensure_registration_qrcode(
+    registration_id: UUID, session_factory: Optional[SessionFactory] = None
+) -> Optional[str]:
+    """Get a registration's QR code URL, rendering it at most once per worker at a time."""
+    return await _qrcode_flights.do(
+        registration_id, lambda: _store_registration_qrcode(registration_id, session_factory)
+    )
+
+
+@job_handler(RENDER_QRCODE)
+async def _render_qrcode_job(payload: Dict[str, Any], session_factory: SessionFactory) -> None:
+    # A registration that already has its QR code, or is gone, is a no-op
+    await ensure_registration_qrcode(UUID(payload["registration_id"]), session_factory)
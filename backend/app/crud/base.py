@@ -1,13 +1,18 @@
 """
 Base CRUD operations that all other CRUD modules extend.
 """
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from uuid import UUID
 
+from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
 
 from app.core.database import Base
 
@@ -16,6 +21,44 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """
+    Encode a keyset position as an opaque cursor token.
+    
+    Args:
+        created_at: Creation time of the last row on the page
+        id: ID of the last row on the page
+        
+    Returns:
+        URL-safe cursor token
+    """
+    raw = json.dumps([created_at.isoformat(), id.hex]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor token produced by encode_cursor.
+    
+    Args:
+        cursor: Cursor token
+        
+    Returns:
+        The (created_at, id) position the cursor points at
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        if not isinstance(created_at, str) or not isinstance(id, str):
+            raise TypeError("Cursor fields must be strings")
+        return datetime.fromisoformat(created_at), UUID(hex=id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """Base class for CRUD operations."""
 
@@ -61,6 +104,121 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         result = await db.execute(query)
         return result.scalars().all()
 
+    def paginate(
+        self,
+        query: Select,
+        *,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Select:
+        """
+        Order a query newest first and restrict it to one page.
+        
+        Pages are keyed on (created_at, id) when a cursor is given, so deep
+        pages stay cheap and rows do not shift while others are writing.
+        Without a cursor the query falls back to skip/limit. One extra row
+        is fetched so next_page() can tell whether another page exists.
+        
+        Args:
+            query: Select over this CRUD's model
+            cursor: Cursor token from a previous page
+            skip: Number of records to skip when no cursor is given
+            limit: Maximum number of records to return
+            
+        Returns:
+            The paginated query
+        """
+        query = query.order_by(self.model.created_at.desc(), self.model.id.desc())
+        if cursor:
+            created_at, id = decode_cursor(cursor)
+            # Compare against the stored timestamp of the cursor row so the
+            # comparison does not depend on how the driver formats datetimes;
+            # fall back to the encoded value if that row has been deleted.
+            anchor = func.coalesce(
+                select(self.model.created_at)
+                .where(self.model.id == id)
+                .scalar_subquery(),
+                created_at,
+            )
+            query = query.where(
+                or_(
+                    self.model.created_at < anchor,
+                    and_(self.model.created_at == anchor, self.model.id < id),
+                )
+            )
+        elif skip:
+            query = query.offset(skip)
+        return query.limit(limit + 1)
+
+    def next_page(
+        self, rows: Sequence[ModelType], *, limit: int
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Split the rows of a paginated query into a page and the next cursor.
+        
+        Args:
+            rows: Rows returned by a query built with paginate()
+            limit: The limit passed to paginate()
+            
+        Returns:
+            The page and the cursor for the next page, or None on the last page
+        """
+        page = list(rows[:limit])
+        if len(rows) <= limit or not page:
+            return page, None
+        return page, encode_cursor(page[-1].created_at, page[-1].id)
+
+    def page_rows(
+        self, *, cursor: Optional[str] = None, skip: int = 0, limit: int = 100
+    ) -> Select:
+        """
+        Select the ID and updated_at of each object on one page.
+        
+        Used to version a list page without loading it. Like paginate(),
+        it includes the first object of the next page, which decides
+        whether the page has a next cursor.
+        
+        Args:
+            cursor: Cursor token from a previous page
+            skip: Number of records to skip when no cursor is given
+            limit: Maximum number of records to return
+            
+        Returns:
+            The paginated query
+        """
+        query = select(self.model.id, self.model.updated_at)
+        return self.paginate(query, cursor=cursor, skip=skip, limit=limit)
+
+    async def get_multi_page(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        query: Optional[Select] = None,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Get one page of objects, newest first.
+        
+        Args:
+            db: Database session
+            cursor: Cursor token from a previous page
+            skip: Number of records to skip when no cursor is given
+            limit: Maximum number of records to return
+            query: Select to paginate, e.g. with loader options; defaults to
+                every object of this model
+            
+        Returns:
+            The page and the cursor for the next page, or None on the last page
+        """
+        if query is None:
+            query = select(self.model)
+        query = self.paginate(query, cursor=cursor, skip=skip, limit=limit)
+        result = await db.execute(query)
+        return self.next_page(result.scalars().all(), limit=limit)
+
     async def create(
         self, db: AsyncSession, *, obj_in: CreateSchemaType
     ) -> ModelType:
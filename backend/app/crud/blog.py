@@ -1,7 +1,7 @@
 """
 CRUD operations for blog posts.
 """
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
 from uuid import UUID
 
 from sqlalchemy import select
@@ -38,27 +38,34 @@ class CRUDBlogPost(CRUDBase[BlogPost, BlogPostCreate, BlogPostUpdate]):
         return result.scalar_one_or_none()
     
     async def get_multi_with_author(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
-    ) -> List[BlogPost]:
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        options: Optional[Sequence[Any]] = None,
+    ) -> Tuple[List[BlogPost], Optional[str]]:
         """
-        Get multiple blog posts with author details.
+        Get one page of blog posts with author details, newest first.
         
         Args:
             db: Database session
-            skip: Number of records to skip
+            cursor: Cursor token from a previous page
+            skip: Number of records to skip when no cursor is given
             limit: Maximum number of records to return
+            options: Loader options for the posts, e.g. from load_options();
+                defaults to loading the author
             
         Returns:
-            List of blog posts with author details
+            List of blog posts with author details and the cursor for the next page
         """
-        query = (
-            select(BlogPost)
-            .options(joinedload(BlogPost.author))
-            .offset(skip)
-            .limit(limit)
+        if options is None:
+            options = [joinedload(BlogPost.author)]
+        query = select(BlogPost).options(*options)
+        return await self.get_multi_page(
+            db, cursor=cursor, skip=skip, limit=limit, query=query
         )
-        result = await db.execute(query)
-        return result.scalars().all()
     
     async def get_by_author(
         self, db: AsyncSession, *, author_id: UUID, skip: int = 0, limit: int = 100
@@ -1,15 +1,16 @@
 """
 CRUD operations for events.
 """
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import joinedload, with_expression
 
 from app.crud.base import CRUDBase
 from app.models.event import Event
+from app.models.registration import Registration, RegistrationStatus
 from app.schemas.event import EventCreate, EventUpdate
 
 
@@ -54,6 +55,64 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventUpdate]):
         result = await db.execute(query)
         return result.scalars().all()
     
+    async def get_multi_with_counts(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        options: Optional[Sequence[Any]] = None,
+    ) -> Tuple[List[Event], Optional[str]]:
+        """
+        Get one page of events with creator details and registration counts.
+        
+        The counts come from a grouped subquery joined into the same SELECT,
+        so listing events never loads registration rows unless asked to.
+        
+        Args:
+            db: Database session
+            cursor: Cursor token from a previous page
+            skip: Number of records to skip when no cursor is given
+            limit: Maximum number of records to return
+            options: Loader options for the events, e.g. from load_options();
+                defaults to loading the creator
+            
+        Returns:
+            Events with registration_count, checked_in_count and seats_left
+            populated, and the cursor for the next page
+        """
+        counts = (
+            select(
+                Registration.event_id,
+                func.count(Registration.id).label("registration_count"),
+                func.count(Registration.checkin_start).label("checked_in_count"),
+            )
+            .where(Registration.status == RegistrationStatus.CONFIRMED)
+            .group_by(Registration.event_id)
+            .subquery()
+        )
+        registration_count = func.coalesce(counts.c.registration_count, 0)
+        
+        if options is None:
+            options = [joinedload(Event.created_by)]
+        
+        query = (
+            select(Event)
+            .outerjoin(counts, counts.c.event_id == Event.id)
+            .options(
+                *options,
+                with_expression(Event.registration_count, registration_count),
+                with_expression(
+                    Event.checked_in_count, func.coalesce(counts.c.checked_in_count, 0)
+                ),
+                with_expression(Event.seats_left, Event.capacity - registration_count),
+            )
+        )
+        query = self.paginate(query, cursor=cursor, skip=skip, limit=limit)
+        result = await db.execute(query)
+        return self.next_page(result.scalars().all(), limit=limit)
+    
     async def get_by_creator(
         self, db: AsyncSession, *, creator_id: UUID, skip: int = 0, limit: int = 100
     ) -> List[Event]:
@@ -1,13 +1,14 @@
 """
 CRUD operations for gallery items.
 """
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Tuple, Union
 from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from app.core.images import GALLERY_IMAGE, queue_image_variants
 from app.crud.base import CRUDBase
 from app.models.gallery import Gallery
 from app.schemas.gallery import GalleryCreate
@@ -38,27 +39,29 @@ class CRUDGallery(CRUDBase[Gallery, GalleryCreate, Any]):
         return result.scalar_one_or_none()
     
     async def get_multi_with_uploader(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
-    ) -> List[Gallery]:
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> Tuple[List[Gallery], Optional[str]]:
         """
-        Get multiple gallery items with uploader details.
+        Get one page of gallery items with uploader details, newest first.
         
         Args:
             db: Database session
-            skip: Number of records to skip
+            cursor: Cursor token from a previous page
+            skip: Number of records to skip when no cursor is given
             limit: Maximum number of records to return
             
         Returns:
-            List of gallery items with uploader details
+            List of gallery items with uploader details and the cursor for the next page
         """
-        query = (
-            select(Gallery)
-            .options(joinedload(Gallery.uploaded_by))
-            .offset(skip)
-            .limit(limit)
+        query = select(Gallery).options(joinedload(Gallery.uploaded_by))
+        return await self.get_multi_page(
+            db, cursor=cursor, skip=skip, limit=limit, query=query
         )
-        result = await db.execute(query)
-        return result.scalars().all()
     
     async def create_with_uploader(
         self, db: AsyncSession, *, obj_in: GalleryCreate, uploader_id: UUID
@@ -66,6 +69,9 @@ class CRUDGallery(CRUDBase[Gallery, GalleryCreate, Any]):
         """
         Create a new gallery item with uploader.
         
+        The job rendering the image's variants is committed in the same
+        transaction, so no item is left without one.
+        
         Args:
             db: Database session
             obj_in: Gallery item create schema
@@ -79,6 +85,8 @@ class CRUDGallery(CRUDBase[Gallery, GalleryCreate, Any]):
             uploaded_by_id=uploader_id,
         )
         db.add(db_obj)
+        await db.flush()
+        queue_image_variants(db, GALLERY_IMAGE, db_obj, db_obj.image_url)
         await db.commit()
         await db.refresh(db_obj)
         return db_obj
@@ -1,24 +1,56 @@
 """
 CRUD operations for registrations.
 """
-from datetime import datetime
-from typing import List, Optional, Dict, Any, Union
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Dict, Any, Sequence, Tuple, Union
 from uuid import UUID
 
-from sqlalchemy import select
+from fastapi import HTTPException, status
+from sqlalchemy import Row, case, literal, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from app.core.jobs import RENDER_QRCODE, enqueue_job
 from app.crud.base import CRUDBase
-from app.models.registration import Registration, PaymentStatus
+from app.models.event import Event
+from app.models.registration import Registration, PaymentStatus, RegistrationStatus
+from app.models.user import User
 from app.schemas.registration import RegistrationCreate, RegistrationUpdate
 
 
+EXPORT_COLUMNS = (
+    "registration_id",
+    "name",
+    "email",
+    "status",
+    "payment_status",
+    "registered_at",
+    "checkin_start",
+    "checkin_end",
+)
+
+
+def _require_confirmed(db_obj: Registration) -> None:
+    # Waitlisted and cancelled registrations hold no seat, so cannot attend
+    if db_obj.status != RegistrationStatus.CONFIRMED:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only confirmed registrations can be checked in",
+        )
+
+
+def _queue_qrcode(db: AsyncSession, db_obj: Registration) -> None:
+    # Committed with the registration, so no registration is left without
+    # its job; GET /registrations/{id}/qr renders it if the job has not run yet
+    enqueue_job(db, RENDER_QRCODE, {"registration_id": str(db_obj.id)})
+
+
 class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUpdate]):
     """CRUD operations for registrations."""
     
     async def get_with_details(
-        self, db: AsyncSession, *, id: UUID
+        self, db: AsyncSession, *, id: UUID, options: Optional[Sequence[Any]] = None
     ) -> Optional[Registration]:
         """
         Get a registration by ID with event and user details.
@@ -26,13 +58,17 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
         Args:
             db: Database session
             id: Registration ID
+            options: Loader options, e.g. from load_options(); defaults to
+                loading the event and the user
             
         Returns:
             The registration with details if found, else None
         """
+        if options is None:
+            options = [joinedload(Registration.event), joinedload(Registration.user)]
         query = (
             select(Registration)
-            .options(joinedload(Registration.event), joinedload(Registration.user))
+            .options(*options)
             .where(Registration.id == id)
         )
         result = await db.execute(query)
@@ -60,7 +96,13 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
         return result.scalar_one_or_none()
     
     async def get_by_user(
-        self, db: AsyncSession, *, user_id: UUID, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        user_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+        options: Optional[Sequence[Any]] = None,
     ) -> List[Registration]:
         """
         Get registrations by user.
@@ -70,13 +112,17 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
             user_id: User ID
             skip: Number of records to skip
             limit: Maximum number of records to return
+            options: Loader options, e.g. from load_options(); defaults to
+                loading the event
             
         Returns:
             List of registrations by the user
         """
+        if options is None:
+            options = [joinedload(Registration.event)]
         query = (
             select(Registration)
-            .options(joinedload(Registration.event))
+            .options(*options)
             .where(Registration.user_id == user_id)
             .offset(skip)
             .limit(limit)
@@ -85,7 +131,13 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
         return result.scalars().all()
     
     async def get_by_event(
-        self, db: AsyncSession, *, event_id: UUID, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        event_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+        options: Optional[Sequence[Any]] = None,
     ) -> List[Registration]:
         """
         Get registrations by event.
@@ -95,13 +147,17 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
             event_id: Event ID
             skip: Number of records to skip
             limit: Maximum number of records to return
+            options: Loader options, e.g. from load_options(); defaults to
+                loading the user
             
         Returns:
             List of registrations for the event
         """
+        if options is None:
+            options = [joinedload(Registration.user)]
         query = (
             select(Registration)
-            .options(joinedload(Registration.user))
+            .options(*options)
             .where(Registration.event_id == event_id)
             .offset(skip)
             .limit(limit)
@@ -109,6 +165,44 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
         result = await db.execute(query)
         return result.scalars().all()
     
+    async def stream_export_rows(
+        self, db: AsyncSession, *, event_id: UUID, batch_size: int = 1000
+    ) -> AsyncIterator[Row]:
+        """
+        Stream flat attendee rows for an event through a server-side cursor.
+        
+        Only batch_size rows are buffered at a time, and rows are plain
+        tuples rather than ORM objects, so memory stays flat however large
+        the event is.
+        
+        Args:
+            db: Database session, kept open while iterating
+            event_id: Event ID
+            batch_size: Rows fetched from the cursor at a time
+            
+        Yields:
+            Rows of EXPORT_COLUMNS
+        """
+        query = (
+            select(
+                Registration.id,
+                User.name,
+                User.email,
+                Registration.status,
+                Registration.payment_status,
+                Registration.created_at,
+                Registration.checkin_start,
+                Registration.checkin_end,
+            )
+            .join(User, Registration.user_id == User.id)
+            .where(Registration.event_id == event_id)
+            .order_by(Registration.created_at, Registration.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await db.stream(query)
+        async for row in result:
+            yield row
+    
     async def create_with_user(
         self, db: AsyncSession, *, obj_in: RegistrationCreate, user_id: UUID
     ) -> Registration:
@@ -132,6 +226,276 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
         await db.refresh(db_obj)
         return db_obj
     
+    async def register(
+        self, db: AsyncSession, *, event_id: UUID, user_id: UUID
+    ) -> Registration:
+        """
+        Register a user for an event, joining the waitlist when it is full.
+        
+        The common case claims a seat with a single conditional UPDATE on the
+        event row, which locks that row until commit, so concurrent
+        registrations can never push an event past its capacity. The unique
+        constraint on (event_id, user_id) rejects duplicates; the failed
+        insert rolls back the claimed seat with it. The job rendering the
+        registration's QR code is committed in the same transaction.
+        
+        Args:
+            db: Database session
+            event_id: Event ID
+            user_id: User ID
+            
+        Returns:
+            Created registration, either confirmed or waitlisted
+            
+        Raises:
+            HTTPException: 404 if the event does not exist, 400 if the user is
+                already registered
+        """
+        claim_seat = (
+            update(Event)
+            .where(Event.id == event_id, Event.seats_taken < Event.capacity)
+            .values(seats_taken=Event.seats_taken + 1)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(claim_seat)
+        if result.rowcount == 1:
+            db_obj = Registration(
+                event_id=event_id, user_id=user_id, status=RegistrationStatus.CONFIRMED
+            )
+            db.add(db_obj)
+            try:
+                await db.flush()
+                _queue_qrcode(db, db_obj)
+                await db.commit()
+                await db.refresh(db_obj)
+                return db_obj
+            except IntegrityError:
+                # An earlier (possibly cancelled) registration exists
+                await db.rollback()
+        else:
+            await db.rollback()
+        
+        return await self._register_under_event_lock(db, event_id=event_id, user_id=user_id)
+    
+    async def _register_under_event_lock(
+        self, db: AsyncSession, *, event_id: UUID, user_id: UUID
+    ) -> Registration:
+        """
+        Register a user while holding the event row lock.
+        
+        Handles the slow paths of register(): full events, duplicates and
+        re-registering after a cancellation.
+        """
+        db_event = await self._lock_event(db, event_id=event_id)
+        if not db_event:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Event not found",
+            )
+        
+        db_obj = await self.get_by_event_and_user(db, event_id=event_id, user_id=user_id)
+        if db_obj and db_obj.status != RegistrationStatus.CANCELLED:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already registered for this event",
+            )
+        if not db_obj:
+            db_obj = Registration(event_id=event_id, user_id=user_id)
+            db.add(db_obj)
+        
+        # A seat may have been released since the fast path gave up
+        if db_event.seats_taken < db_event.capacity:
+            db_event.seats_taken += 1
+            db_obj.status = RegistrationStatus.CONFIRMED
+            db_obj.waitlisted_at = None
+        else:
+            db_obj.status = RegistrationStatus.WAITLISTED
+            db_obj.waitlisted_at = datetime.now(timezone.utc)
+        db_obj.payment_status = PaymentStatus.PENDING
+        db_obj.checkin_start = None
+        db_obj.checkin_end = None
+        
+        try:
+            await db.flush()
+            _queue_qrcode(db, db_obj)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already registered for this event",
+            )
+        await db.refresh(db_obj)
+        return db_obj
+    
+    async def cancel(
+        self, db: AsyncSession, *, db_obj: Registration
+    ) -> Optional[Registration]:
+        """
+        Cancel a registration and hand its seat to the head of the waitlist.
+        
+        Every change to an event's seats happens under its row lock, so
+        concurrent cancellations promote distinct waitlisted registrations and
+        never leak or double-count a seat. The head of the waitlist is found
+        through the (event_id, status, waitlisted_at) index, without scanning
+        the event's registrations.
+        
+        Args:
+            db: Database session
+            db_obj: Registration to cancel
+            
+        Returns:
+            The registration promoted from the waitlist, if any
+            
+        Raises:
+            HTTPException: 400 if the registration is already cancelled
+        """
+        db_event = await self._lock_event(db, event_id=db_obj.event_id)
+        # Re-read under the lock; a concurrent cancellation may have promoted it
+        await db.refresh(db_obj)
+        if db_obj.status == RegistrationStatus.CANCELLED:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Registration already cancelled",
+            )
+        
+        held_seat = db_obj.status == RegistrationStatus.CONFIRMED
+        db_obj.status = RegistrationStatus.CANCELLED
+        db_obj.waitlisted_at = None
+        if db_obj.payment_status == PaymentStatus.COMPLETED:
+            db_obj.payment_status = PaymentStatus.REFUNDED
+        
+        promoted = None
+        if held_seat:
+            query = (
+                select(Registration)
+                .where(
+                    Registration.event_id == db_obj.event_id,
+                    Registration.status == RegistrationStatus.WAITLISTED,
+                )
+                .order_by(Registration.waitlisted_at, Registration.id)
+                .limit(1)
+            )
+            promoted = await db.scalar(query)
+            if promoted:
+                promoted.status = RegistrationStatus.CONFIRMED
+                promoted.waitlisted_at = None
+            else:
+                db_event.seats_taken -= 1
+        
+        await db.commit()
+        await db.refresh(db_obj)
+        if promoted:
+            await db.refresh(promoted)
+        return promoted
+    
+    async def set_capacity(
+        self, db: AsyncSession, *, event_id: UUID, capacity: int
+    ) -> List[Registration]:
+        """
+        Change an event's capacity and hand any new seats to the waitlist.
+        
+        Runs under the event's row lock, like register and cancel, so new
+        seats go to the head of the waitlist in waitlisted_at order rather
+        than to whoever registers next. Pending changes to the event in the
+        session are committed with it.
+        
+        Args:
+            db: Database session
+            event_id: Event ID
+            capacity: New capacity
+            
+        Returns:
+            The registrations promoted from the waitlist
+            
+        Raises:
+            HTTPException: 400 if capacity is below the seats already taken
+        """
+        # Locking reloads the event, which would drop unflushed changes
+        await db.flush()
+        db_event = await self._lock_event(db, event_id=event_id)
+        seats_taken = db_event.seats_taken
+        if capacity < seats_taken:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Capacity cannot be below the {seats_taken} seats already taken",
+            )
+        
+        db_event.capacity = capacity
+        promoted: List[Registration] = []
+        free = capacity - seats_taken
+        if free > 0:
+            query = (
+                select(Registration)
+                .where(
+                    Registration.event_id == event_id,
+                    Registration.status == RegistrationStatus.WAITLISTED,
+                )
+                .order_by(Registration.waitlisted_at, Registration.id)
+                .limit(free)
+            )
+            promoted = list(await db.scalars(query))
+            for db_obj in promoted:
+                db_obj.status = RegistrationStatus.CONFIRMED
+                db_obj.waitlisted_at = None
+            db_event.seats_taken += len(promoted)
+        
+        await db.commit()
+        return promoted
+    
+    async def lock(self, db: AsyncSession, *, id: UUID) -> Optional[Registration]:
+        """
+        Load a registration with its row locked until the transaction ends.
+        
+        Uses the same no-op UPDATE as _lock_event.
+        
+        Args:
+            db: Database session
+            id: Registration ID
+            
+        Returns:
+            The locked registration, or None if it does not exist
+        """
+        lock = (
+            update(Registration)
+            .where(Registration.id == id)
+            .values(qr_code_url=Registration.qr_code_url)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(lock)
+        query = (
+            select(Registration)
+            .where(Registration.id == id)
+            .execution_options(populate_existing=True)
+        )
+        return await db.scalar(query)
+    
+    async def _lock_event(self, db: AsyncSession, *, event_id: UUID) -> Optional[Event]:
+        """
+        Load an event with its row locked until the transaction ends.
+        
+        The lock is taken with a no-op UPDATE rather than SELECT ... FOR UPDATE:
+        on PostgreSQL it does not block the foreign-key checks of concurrent
+        registration inserts, and on SQLite it starts the write transaction
+        that serializes seat changes.
+        """
+        lock = (
+            update(Event)
+            .where(Event.id == event_id)
+            .values(seats_taken=Event.seats_taken)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(lock)
+        query = (
+            select(Event)
+            .where(Event.id == event_id)
+            .execution_options(populate_existing=True)
+        )
+        return await db.scalar(query)
+    
     async def update_payment_status(
         self, db: AsyncSession, *, db_obj: Registration, status: PaymentStatus
     ) -> Registration:
@@ -162,11 +526,68 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
             
         Returns:
             Updated registration
+            
+        Raises:
+            HTTPException: 400 if the registration is not confirmed
         """
+        _require_confirmed(db_obj)
         return await super().update(
             db=db, db_obj=db_obj, obj_in={"checkin_start": datetime.now()}
         )
     
+    async def bulk_check_in(
+        self, db: AsyncSession, *, event_id: UUID, scans: Dict[UUID, datetime]
+    ) -> Dict[UUID, Tuple[datetime, bool]]:
+        """
+        Set the check-in start of many confirmed registrations in one UPDATE.
+        
+        Registrations that already have a check-in start keep it, so
+        re-submitting the same scans changes nothing.
+        
+        Args:
+            db: Database session
+            event_id: Event the registrations must belong to
+            scans: Registration ID -> time it was scanned
+            
+        Returns:
+            Registration ID -> (check-in start, whether this call set it) for
+            every scanned confirmed registration of the event
+        """
+        scanned_at = {
+            id: literal(at, Registration.checkin_start.type) for id, at in scans.items()
+        }
+        checked_in = (
+            update(Registration)
+            .where(
+                Registration.id.in_(scans),
+                Registration.event_id == event_id,
+                Registration.status == RegistrationStatus.CONFIRMED,
+                Registration.checkin_start.is_(None),
+            )
+            .values(checkin_start=case(scanned_at, value=Registration.id))
+            .returning(Registration.id, Registration.checkin_start)
+            .execution_options(synchronize_session=False)
+        )
+        results = {
+            id: (checkin_start, True) for id, checkin_start in await db.execute(checked_in)
+        }
+        
+        remaining = [id for id in scans if id not in results]
+        if remaining:
+            already = (
+                select(Registration.id, Registration.checkin_start)
+                .where(
+                    Registration.id.in_(remaining),
+                    Registration.event_id == event_id,
+                    Registration.status == RegistrationStatus.CONFIRMED,
+                )
+            )
+            for id, checkin_start in await db.execute(already):
+                results[id] = (checkin_start, False)
+        
+        await db.commit()
+        return results
+    
     async def mark_checkin_end(
         self, db: AsyncSession, *, db_obj: Registration
     ) -> Registration:
@@ -179,7 +600,11 @@ class CRUDRegistration(CRUDBase[Registration, RegistrationCreate, RegistrationUp
             
         Returns:
             Updated registration
+            
+        Raises:
+            HTTPException: 400 if the registration is not confirmed
         """
+        _require_confirmed(db_obj)
         return await super().update(
             db=db, db_obj=db_obj, obj_in={"checkin_end": datetime.now()}
         )
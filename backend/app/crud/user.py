@@ -1,20 +1,35 @@
 """
 CRUD operations for users.
 """
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Type, Union, Dict, Any
 from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.crud.base import CRUDBase
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
+from app.schemas.user import CurrentUser, UserCreate, UserUpdate
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     """CRUD operations for users."""
     
+    def __init__(self, model: Type[User]):
+        """
+        Initialize with the user model and an identity cache.
+        
+        Args:
+            model: The SQLAlchemy model
+        """
+        super().__init__(model)
+        # email -> CurrentUser for the request-scoped user dependency
+        self.identity_cache = TTLCache(
+            maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+        )
+    
     async def get_by_email(self, db: AsyncSession, *, email: str) -> Optional[User]:
         """
         Get a user by email.
@@ -30,6 +45,27 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         result = await db.execute(query)
         return result.scalar_one_or_none()
     
+    async def get_identity(self, db: AsyncSession, *, email: str) -> Optional[CurrentUser]:
+        """
+        Get a user's id and role by email, cached for USER_CACHE_TTL_SECONDS.
+        
+        Args:
+            db: Database session
+            email: User email
+            
+        Returns:
+            The user's identity if found, else None
+        """
+        identity = self.identity_cache.get(email)
+        if identity is None:
+            query = select(User.id, User.email, User.role).where(User.email == email)
+            row = (await db.execute(query)).one_or_none()
+            if row is None:
+                return None
+            identity = CurrentUser(id=row.id, email=row.email, role=row.role)
+            self.identity_cache.set(email, identity)
+        return identity
+    
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         """
         Create a new user.
@@ -69,7 +105,25 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         Returns:
             Updated user
         """
-        return await super().update(db=db, db_obj=db_obj, obj_in=obj_in)
+        old_email = db_obj.email
+        db_obj = await super().update(db=db, db_obj=db_obj, obj_in=obj_in)
+        self.identity_cache.delete(old_email, db_obj.email)
+        return db_obj
+    
+    async def remove(self, db: AsyncSession, *, id: UUID) -> User:
+        """
+        Delete a user.
+        
+        Args:
+            db: Database session
+            id: User ID
+            
+        Returns:
+            Deleted user
+        """
+        db_obj = await super().remove(db=db, id=id)
+        self.identity_cache.delete(db_obj.email)
+        return db_obj
 
 
 user = CRUDUser(User)
\ No newline at end of file
@@ -3,12 +3,39 @@ SPARC Club Web Platform Backend
 -------------------------------
 Main application entry point with FastAPI initialization.
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 
 from app.api.api import api_router
+from app.core.auth import TokenPayload, get_current_admin_user, jwks_store
 from app.core.config import settings
+from app.core.database import dispose_engines, pool_stats, publish_pool_gauges
+from app.core.jobs import job_stats
+from app.core.metrics import CONTENT_TYPE_LATEST, render_metrics
+from app.core.middleware import (
+    PrometheusMiddleware, QueryStatsMiddleware, ReadYourWritesMiddleware,
+    UploadSizeLimitMiddleware,
+)
+from app.core.qrcode_utils import renderer
+from app.core.response_cache import response_cache
+from app.core.serialization import ORJSONResponse
+from app.core.storage import storage
+from app.core.tickets import check_signing_key
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Check the configuration on start-up; release shared clients when the worker shuts down."""
+    check_signing_key()
+    yield
+    await jwks_store.aclose()
+    renderer.close()
+    storage.close()
+    await dispose_engines()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -16,6 +43,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Set up CORS
@@ -25,11 +54,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-DB-Queries", "X-Cache", "ETag"],
+)
+
+# Turn away oversized uploads before they are spooled; allow for multipart framing
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_body_size=settings.MAX_UPLOAD_SIZE + 64 * 1024,
+)
+
+# Per-request query counts and N+1 warnings
+app.add_middleware(
+    QueryStatsMiddleware,
+    header=settings.DB_QUERY_STATS_HEADER,
+    repeated_threshold=settings.DB_REPEATED_QUERY_THRESHOLD,
 )
 
+# Send a client's reads to the primary right after it writes
+if settings.DATABASE_REPLICA_URIS:
+    app.add_middleware(ReadYourWritesMiddleware, max_age=settings.READ_YOUR_WRITES_SECONDS)
+
+# Request latency histograms and in-flight gauges for /metrics
+app.add_middleware(PrometheusMiddleware)
+
 # Include all API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics, aggregated across workers in multiprocess mode."""
+    publish_pool_gauges()
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+# Per-worker diagnostics, for admins only; scrapers use /metrics
+@app.get("/metrics/pool", include_in_schema=False)
+async def database_pool_metrics(current_user: TokenPayload = Depends(get_current_admin_user)):
+    """Database pool occupancy and checkout wait times for this worker."""
+    return pool_stats()
+
+
+@app.get("/metrics/response-cache", include_in_schema=False)
+async def response_cache_metrics(current_user: TokenPayload = Depends(get_current_admin_user)):
+    """Response cache hit ratio and size for this worker."""
+    return response_cache.stats()
+
+
+@app.get("/metrics/jobs", include_in_schema=False)
+async def job_queue_metrics(current_user: TokenPayload = Depends(get_current_admin_user)):
+    """Background jobs run by outcome and in flight, from the job metrics."""
+    return job_stats()
+
+
 @app.get("/", include_in_schema=False)
 async def root():
     """Welcome message."""
@@ -6,7 +6,8 @@ from app.core.database import Base
 from app.models.blog import BlogPost
 from app.models.event import Event
 from app.models.gallery import Gallery
-from app.models.registration import Registration, PaymentStatus
+from app.models.job import Job, JobStatus
+from app.models.registration import Registration, PaymentStatus, RegistrationStatus
 from app.models.user import User, UserRole
 
 __all__ = [
@@ -16,6 +17,9 @@ __all__ = [
     "Event",
     "Registration",
     "PaymentStatus",
+    "RegistrationStatus",
     "BlogPost",
     "Gallery",
+    "Job",
+    "JobStatus",
 ]
\ No newline at end of file
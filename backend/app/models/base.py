@@ -14,4 +14,7 @@ class Base:
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    # Indexed so that max(updated_at), which ETags are built from, is an index lookup
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True
+    )
\ No newline at end of file
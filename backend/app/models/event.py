@@ -1,9 +1,9 @@
 """
 Event model.
 """
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, Column, DateTime, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import query_expression, relationship
 
 from app.core.database import Base
 from app.models.base import Base as BaseModel
@@ -20,11 +20,19 @@ class Event(Base, BaseModel):
     is_paid = Column(Boolean, default=False)
     price = Column(Integer, default=0)
     capacity = Column(Integer, nullable=False)
+    # Seats claimed by registrations, maintained atomically alongside inserts
+    seats_taken = Column(Integer, nullable=False, default=0, server_default="0")
     cover_image_url = Column(String(512), nullable=True)
+    cover_image_variants = Column(JSON, nullable=True)
     
     # Foreign Keys
     created_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     
+    # Aggregates populated by listing queries through with_expression()
+    registration_count = query_expression()
+    checked_in_count = query_expression()
+    seats_left = query_expression()
+    
     # Relationships
     created_by = relationship("User", back_populates="events")
     registrations = relationship("Registration", back_populates="event", cascade="all, delete-orphan")
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 Gallery model for image uploads.
 """
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import JSON, Column, ForeignKey, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -14,6 +14,8 @@ class Gallery(Base, BaseModel):
     __tablename__ = "gallery"
     
     image_url = Column(String(512), nullable=False)
+    # Resized copies by size name; null until the job worker has rendered them
+    image_variants = Column(JSON, nullable=True)
     
     # Foreign Keys
     uploaded_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,43 @@
+"""
+Job model for the background job queue.
+"""
+from enum import Enum
+
+from sqlalchemy import JSON, Column, DateTime, Enum as SQLAEnum, Index, Integer, String, Text, func
+
+from app.core.database import Base
+from app.models.base import Base as BaseModel
+
+
+class JobStatus(str, Enum):
+    """Enum for job status."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+
+
+class Job(Base, BaseModel):
+    """A unit of background work, run by python -m app.worker."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim due jobs in run_at order
+        Index("ix_jobs_claim", "status", "run_at"),
+    )
+    
+    kind = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(
+        SQLAEnum(JobStatus),
+        nullable=False,
+        default=JobStatus.QUEUED,
+        server_default=JobStatus.QUEUED.name,
+    )
+    
+    # Retries
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    
+    # A running job whose lease has expired belongs to a worker that died
+    locked_until = Column(DateTime(timezone=True), nullable=True)
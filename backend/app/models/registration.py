@@ -3,7 +3,7 @@ Registration model for event registrations.
 """
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, Enum as SQLAEnum, ForeignKey, String
+from sqlalchemy import Column, DateTime, Enum as SQLAEnum, ForeignKey, Index, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -19,17 +19,36 @@ class PaymentStatus(str, Enum):
     REFUNDED = "refunded"
 
 
+class RegistrationStatus(str, Enum):
+    """Enum for registration status."""
+    CONFIRMED = "confirmed"
+    WAITLISTED = "waitlisted"
+    CANCELLED = "cancelled"
+
+
 class Registration(Base, BaseModel):
     """Registration model for events."""
     __tablename__ = "registrations"
+    __table_args__ = (
+        UniqueConstraint("event_id", "user_id", name="uq_registrations_event_user"),
+        # Head of an event's waitlist is a single index lookup
+        Index("ix_registrations_waitlist", "event_id", "status", "waitlisted_at"),
+    )
     
     # Foreign Keys
-    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id"), nullable=False)
+    event_id = Column(UUID(as_uuid=True), ForeignKey("events.id"), nullable=False, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Registration details
     qr_code_url = Column(String(512), nullable=True)
     payment_status = Column(SQLAEnum(PaymentStatus), default=PaymentStatus.PENDING)
+    status = Column(
+        SQLAEnum(RegistrationStatus),
+        nullable=False,
+        default=RegistrationStatus.CONFIRMED,
+        server_default=RegistrationStatus.CONFIRMED.name,
+    )
+    waitlisted_at = Column(DateTime(timezone=True), nullable=True)
     
     # Attendance tracking
     checkin_start = Column(DateTime(timezone=True), nullable=True)
@@ -3,7 +3,7 @@ User model for the application.
 """
 from enum import Enum
 
-from sqlalchemy import Column, Enum as SQLAEnum, String, Text
+from sqlalchemy import JSON, Column, Enum as SQLAEnum, String, Text
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -28,6 +28,7 @@ class User(Base, BaseModel):
     year = Column(String(10), nullable=True)
     role = Column(SQLAEnum(UserRole), nullable=False, default=UserRole.MEMBER)
     profile_pic_url = Column(String(512), nullable=True)
+    profile_pic_variants = Column(JSON, nullable=True)
     
     # Relationships
     events = relationship("Event", back_populates="created_by")
@@ -4,29 +4,42 @@ Import all schemas for easy access.
 from app.schemas.base import BaseSchema, BaseSchemaInDB
 from app.schemas.blog import BlogPost, BlogPostCreate, BlogPostUpdate, BlogPostWithAuthor
 from app.schemas.event import (
-    Event, EventCreate, EventUpdate, EventWithRelations
+    Event, EventCreate, EventUpdate, EventWithCounts, EventWithCountsAndRegistrations,
+    EventWithRelations,
 )
 from app.schemas.gallery import Gallery, GalleryCreate, GalleryWithUploader
+from app.schemas.image import ImageVariant, ImageVariants
 from app.schemas.registration import (
-    Registration, RegistrationCreate, RegistrationUpdate, RegistrationWithDetails
+    BulkCheckIn, CheckInResult, CheckInScan, CheckInStatus, ExportFormat, Registration, RegistrationCreate,
+    RegistrationUpdate, RegistrationWithDetails, TicketCheckIn,
 )
-from app.schemas.user import User, UserCreate, UserUpdate
+from app.schemas.upload import UploadConfirm, UploadSlot, UploadSlotRequest
+from app.schemas.user import CurrentUser, User, UserCreate, UserUpdate
 
 __all__ = [
     "BaseSchema",
     "BaseSchemaInDB",
+    "CurrentUser",
     "User",
     "UserCreate",
     "UserUpdate",
     "Event",
     "EventCreate", 
     "EventUpdate",
+    "EventWithCounts",
+    "EventWithCountsAndRegistrations",
         # Backwards-compat alias
         "EventWithCreator",
     "Registration",
     "RegistrationCreate",
     "RegistrationUpdate",
     "RegistrationWithDetails",
+    "TicketCheckIn",
+    "BulkCheckIn",
+    "CheckInResult",
+    "CheckInScan",
+    "CheckInStatus",
+    "ExportFormat",
     "BlogPost",
     "BlogPostCreate",
     "BlogPostUpdate",
@@ -34,6 +47,11 @@ __all__ = [
     "Gallery",
     "GalleryCreate",
     "GalleryWithUploader",
+    "ImageVariant",
+    "ImageVariants",
+    "UploadConfirm",
+    "UploadSlot",
+    "UploadSlotRequest",
 ]
 
 # Backwards-compatibility: provide EventWithCreator name
@@ -45,6 +63,12 @@ try:
 except Exception:
     pass
 
+try:
+    EventWithCounts.model_rebuild()
+    EventWithCountsAndRegistrations.model_rebuild()
+except Exception:
+    pass
+
 try:
     RegistrationWithDetails.model_rebuild()
 except Exception:
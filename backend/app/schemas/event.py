@@ -7,6 +7,7 @@ from uuid import UUID
 
 from pydantic import Field
 from app.schemas.base import BaseSchema, BaseSchemaInDB
+from app.schemas.image import ImageVariants
 
 if TYPE_CHECKING:
     # Imports here are only for type checking to avoid circular runtime imports
@@ -46,6 +47,7 @@ class EventUpdate(BaseSchema):
 class EventInDB(EventBase, BaseSchemaInDB):
     """Schema for event data stored in DB."""
     created_by_id: UUID
+    cover_image_variants: Optional[ImageVariants] = None
 
 
 class Event(EventInDB):
@@ -61,6 +63,20 @@ class EventWithRelations(Event):
     class Config:
         orm_mode = True
 
+
+class EventWithCounts(Event):
+    """Schema for event listings with creator and aggregated registration counts."""
+    created_by: "User"
+    registration_count: int = 0
+    checked_in_count: int = 0
+    seats_left: int = 0
+
+
+class EventWithCountsAndRegistrations(EventWithCounts):
+    """Schema for event listings that also embed every registration."""
+    registrations: list["Registration"]
+
+
 # If using forward refs, ensure models are updated (for pydantic v1 compatibility)
 try:
     EventWithRelations.model_rebuild()
@@ -7,6 +7,7 @@ from uuid import UUID
 from pydantic import Field
 
 from app.schemas.base import BaseSchema, BaseSchemaInDB
+from app.schemas.image import ImageVariants
 from app.schemas.user import User
 
 
@@ -23,7 +24,7 @@ class GalleryCreate(BaseSchema):
 
 class GalleryInDB(GalleryBase, BaseSchemaInDB):
     """Schema for gallery data stored in DB."""
-    pass
+    image_variants: Optional[ImageVariants] = None
 
 
 class Gallery(GalleryInDB):
@@ -0,0 +1,18 @@
+"""
+Image variant schemas.
+"""
+from typing import Dict
+
+from app.schemas.base import BaseSchema
+
+
+class ImageVariant(BaseSchema):
+    """Schema for a resized copy of an uploaded image, as WebP and as JPEG."""
+    width: int
+    height: int
+    webp: str
+    jpeg: str
+
+
+# Size name (thumb, medium, large) -> variant
+ImageVariants = Dict[str, ImageVariant]
@@ -2,12 +2,13 @@
 Registration schemas.
 """
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
+from enum import Enum
+from typing import List, Optional, TYPE_CHECKING
 from uuid import UUID
 
 from pydantic import Field
 
-from app.models.registration import PaymentStatus
+from app.models.registration import PaymentStatus, RegistrationStatus
 from app.schemas.base import BaseSchema, BaseSchemaInDB
 
 if TYPE_CHECKING:
@@ -22,6 +23,8 @@ class RegistrationBase(BaseSchema):
     user_id: UUID
     qr_code_url: Optional[str] = None
     payment_status: PaymentStatus = PaymentStatus.PENDING
+    status: RegistrationStatus = RegistrationStatus.CONFIRMED
+    waitlisted_at: Optional[datetime] = None
     checkin_start: Optional[datetime] = None
     checkin_end: Optional[datetime] = None
 
@@ -38,6 +41,45 @@ class RegistrationUpdate(BaseSchema):
     checkin_end: Optional[datetime] = None
 
 
+class TicketCheckIn(BaseSchema):
+    """Schema for checking in with a scanned QR ticket."""
+    ticket: str
+
+
+class CheckInScan(BaseSchema):
+    """Schema for one scan in a bulk check-in."""
+    ticket: str
+    scanned_at: Optional[datetime] = None
+
+
+class BulkCheckIn(BaseSchema):
+    """Schema for a batch of scans flushed by a door scanner."""
+    scans: List[CheckInScan] = Field(..., min_length=1, max_length=1000)
+
+
+class CheckInStatus(str, Enum):
+    """Outcome of one scan in a bulk check-in."""
+    CHECKED_IN = "checked_in"
+    ALREADY_CHECKED_IN = "already_checked_in"
+    NOT_FOUND = "not_found"
+    WRONG_EVENT = "wrong_event"
+    INVALID = "invalid"
+
+
+class CheckInResult(BaseSchema):
+    """Schema for the result of one scan in a bulk check-in."""
+    ticket: str
+    status: CheckInStatus
+    registration_id: Optional[UUID] = None
+    checkin_start: Optional[datetime] = None
+
+
+class ExportFormat(str, Enum):
+    """Formats for exporting an event's registrations."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
 class RegistrationInDB(RegistrationBase, BaseSchemaInDB):
     """Schema for registration data stored in DB."""
     pass
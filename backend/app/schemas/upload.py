@@ -0,0 +1,25 @@
+"""
+Direct-upload schemas.
+"""
+from typing import Dict, Optional
+
+from app.schemas.base import BaseSchema
+
+
+class UploadSlotRequest(BaseSchema):
+    """Schema for requesting a direct-upload slot."""
+    filename: str
+    content_type: Optional[str] = None
+
+
+class UploadSlot(BaseSchema):
+    """Schema for a presigned PUT the client uploads to."""
+    upload_url: str
+    object_key: str
+    headers: Dict[str, str] = {}
+    expires_in: int
+
+
+class UploadConfirm(BaseSchema):
+    """Schema for confirming a finished direct upload."""
+    object_key: str
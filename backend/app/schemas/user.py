@@ -1,12 +1,14 @@
 """
 User schema models.
 """
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 
 from pydantic import EmailStr, Field
 
 from app.models.user import UserRole
 from app.schemas.base import BaseSchema, BaseSchemaInDB
+from app.schemas.image import ImageVariants
 
 
 class UserBase(BaseSchema):
@@ -36,9 +38,17 @@ class UserUpdate(BaseSchema):
 
 class UserInDB(UserBase, BaseSchemaInDB):
     """Schema for user data stored in DB."""
-    pass
+    profile_pic_variants: Optional[ImageVariants] = None
 
 
 class User(UserInDB):
     """Schema for returning user data."""
-    pass
\ No newline at end of file
+    pass
+
+
+class CurrentUser(BaseSchema):
+    """Schema for the authenticated user resolved against the database."""
+    id: UUID
+    email: str
+    role: UserRole
+    cognito_groups: List[str] = []
@@ -0,0 +1,69 @@
+"""
+Background job worker.
+
+Runs the jobs queued in the database (QR code renders, image variants,
+storage cleanup) until SIGINT or SIGTERM, finishing the jobs in flight
+before exiting. Run as many workers as needed next to the API:
+
+    python -m app.worker [--concurrency 4] [--metrics-port 9100]
+"""
+import argparse
+import asyncio
+import logging
+import signal
+from typing import Optional
+
+from prometheus_client import start_http_server
+
+# Importing these modules registers their job handlers
+import app.core.images  # noqa: F401
+import app.core.storage  # noqa: F401
+import app.core.ticket_qrcodes  # noqa: F401
+from app.core.config import settings
+from app.core.database import dispose_engines
+from app.core.images import image_renderer
+from app.core.jobs import JobWorker
+from app.core.qrcode_utils import renderer
+from app.core.storage import storage
+from app.core.tickets import check_signing_key
+
+logger = logging.getLogger("app.worker")
+
+
+async def run(concurrency: int, metrics_port: Optional[int]) -> None:
+    """Run jobs until the process is told to stop."""
+    check_signing_key()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    if metrics_port:
+        start_http_server(metrics_port)
+
+    worker = JobWorker(
+        concurrency=concurrency,
+        poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+        lease=settings.JOB_LEASE_SECONDS,
+    )
+    logger.info("Job worker started with concurrency %d", concurrency)
+    try:
+        await worker.run(stop)
+    finally:
+        renderer.close()
+        image_renderer.close()
+        storage.close()
+        await dispose_engines()
+    logger.info("Job worker stopped")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run queued background jobs.")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_CONCURRENCY)
+    parser.add_argument("--metrics-port", type=int, default=None, help="Serve /metrics on this port")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    asyncio.run(run(args.concurrency, args.metrics_port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""
+Benchmarks for hot API paths.
+
+Run from the backend directory, e.g. ``python -m benchmarks.event_listing``.
+"""
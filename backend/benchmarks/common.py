@@ -0,0 +1,133 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List
+
+# Benchmarks always run against a throwaway SQLite database unless told otherwise
+_DEFAULT_DB = os.path.join(tempfile.gettempdir(), f"sparc-bench-{uuid.uuid4().hex}.db")
+os.environ.setdefault("DATABASE_URI", f"sqlite+aiosqlite:///{_DEFAULT_DB}")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, engine  # noqa: E402
+from app.models import Base, Event, Registration, User  # noqa: E402
+
+# Statement logging would dominate the timings
+engine.echo = False
+
+
+async def reset_database() -> None:
+    """Drop and recreate every table."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def seed_events(*, events: int, registrations: int) -> List[uuid.UUID]:
+    """
+    Seed events with registrations spread evenly across them.
+    
+    Args:
+        events: Number of events to create
+        registrations: Total number of registrations (one user each)
+        
+    Returns:
+        IDs of the created events
+    """
+    now = datetime.now(timezone.utc)
+    host_id = uuid.uuid4()
+    event_ids = [uuid.uuid4() for _ in range(events)]
+    user_rows = [
+        {"id": uuid.uuid4(), "name": f"Member {i}", "email": f"member{i}@example.com"}
+        for i in range(registrations)
+    ]
+    
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(User), [{"id": host_id, "name": "Host", "email": "host@example.com"}]
+        )
+        await db.execute(
+            insert(Event),
+            [
+                {
+                    "id": event_id,
+                    "title": f"Event {i}",
+                    "date_time": now + timedelta(days=i),
+                    "venue": "Main hall",
+                    "capacity": registrations,
+                    "created_by_id": host_id,
+                }
+                for i, event_id in enumerate(event_ids)
+            ],
+        )
+        await db.execute(insert(User), user_rows)
+        await db.execute(
+            insert(Registration),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "event_id": event_ids[i % events],
+                    "user_id": row["id"],
+                    "checkin_start": now if i % 3 == 0 else None,
+                }
+                for i, row in enumerate(user_rows)
+            ],
+        )
+        await db.commit()
+    return event_ids
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Return the given percentile (0-100) of the samples."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def time_async(
+    fn: Callable[[], Awaitable[object]], *, iterations: int, warmup: int = 2
+) -> Dict[str, float]:
+    """
+    Time an async callable.
+    
+    Returns:
+        Mean, p50 and p95 latency in milliseconds
+    """
+    for _ in range(warmup):
+        await fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+    }
+
+
+def print_table(title: str, rows: List[Dict[str, object]]) -> None:
+    """Print benchmark results as an aligned table."""
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {
+        col: max(len(col), *(len(_format(row[col])) for row in rows)) for col in columns
+    }
+    print("  ".join(col.ljust(widths[col]) for col in columns))
+    for row in rows:
+        print("  ".join(_format(row[col]).ljust(widths[col]) for col in columns))
+
+
+def _format(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
@@ -0,0 +1,124 @@
+"""
+Microbenchmark of decode_token before and after caching parsed JWKS keys.
+
+The legacy path re-parses the JWK into an RSA key on every call; the key
+store parses each key once per JWKS fetch. get_current_user additionally
+serves repeated tokens from the verified-token cache.
+
+    python -m benchmarks.decode_token --iterations 5000
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+
+from benchmarks.common import print_table
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from app.core import auth
+from app.core.config import settings
+
+ISSUER = f"https://cognito-idp.{settings.AWS_REGION}.amazonaws.com/{settings.COGNITO_USER_POOL_ID}"
+
+
+async def legacy_decode_token(token: str, keys: list) -> dict:
+    """decode_token as it was before the key store."""
+    header = json.loads(base64.b64decode(token.split(".")[0] + "==").decode("utf-8"))
+    key = next(k for k in keys if k["kid"] == header["kid"])
+    public_key = RSAAlgorithm.from_jwk(json.dumps(key))
+    payload = jwt.decode(
+        token,
+        public_key,
+        algorithms=["RS256"],
+        audience=settings.COGNITO_CLIENT_ID,
+        issuer=ISSUER,
+    )
+    return auth.TokenPayload(
+        sub=payload["sub"],
+        exp=payload["exp"],
+        iat=payload["iat"],
+        iss=payload["iss"],
+        client_id=payload["client_id"],
+        username=payload.get("username", ""),
+        email=payload.get("email", None),
+        cognito_groups=payload.get("cognito:groups", []),
+    )
+
+
+async def run(iterations: int) -> None:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": "bench", "alg": "RS256", "use": "sig"})
+    keys = [jwk]
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"keys": keys}))
+    auth.jwks_store = auth.JWKSKeyStore(
+        url="https://jwks.example.com",
+        ttl=3600,
+        min_refresh_interval=30,
+        client=httpx.AsyncClient(transport=transport),
+    )
+
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "sub": "bench-user",
+            "iat": now,
+            "exp": now + 3600,
+            "iss": ISSUER,
+            "aud": settings.COGNITO_CLIENT_ID,
+            "client_id": settings.COGNITO_CLIENT_ID,
+            "username": "bench",
+            "email": "bench@example.com",
+        },
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "bench"},
+    )
+
+    candidates = {
+        "legacy (from_jwk per call)": lambda: legacy_decode_token(token, keys),
+        "key store": lambda: auth.decode_token(token),
+        "token cache hit": lambda: auth.get_current_user(token),
+    }
+    for decode in candidates.values():
+        await decode()
+
+    # Alternate between the candidates in rounds so that CPU frequency and
+    # allocator warm-up affect both equally.
+    rounds = 10
+    elapsed = dict.fromkeys(candidates, 0.0)
+    for _ in range(rounds):
+        for label, decode in candidates.items():
+            start = time.perf_counter()
+            for _ in range(iterations // rounds):
+                await decode()
+            elapsed[label] += time.perf_counter() - start
+
+    calls = iterations // rounds * rounds
+    rows = [
+        {
+            "path": label,
+            "us_per_call": seconds / calls * 1_000_000,
+            "calls_per_s": calls / seconds,
+        }
+        for label, seconds in elapsed.items()
+    ]
+
+    print_table(f"decode_token over {iterations} calls", rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
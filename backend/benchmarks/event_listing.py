@@ -0,0 +1,93 @@
+"""
+Compare the lean GET /events listing against the eager-loading path.
+
+The legacy path joinedloads every registration and its user and serializes
+EventWithRelations; the lean path computes the counts in SQL.
+
+    python -m benchmarks.event_listing --registrations 10000
+"""
+import argparse
+import asyncio
+from typing import Any, List
+
+# Imported first so the benchmark database is configured before the app loads
+from benchmarks.common import print_table, reset_database, seed_events, time_async
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.main import app
+from app.models.event import Event as EventModel
+from app.models.registration import Registration as RegistrationModel
+from app.schemas.event import EventWithRelations
+
+legacy_router = APIRouter()
+
+
+@legacy_router.get("/legacy-events", response_model=List[EventWithRelations])
+async def read_events_legacy(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+) -> Any:
+    """The listing as it was before counts were aggregated in SQL."""
+    query = (
+        select(EventModel)
+        .options(
+            joinedload(EventModel.created_by),
+            joinedload(EventModel.registrations).joinedload(RegistrationModel.user),
+        )
+        .order_by(EventModel.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return result.unique().scalars().all()
+
+
+app.include_router(legacy_router, prefix="/bench")
+
+
+async def run(events: int, registrations: int, iterations: int) -> None:
+    await reset_database()
+    await seed_events(events=events, registrations=registrations)
+    
+    paths = {
+        "legacy EventWithRelations": "/bench/legacy-events",
+        "include=registrations": f"{settings.API_V1_STR}/events?include=registrations",
+        "lean counts": f"{settings.API_V1_STR}/events",
+    }
+    rows = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, path in paths.items():
+            response = await client.get(path)
+            response.raise_for_status()
+            
+            async def fetch() -> None:
+                (await client.get(path)).raise_for_status()
+            
+            timings = await time_async(fetch, iterations=iterations)
+            rows.append({"path": label, "payload_kb": len(response.content) / 1024, **timings})
+    
+    print_table(
+        f"GET /events with {events} events and {registrations} registrations", rows
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--registrations", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.registrations, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Throughput of QR code rendering, inline on the event loop vs the render pool.
+
+Inline rendering is what generate_qrcode did before the pool: one core,
+and the event loop is blocked for the whole run. The pool rows report the
+total rate and the rate per render process.
+
+    python -m benchmarks.qr_render --count 2000 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks.common import print_table
+
+from app.core.qrcode_utils import QRCodeRenderer, render_qrcode_png
+
+
+def make_payloads(count: int) -> list:
+    return [
+        {
+            "registration_id": str(uuid.uuid4()),
+            "event_id": str(uuid.uuid4()),
+            "user_id": str(uuid.uuid4()),
+        }
+        for _ in range(count)
+    ]
+
+
+async def run(count: int, workers: list) -> None:
+    payloads = make_payloads(count)
+    rows = []
+
+    start = time.perf_counter()
+    for data in payloads:
+        render_qrcode_png(data)
+    seconds = time.perf_counter() - start
+    rows.append({
+        "path": "inline",
+        "processes": 1,
+        "renders_per_s": count / seconds,
+        "per_process": count / seconds,
+    })
+
+    for processes in workers:
+        renderer = QRCodeRenderer(max_workers=processes, max_pending=processes * 2)
+        # Start the processes before timing
+        await renderer.render_many(payloads[:processes * renderer.chunk_size])
+        start = time.perf_counter()
+        await renderer.render_many(payloads)
+        seconds = time.perf_counter() - start
+        renderer.close()
+        rows.append({
+            "path": "pool",
+            "processes": processes,
+            "renders_per_s": count / seconds,
+            "per_process": count / seconds / processes,
+        })
+
+    print_table(f"QR render throughput over {count} payloads", rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    asyncio.run(run(args.count, args.workers))
+
+
+if __name__ == "__main__":
+    main()
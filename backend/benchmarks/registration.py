@@ -0,0 +1,105 @@
+"""
+Throughput of event registration under contention.
+
+Every member of a pool registers for one event at once, through
+registration.register, which locks the event row for each seat. Attempts
+run at most --concurrency at a time (default: what the pool opens), and
+the run reports registrations per second and how they were decided.
+
+    python -m benchmarks.registration --capacity 150 --users 2000 --runs 3
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional
+
+# Imported first so the benchmark database is configured before the app loads
+from benchmarks.common import print_table, reset_database
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.core.database import AsyncSessionLocal, engine
+from app.crud import registration
+from app.models import Event, RegistrationStatus, User
+
+
+async def seed_event(*, capacity: int, users: int) -> tuple:
+    """Create an event and the members who will register for it."""
+    event_id = uuid.uuid4()
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(User),
+            [{"id": id, "name": "Member", "email": f"{id}@example.com"} for id in user_ids],
+        )
+        await db.execute(insert(Event), [{
+            "id": event_id,
+            "title": "Launch night",
+            "date_time": datetime.now(timezone.utc),
+            "venue": "Main hall",
+            "capacity": capacity,
+            "created_by_id": user_ids[0],
+        }])
+        await db.commit()
+    return event_id, user_ids
+
+
+async def register(event_id: uuid.UUID, user_id: uuid.UUID, slots: asyncio.Semaphore) -> str:
+    async with slots:
+        async with AsyncSessionLocal() as db:
+            try:
+                db_obj = await registration.register(db, event_id=event_id, user_id=user_id)
+                return db_obj.status.value
+            except HTTPException as e:
+                return str(e.status_code)
+
+
+def default_concurrency() -> int:
+    pool = engine.sync_engine.pool
+    return pool.size() + max(pool._max_overflow, 0)
+
+
+async def run(capacity: int, users: int, runs: int, concurrency: Optional[int]) -> None:
+    concurrency = concurrency or default_concurrency()
+    rows: List[dict] = []
+    for run_number in range(1, runs + 1):
+        await reset_database()
+        event_id, user_ids = await seed_event(capacity=capacity, users=users)
+        slots = asyncio.Semaphore(concurrency)
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(register(event_id, id, slots) for id in user_ids))
+        seconds = time.perf_counter() - start
+
+        counts = Counter(outcomes)
+        confirmed = counts[RegistrationStatus.CONFIRMED.value]
+        waitlisted = counts[RegistrationStatus.WAITLISTED.value]
+        rows.append({
+            "run": run_number,
+            "concurrency": concurrency,
+            "seconds": seconds,
+            "registrations_per_s": users / seconds,
+            "confirmed": confirmed,
+            "waitlisted": waitlisted,
+            "rejected": users - confirmed - waitlisted,
+        })
+
+    print_table(f"Registration throughput: {users} members, {capacity} seats", rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--capacity", type=int, default=150)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(run(args.capacity, args.users, args.runs, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
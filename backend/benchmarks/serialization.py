@@ -0,0 +1,138 @@
+"""
+Serialization cost of event listings, per response path.
+
+Every event embeds its creator and its registrations with their users, as
+EventWithRelations does. The paths are:
+
+- encoder: pydantic validation, jsonable_encoder and json.dumps, which is
+  how FastAPI renders a response_model through the default JSONResponse
+- adapter: a pre-built TypeAdapter validating and dumping to JSON in one go
+- trusted: dump_trusted, which copies ORM attributes and dumps with orjson
+
+No database is involved; the ORM objects are built in memory.
+
+    python -m benchmarks.serialization --events 10 --registrations 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from benchmarks.common import print_table, time_async
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.serialization import dump_trusted, json_body, type_adapter
+from app.models import Event, Registration, RegistrationStatus, User
+from app.models.registration import PaymentStatus
+from app.models.user import UserRole
+from app.schemas.event import EventWithRelations
+
+SCHEMA = List[EventWithRelations]
+
+
+def make_user(i: int, now: datetime) -> User:
+    return User(
+        id=uuid.uuid4(),
+        name=f"Member {i}",
+        email=f"member{i}@example.com",
+        phone="+91 98765 43210",
+        branch="CSE",
+        year="3",
+        role=UserRole.MEMBER,
+        profile_pic_url=f"https://cdn.example.com/avatars/{i}.jpg",
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def make_events(events: int, registrations: int) -> List[Event]:
+    """Events with the given number of registrations each."""
+    now = datetime.now(timezone.utc)
+    host = make_user(0, now)
+    result = []
+    for e in range(events):
+        event = Event(
+            id=uuid.uuid4(),
+            title=f"Event {e}",
+            description="An evening of talks, demos and pizza. " * 4,
+            date_time=now + timedelta(days=e),
+            venue="Main hall",
+            is_paid=e % 2 == 0,
+            price=200 if e % 2 == 0 else 0,
+            capacity=registrations,
+            seats_taken=registrations,
+            cover_image_url=f"https://cdn.example.com/events/{e}/cover.jpg",
+            created_by_id=host.id,
+            created_by=host,
+            created_at=now,
+            updated_at=now,
+        )
+        event.registrations = [
+            Registration(
+                id=uuid.uuid4(),
+                event_id=event.id,
+                user_id=user.id,
+                user=user,
+                qr_code_url=f"https://cdn.example.com/qrcodes/{user.id}.png",
+                payment_status=PaymentStatus.COMPLETED,
+                status=RegistrationStatus.CONFIRMED,
+                checkin_start=now if r % 3 == 0 else None,
+                created_at=now,
+                updated_at=now,
+            )
+            for r, user in enumerate(make_user(r + 1, now) for r in range(registrations))
+        ]
+        result.append(event)
+    return result
+
+
+def encoder_path(events: List[Event]) -> bytes:
+    adapter = type_adapter(SCHEMA)
+    content = jsonable_encoder(adapter.validate_python(events, from_attributes=True))
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+PATHS = {
+    "encoder": encoder_path,
+    "adapter": lambda events: json_body(SCHEMA, events),
+    "trusted": lambda events: dump_trusted(SCHEMA, events),
+}
+
+
+async def run(events: int, registration_counts: List[int], iterations: int) -> None:
+    rows = []
+    for registrations in registration_counts:
+        listing = make_events(events, registrations)
+        baseline = None
+        for name, serialize in PATHS.items():
+            size = len(serialize(listing))
+
+            async def call() -> None:
+                serialize(listing)
+
+            timings = await time_async(call, iterations=iterations)
+            baseline = baseline or timings["mean_ms"]
+            rows.append({
+                "registrations": registrations,
+                "path": name,
+                "kb": size / 1024,
+                **timings,
+                "speedup": baseline / timings["mean_ms"],
+            })
+    print_table(f"Serializing {events} events (EventWithRelations)", rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=10)
+    parser.add_argument("--registrations", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.events, args.registrations, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import json
 import multiprocessing
 import os
+import shutil
 
 workers_per_core_str = os.getenv("WORKERS_PER_CORE", "1")
 max_workers_str = os.getenv("MAX_WORKERS")
@@ -48,4 +49,20 @@ log_data = {
     "host": host,
     "port": port,
 }
-print(json.dumps(log_data))
\ No newline at end of file
+print(json.dumps(log_data))
+
+
+def on_starting(server):
+    """Start every run with an empty Prometheus multiprocess directory."""
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir)
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the shared Prometheus metrics."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
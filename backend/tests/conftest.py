@@ -1,19 +1,33 @@
 import asyncio
-from typing import Generator, Any, AsyncGenerator
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Generator, Any, AsyncGenerator, Dict, List, NamedTuple, Sequence
+
+# The app refuses to start without a shared ticket signing key
+os.environ.setdefault("QR_SIGNING_KEY", "test-signing-key")
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert, or_, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-from app.core.database import get_db, Base
+from app.core.database import get_db, get_read_db, Base
 from app.main import app
 from app.core.config import settings
+from app.core.response_cache import response_cache
+from app.models import BlogPost, Event, Gallery, Registration, User
 
 # Create a new database for testing
 TEST_DATABASE_URL = str(settings.DATABASE_URI).replace("sparc_db", "test_sparc_db")
-engine = create_async_engine(TEST_DATABASE_URL, echo=True)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
+# SQLite serializes writers; give concurrent tests room to queue for the lock
+connect_args = {"timeout": 60} if TEST_DATABASE_URL.startswith("sqlite") else {}
+engine = create_async_engine(TEST_DATABASE_URL, echo=True, connect_args=connect_args)
+# Same session options as the app's, so objects stay loaded after a commit
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession, expire_on_commit=False
+)
 
 # Override the get_db dependency to use the test database
 async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -24,6 +38,8 @@ async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+response_cache.session_factory = TestingSessionLocal
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -43,6 +59,12 @@ async def setup_database():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
 
+@pytest.fixture(autouse=True)
+async def clear_response_cache():
+    """Start each test with an empty response cache; fixtures write around the handlers."""
+    await response_cache.clear()
+
+
 @pytest.fixture(scope="function")
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -58,3 +80,95 @@ def client() -> Generator[TestClient, Any, None]:
     """
     with TestClient(app) as c:
         yield c
+
+
+class DevUser(NamedTuple):
+    """A test user and the dev-auth headers that sign in as them."""
+    id: uuid.UUID
+    headers: Dict[str, str]
+
+
+def event_row(**values: Any) -> Dict[str, Any]:
+    """
+    Column values for a test event; keyword arguments override the defaults.
+    """
+    return {
+        "id": uuid.uuid4(),
+        "title": "Launch night",
+        "date_time": datetime.now(timezone.utc),
+        "venue": "Main hall",
+        "capacity": 10,
+        **values,
+    }
+
+
+@pytest.fixture
+def dev_auth(monkeypatch):
+    """
+    Authenticate requests from the x-dev-email and x-dev-groups headers.
+    """
+    monkeypatch.setenv("DEV_AUTH", "true")
+
+
+@pytest.fixture
+async def make_users(db_session, dev_auth):
+    """
+    Factory inserting users who can sign in with dev auth.
+    
+    Afterwards the users are deleted, with the events, registrations,
+    gallery images and blog posts that belong to them.
+    """
+    created: List[uuid.UUID] = []
+
+    async def _make(count: int = 1, *, name: str = "Member", groups: Sequence[str] = ()) -> List[DevUser]:
+        users = [uuid.uuid4() for _ in range(count)]
+        await db_session.execute(insert(User), [
+            {"id": id, "name": name, "email": f"{id}@example.com"} for id in users
+        ])
+        await db_session.commit()
+        created.extend(users)
+        headers = {"x-dev-groups": ",".join(groups)} if groups else {}
+        return [DevUser(id, {"x-dev-email": f"{id}@example.com", **headers}) for id in users]
+
+    yield _make
+
+    events = select(Event.id).where(Event.created_by_id.in_(created))
+    await db_session.execute(delete(Registration).where(
+        or_(Registration.user_id.in_(created), Registration.event_id.in_(events))
+    ))
+    await db_session.execute(delete(Event).where(Event.created_by_id.in_(created)))
+    await db_session.execute(delete(Gallery).where(Gallery.uploaded_by_id.in_(created)))
+    await db_session.execute(delete(BlogPost).where(BlogPost.author_id.in_(created)))
+    await db_session.execute(delete(User).where(User.id.in_(created)))
+    await db_session.commit()
+
+
+@pytest.fixture
+async def make_event(db_session, make_users):
+    """
+    Factory inserting an event; it is deleted with its creator.
+    """
+    async def _make(created_by_id: uuid.UUID, **values: Any) -> uuid.UUID:
+        row = event_row(created_by_id=created_by_id, **values)
+        await db_session.execute(insert(Event), [row])
+        await db_session.commit()
+        return row["id"]
+
+    return _make
+
+
+@pytest.fixture
+async def host(make_users) -> DevUser:
+    """
+    A user in the host group.
+    """
+    [user] = await make_users(name="Host", groups=["host"])
+    return user
+
+
+@pytest.fixture
+async def event(host, make_event) -> uuid.UUID:
+    """
+    An event created by the host.
+    """
+    return await make_event(host.id)
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+from prometheus_client import REGISTRY
+
+from app.core import cache as cache_module
+from app.core.auth import JWKSKeyStore, TokenCache, TokenPayload
+
+
+def make_jwk(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return jwk
+
+
+def make_store(keys, fetches, **kwargs):
+    def handler(request):
+        fetches.append(request)
+        return httpx.Response(200, json={"keys": list(keys)})
+
+    kwargs.setdefault("ttl", 3600)
+    kwargs.setdefault("min_refresh_interval", 0)
+    return JWKSKeyStore(
+        url="https://jwks.example.com",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        **kwargs,
+    )
+
+
+async def test_concurrent_lookups_share_one_fetch():
+    fetches = []
+    store = make_store([make_jwk("a")], fetches)
+
+    keys = await asyncio.gather(*(store.get_key("a") for _ in range(20)))
+
+    assert len(fetches) == 1
+    assert all(key is keys[0] for key in keys)
+
+
+async def test_unknown_kid_refreshes_after_rotation():
+    keys = [make_jwk("old")]
+    fetches = []
+    store = make_store(keys, fetches)
+    assert await store.get_key("old") is not None
+
+    keys.append(make_jwk("new"))
+    assert await store.get_key("new") is not None
+    assert len(fetches) == 2
+
+
+async def test_unknown_kid_refreshes_are_throttled():
+    fetches = []
+    store = make_store([make_jwk("a")], fetches, min_refresh_interval=60)
+    await store.get_key("a")
+
+    for _ in range(5):
+        assert await store.get_key("made-up") is None
+    assert len(fetches) == 1
+
+
+async def test_failed_refresh_keeps_cached_keys():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) > 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"keys": [jwk]})
+
+    jwk = make_jwk("a")
+    store = JWKSKeyStore(
+        url="https://jwks.example.com",
+        ttl=0,
+        min_refresh_interval=0,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    first = await store.get_key("a")
+
+    assert await store.get_key("a") is first
+    assert len(calls) == 2
+
+
+async def test_first_fetch_failure_raises():
+    store = JWKSKeyStore(
+        url="https://jwks.example.com",
+        ttl=3600,
+        min_refresh_interval=0,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(500))),
+    )
+    with pytest.raises(httpx.HTTPStatusError):
+        await store.get_key("a")
+
+
+def make_payload(sub, exp):
+    return TokenPayload(
+        sub=sub, exp=exp, iat=0, iss="test", client_id="test", username=sub
+    )
+
+
+def test_token_cache_counts_hits_and_misses():
+    cache = TokenCache(maxsize=10)
+    payload = make_payload("a", int(time.time()) + 60)
+
+    assert cache.get("token-a") is None
+    cache.set("token-a", payload)
+    assert cache.get("token-a") is payload
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 10}
+
+
+def test_token_cache_expires_at_token_exp(monkeypatch):
+    cache = TokenCache(maxsize=10)
+    cache.set("expired", make_payload("a", int(time.time()) - 1))
+    assert cache.get("expired") is None
+
+    cache.set("token-b", make_payload("b", int(time.time()) + 60))
+    now = time.monotonic()
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 61)
+    assert cache.get("token-b") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_token_cache_lookups_are_exported():
+    cache = TokenCache(maxsize=10)
+    cache.set("token-a", make_payload("a", int(time.time()) + 60))
+
+    def count(result):
+        return REGISTRY.get_sample_value("token_cache_requests_total", {"result": result}) or 0
+
+    before = count("hit"), count("miss")
+    cache.get("token-a")
+    cache.get("token-b")
+
+    assert (count("hit"), count("miss")) == (before[0] + 1, before[1] + 1)
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(maxsize=2)
+    exp = int(time.time()) + 60
+    for token in ("t1", "t2"):
+        cache.set(token, make_payload(token, exp))
+    cache.get("t1")
+    cache.set("t3", make_payload("t3", exp))
+
+    assert cache.get("t2") is None
+    assert cache.get("t1") is not None
+    assert cache.get("t3") is not None
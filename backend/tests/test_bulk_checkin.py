@@ -0,0 +1,91 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.tickets import encode_ticket
+from app.main import app
+from app.models import Registration, RegistrationStatus
+
+
+@pytest.fixture
+async def door(db_session, host, make_users, make_event):
+    """An event owned by a host, with two confirmed members and one waitlisted."""
+    event_id = await make_event(host.id, capacity=2)
+    members = await make_users(3)
+    registration_ids = [uuid.uuid4() for _ in range(3)]
+    await db_session.execute(insert(Registration), [
+        {
+            "id": registration_id,
+            "event_id": event_id,
+            "user_id": member.id,
+            "status": RegistrationStatus.WAITLISTED if i == 2 else RegistrationStatus.CONFIRMED,
+        }
+        for i, (registration_id, member) in enumerate(zip(registration_ids, members))
+    ])
+    await db_session.commit()
+    return event_id, registration_ids, host.headers
+
+
+async def test_bulk_checkin_reports_each_scan_and_is_idempotent(door):
+    event_id, registration_ids, headers = door
+    first, second, waitlisted = (encode_ticket(id, event_id) for id in registration_ids)
+    scanned_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+    scans = [
+        {"ticket": first, "scanned_at": scanned_at.isoformat()},
+        {"ticket": second},
+        {"ticket": first, "scanned_at": (scanned_at + timedelta(seconds=3)).isoformat()},
+        {"ticket": waitlisted},
+        {"ticket": encode_ticket(uuid.uuid4(), uuid.uuid4())},
+        # The last character may only carry padding bits, so tamper before it
+        {"ticket": first[:-2] + ("A" if first[-2] != "A" else "B") + first[-1]},
+    ]
+    url = f"{settings.API_V1_STR}/events/{event_id}/checkin/bulk"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(url, json={"scans": scans}, headers=headers)
+        again = await client.post(url, json={"scans": scans[:2]}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert [result["status"] for result in results] == [
+        "checked_in", "checked_in", "already_checked_in", "not_found", "wrong_event", "invalid",
+    ]
+    # The earliest scan of a registration wins
+    checkin_start = datetime.fromisoformat(results[0]["checkin_start"])
+    assert checkin_start.replace(tzinfo=checkin_start.tzinfo or timezone.utc) == scanned_at
+    assert [result["status"] for result in again.json()] == ["already_checked_in"] * 2
+    assert [r["checkin_start"] for r in again.json()] == [r["checkin_start"] for r in results[:2]]
+
+
+async def test_only_confirmed_registrations_can_be_checked_in_by_hand(door, db_session):
+    event_id, registration_ids, headers = door
+    confirmed, _, waitlisted = registration_ids
+    waitlisted_user = await db_session.scalar(
+        select(Registration.user_id).where(Registration.id == waitlisted)
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        registrations = f"{settings.API_V1_STR}/registrations"
+        refused = [
+            await client.patch(f"{registrations}/{waitlisted}/checkin-start", headers=headers),
+            await client.patch(f"{registrations}/{waitlisted}/checkin-end", headers=headers),
+            await client.post(
+                f"{settings.API_V1_STR}/events/{event_id}/attendance",
+                params={"user_id": str(waitlisted_user)},
+                headers=headers,
+            ),
+        ]
+        accepted = await client.patch(f"{registrations}/{confirmed}/checkin-start", headers=headers)
+
+    assert [response.status_code for response in refused] == [400, 400, 400]
+    assert accepted.status_code == 200, accepted.text
+    checkin_start = await db_session.scalar(
+        select(Registration.checkin_start)
+        .where(Registration.id == waitlisted)
+        .execution_options(populate_existing=True)
+    )
+    assert checkin_start is None
@@ -0,0 +1,49 @@
+import logging
+import os
+import tempfile
+import uuid
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.database import InstrumentedQueuePool, install_slow_query_log
+
+
+@pytest.fixture
+async def small_engine():
+    path = os.path.join(tempfile.gettempdir(), f"pool-{uuid.uuid4().hex}.db")
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    yield engine
+    await engine.dispose()
+    os.remove(path)
+
+
+async def test_pool_records_checkouts_and_timeouts(small_engine):
+    metrics = small_engine.sync_engine.pool.metrics
+
+    async with small_engine.connect() as held:
+        await held.execute(text("SELECT 1"))
+        with pytest.raises(exc.TimeoutError):
+            async with small_engine.connect():
+                pass
+
+    assert metrics.checkouts == 1
+    assert metrics.timeouts == 1
+    assert metrics.wait_seconds_max >= 0.1
+
+
+async def test_slow_queries_are_logged(small_engine, caplog):
+    install_slow_query_log(small_engine.sync_engine, threshold_ms=0, sample_rate=1.0)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.database"):
+        async with small_engine.connect() as conn:
+            await conn.execute(text("SELECT 42"))
+
+    assert any("SELECT 42" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,72 @@
+import uuid
+
+import httpx
+import pytest
+from moto.server import ThreadedMotoServer
+
+from app.core import storage as storage_module
+from app.core.config import settings
+from app.core.storage import StorageService
+from app.main import app
+
+
+@pytest.fixture
+def s3_server(monkeypatch):
+    """A local S3 stand-in that presigned URLs can actually be PUT to."""
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    service = StorageService(max_workers=2, endpoint_url=f"http://{host}:{port}")
+    service.client.create_bucket(Bucket=settings.S3_BUCKET_GALLERY)
+    monkeypatch.setattr(storage_module, "storage", service)
+    yield service
+    service.close()
+    server.stop()
+
+
+async def test_gallery_image_goes_straight_to_storage(s3_server, host):
+    user_id, headers = host.id, host.headers
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        slot = await api.post(
+            f"{settings.API_V1_STR}/gallery/uploads",
+            json={"filename": "Launch.PNG", "content_type": "image/png"},
+            headers=headers,
+        )
+        assert slot.status_code == 200, slot.text
+        slot = slot.json()
+        assert slot["object_key"].startswith(f"gallery/{user_id}/")
+        assert slot["object_key"].endswith(".png")
+
+        # Confirming before the PUT lands is refused
+        early = await api.post(
+            f"{settings.API_V1_STR}/gallery/uploads/confirm",
+            json={"object_key": slot["object_key"]},
+            headers=headers,
+        )
+        assert early.status_code == 400
+
+        async with httpx.AsyncClient() as s3:
+            put = await s3.put(slot["upload_url"], content=b"\x89PNG...", headers=slot["headers"])
+        assert put.status_code == 200
+
+        confirmed = await api.post(
+            f"{settings.API_V1_STR}/gallery/uploads/confirm",
+            json={"object_key": slot["object_key"]},
+            headers=headers,
+        )
+    assert confirmed.status_code == 200, confirmed.text
+    assert confirmed.json()["image_url"].endswith(slot["object_key"])
+    assert confirmed.json()["uploaded_by_id"] == str(user_id)
+
+
+async def test_confirm_rejects_keys_outside_the_callers_prefix(s3_server, host):
+    headers = host.headers
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        response = await api.post(
+            f"{settings.API_V1_STR}/gallery/uploads/confirm",
+            json={"object_key": f"gallery/{uuid.uuid4()}/someone-else.png"},
+            headers=headers,
+        )
+    assert response.status_code == 400
@@ -0,0 +1,104 @@
+import uuid
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+
+from app.core.config import settings
+from app.core.fieldsets import FieldSelector, load_options
+from app.main import app
+from app.models import Registration
+from app.schemas.event import EventWithRelations
+from app.schemas.registration import RegistrationWithDetails
+
+
+def test_default_shape_is_the_full_schema():
+    shape = FieldSelector(EventWithRelations).shape(None, None)
+
+    assert set(shape) == set(EventWithRelations.model_fields)
+    assert shape["created_by"]["email"] is None
+    assert "event_id" in shape["registrations"]
+
+
+def test_fields_and_expand_narrow_the_shape():
+    selector = FieldSelector(EventWithRelations)
+
+    assert selector.shape("title", "") == {"id": None, "title": None}
+    assert selector.shape("title,created_by.name", "created_by") == {
+        "id": None, "title": None, "created_by": {"id": None, "name": None},
+    }
+
+
+@pytest.mark.parametrize("fields, expand", [
+    ("nope", None),
+    ("created_by", None),
+    ("created_by.name", ""),
+    (None, "venue"),
+    (None, "created_by.events"),
+])
+def test_unknown_fields_are_rejected(fields, expand):
+    with pytest.raises(HTTPException) as exc_info:
+        FieldSelector(EventWithRelations).shape(fields, expand)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_load_options_only_select_requested_columns():
+    shape = FieldSelector(RegistrationWithDetails).shape("status,event.title", "event")
+    query = select(Registration).options(*load_options(Registration, shape))
+    sql = str(query.compile())
+
+    assert "registrations.status" in sql and "events_1.title" in sql
+    assert "description" not in sql
+    assert "registrations.qr_code_url" not in sql
+    assert "users" not in sql
+
+
+@pytest.fixture
+async def event_with_registration(db_session, host, make_users, make_event):
+    [member] = await make_users()
+    event_id = await make_event(host.id, description="Talks and demos")
+    registration_id = uuid.uuid4()
+    await db_session.execute(insert(Registration), [
+        {"id": registration_id, "event_id": event_id, "user_id": member.id},
+    ])
+    await db_session.commit()
+    return event_id, registration_id, member.headers
+
+
+async def test_sparse_event_and_registration_responses(event_with_registration):
+    event_id, registration_id, headers = event_with_registration
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        full = await client.get(f"{settings.API_V1_STR}/events/{event_id}")
+        sparse = await client.get(
+            f"{settings.API_V1_STR}/events/{event_id}",
+            params={"fields": "title,created_by.name", "expand": "created_by"},
+        )
+        listing = await client.get(
+            f"{settings.API_V1_STR}/events", params={"fields": "title,seats_left", "expand": ""}
+        )
+        registration = await client.get(
+            f"{settings.API_V1_STR}/registrations/{registration_id}",
+            params={"fields": "status,event.title", "expand": "event"},
+            headers=headers,
+        )
+        invalid = await client.get(
+            f"{settings.API_V1_STR}/events/{event_id}", params={"expand": "attendees"}
+        )
+
+    assert full.json()["description"] == "Talks and demos"
+    assert len(full.json()["registrations"]) == 1
+    assert sparse.json() == {
+        "id": str(event_id),
+        "title": "Launch night",
+        "created_by": {"id": full.json()["created_by_id"], "name": "Host"},
+    }
+    assert {"id": str(event_id), "title": "Launch night", "seats_left": 9} in listing.json()
+    assert registration.json() == {
+        "id": str(registration_id),
+        "status": "confirmed",
+        "event": {"id": str(event_id), "title": "Launch night"},
+    }
+    assert invalid.status_code == 400
@@ -0,0 +1,241 @@
+import io
+
+import httpx
+import pytest
+from moto.server import ThreadedMotoServer
+from PIL import Image
+from sqlalchemy import delete, select
+
+from app.core import images, storage as storage_module
+from app.core.config import settings
+from app.core.images import ImageRenderer, render_image_variants
+from app.core.jobs import DELETE_OBJECT, RENDER_IMAGE_VARIANTS, JobWorker
+from app.core.storage import BucketName, StorageService
+from app.main import app
+from app.models import Gallery, Job
+from tests.conftest import TestingSessionLocal
+
+SIZES = {"thumb": 320, "medium": 1024, "large": 2048}
+ORIENTATION, MAKE, GPS_INFO = 0x0112, 0x010F, 0x8825
+
+
+def camera_photo(width=4000, height=3000, orientation=6):
+    """A JPEG stored sideways, with the EXIF rotation and camera details a phone writes."""
+    photo = Image.new("RGB", (width, height), "steelblue")
+    exif = photo.getexif()
+    exif[ORIENTATION] = orientation
+    exif[MAKE] = "Phone"
+    exif[GPS_INFO] = {1: "N"}
+    buffer = io.BytesIO()
+    photo.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def render(data, sizes=SIZES):
+    return render_image_variants(
+        data, sizes, max_pixels=50_000_000, webp_quality=80, jpeg_quality=82
+    )
+
+
+def test_variants_are_upright_resized_and_stripped():
+    variants = render(camera_photo())
+
+    assert {name: (v["width"], v["height"]) for name, v in variants.items()} == {
+        "thumb": (240, 320), "medium": (768, 1024), "large": (1536, 2048),
+    }
+    for variant in variants.values():
+        for format in ("webp", "jpeg"):
+            decoded = Image.open(io.BytesIO(variant[format]))
+            assert decoded.format == format.upper()
+            assert decoded.size == (variant["width"], variant["height"])
+            assert dict(decoded.getexif()) == {}
+
+
+def test_small_images_are_not_scaled_up_and_keep_transparency_in_webp():
+    logo = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+    buffer = io.BytesIO()
+    logo.save(buffer, format="PNG")
+
+    variants = render(buffer.getvalue())
+
+    assert {(v["width"], v["height"]) for v in variants.values()} == {(200, 100)}
+    assert Image.open(io.BytesIO(variants["thumb"]["webp"])).mode == "RGBA"
+    # Transparent areas become white in the JPEG
+    assert Image.open(io.BytesIO(variants["thumb"]["jpeg"])).getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_files_that_are_not_images_are_rejected():
+    with pytest.raises(images.InvalidImage):
+        render(b"%PDF-1.7 not an image")
+    with pytest.raises(images.InvalidImage):
+        render_image_variants(
+            camera_photo(), SIZES, max_pixels=1000, webp_quality=80, jpeg_quality=82
+        )
+
+
+@pytest.fixture
+def s3_server(monkeypatch):
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    service = StorageService(max_workers=4, endpoint_url=f"http://{host}:{port}")
+    service.client.create_bucket(Bucket=settings.S3_BUCKET_GALLERY)
+    service.client.create_bucket(Bucket=settings.S3_BUCKET_PROFILEPICS)
+    monkeypatch.setattr(storage_module, "storage", service)
+    monkeypatch.setattr(images, "storage", service)
+    yield service
+    service.close()
+    server.stop()
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    renderer = ImageRenderer(max_workers=1, max_pending=1)
+    monkeypatch.setattr(images, "image_renderer", renderer)
+    yield renderer
+    renderer.close()
+
+
+@pytest.fixture
+async def hosts(db_session, make_users):
+    """Two hosts, with the jobs table emptied around the test."""
+    await db_session.execute(delete(Job))
+    await db_session.commit()
+    yield await make_users(2, name="Host", groups=["host"])
+    await db_session.execute(delete(Job))
+    await db_session.commit()
+
+
+@pytest.fixture
+def host(hosts):
+    return hosts[0]
+
+
+async def test_gallery_upload_gets_variants_from_the_worker(s3_server, renderer, host, db_session):
+    worker = JobWorker(concurrency=2, poll_interval=0.01, lease=60, session_factory=TestingSessionLocal)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        uploaded = await api.post(
+            f"{settings.API_V1_STR}/gallery",
+            files={"image": ("launch.jpg", camera_photo(), "image/jpeg")},
+            headers=host.headers,
+        )
+        assert uploaded.status_code == 200, uploaded.text
+        # The upload itself returns at once, before any resizing
+        assert uploaded.json()["image_variants"] is None
+        [job] = (await db_session.scalars(select(Job))).all()
+        assert job.kind == RENDER_IMAGE_VARIANTS
+
+        assert await worker.run_pending() == 1
+        image_id = uploaded.json()["id"]
+        variants = (await api.get(f"{settings.API_V1_STR}/gallery/{image_id}")).json()["image_variants"]
+
+        assert set(variants) == set(settings.IMAGE_VARIANT_SIZES)
+        thumb = await s3_server.download(
+            BucketName.GALLERY, s3_server.object_key(BucketName.GALLERY, variants["thumb"]["jpeg"])
+        )
+        assert Image.open(io.BytesIO(thumb)).size == (240, 320)
+
+        # Deleting the image deletes its variants too
+        deleted = await api.delete(f"{settings.API_V1_STR}/gallery/{image_id}", headers=host.headers)
+        assert deleted.status_code == 200
+        queued = (await db_session.scalars(
+            select(Job).execution_options(populate_existing=True)
+        )).all()
+        assert {job.kind for job in queued} == {DELETE_OBJECT}
+        assert len(queued) == 1 + 2 * len(settings.IMAGE_VARIANT_SIZES)
+
+
+async def test_deleting_a_row_leaves_objects_it_does_not_own(s3_server, renderer, hosts, db_session):
+    owner, other = hosts
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        uploads = [
+            await api.post(
+                f"{settings.API_V1_STR}/gallery",
+                files={"image": ("launch.jpg", camera_photo(), "image/jpeg")},
+                headers=owner.headers,
+            )
+            for _ in range(2)
+        ]
+        # Same file name, separate objects
+        first, second = (upload.json()["image_url"] for upload in uploads)
+        assert first != second
+
+        # Another host's event pointing at the owner's image
+        created = await api.post(
+            f"{settings.API_V1_STR}/events",
+            json={
+                "title": "Borrowed cover",
+                "date_time": "2030-01-01T18:00:00Z",
+                "venue": "Main hall",
+                "capacity": 10,
+                "cover_image_url": first,
+            },
+            headers=other.headers,
+        )
+        assert created.status_code == 200, created.text
+        await db_session.execute(delete(Job))
+        await db_session.commit()
+        deleted = await api.delete(
+            f"{settings.API_V1_STR}/events/{created.json()['id']}", headers=other.headers
+        )
+        assert deleted.status_code == 200, deleted.text
+
+    queued = (await db_session.scalars(
+        select(Job).where(Job.kind == DELETE_OBJECT).execution_options(populate_existing=True)
+    )).all()
+    assert queued == []
+    assert await s3_server.download(
+        BucketName.GALLERY, s3_server.object_key(BucketName.GALLERY, first)
+    ) is not None
+
+
+async def test_pointing_an_avatar_at_a_foreign_image_neither_renders_nor_deletes_it(
+    s3_server, renderer, hosts, db_session
+):
+    owner, other = hosts
+    worker = JobWorker(concurrency=2, poll_interval=0.01, lease=60, session_factory=TestingSessionLocal)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        uploaded = await api.post(
+            f"{settings.API_V1_STR}/users/me/avatar",
+            files={"avatar": ("me.jpg", camera_photo(), "image/jpeg")},
+            headers=owner.headers,
+        )
+        assert uploaded.status_code == 200, uploaded.text
+        assert await worker.run_pending() == 1
+        foreign = uploaded.json()["profile_pic_url"]
+
+        me = f"{settings.API_V1_STR}/users/me"
+        for url in (foreign, None):
+            patched = await api.patch(me, json={"profile_pic_url": url}, headers=other.headers)
+            assert patched.status_code == 200, patched.text
+        assert await worker.run_pending() == 0
+
+        # The owner still has the avatar and its variants
+        avatar = (await api.get(me, headers=owner.headers)).json()
+    key = s3_server.object_key(BucketName.PROFILEPICS, foreign)
+    assert await s3_server.download(BucketName.PROFILEPICS, key) is not None
+    for variant in avatar["profile_pic_variants"].values():
+        assert await s3_server.download(
+            BucketName.PROFILEPICS, s3_server.object_key(BucketName.PROFILEPICS, variant["jpeg"])
+        ) is not None
+
+
+async def test_gallery_item_and_its_variant_job_commit_together(s3_server, host, db_session, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    monkeypatch.setattr(images, "enqueue_job", unavailable)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        with pytest.raises(RuntimeError):
+            await api.post(
+                f"{settings.API_V1_STR}/gallery",
+                files={"image": ("launch.jpg", camera_photo(), "image/jpeg")},
+                headers=host.headers,
+            )
+
+    # No item is left behind that would never get variants
+    assert (await db_session.scalars(select(Gallery))).all() == []
@@ -0,0 +1,166 @@
+import asyncio
+import importlib
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import delete, func, select, update
+
+from app.core import jobs as job_queue
+from app.core.config import settings
+from app.core.jobs import JobWorker, enqueue_job, job_handler, job_stats
+from app.crud import registration
+from app.main import app
+from app.models import Event, Job, JobStatus, Registration
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+async def queue(db_session):
+    """An empty jobs table, and a worker on the test database."""
+    await db_session.execute(delete(Job))
+    await db_session.commit()
+    yield JobWorker(concurrency=2, poll_interval=0.01, lease=60, session_factory=TestingSessionLocal)
+    await db_session.execute(delete(Job))
+    await db_session.commit()
+
+
+async def add_jobs(db_session, kind, count=1, **kwargs):
+    for i in range(count):
+        enqueue_job(db_session, kind, {"n": i}, **kwargs)
+    await db_session.commit()
+
+
+async def stored_jobs(db_session):
+    result = await db_session.scalars(select(Job).execution_options(populate_existing=True))
+    return result.all()
+
+
+async def test_finished_jobs_are_deleted(queue, db_session):
+    seen = []
+
+    @job_handler("test_record")
+    async def record(payload, session_factory):
+        seen.append((payload["n"], session_factory))
+
+    await add_jobs(db_session, "test_record", count=3)
+
+    assert await queue.run_pending() == 3
+    # Handlers open their sessions from the worker's factory
+    assert sorted(seen) == [(n, TestingSessionLocal) for n in range(3)]
+    assert await stored_jobs(db_session) == []
+
+
+async def test_failed_jobs_back_off_then_give_up(queue, db_session, monkeypatch):
+    monkeypatch.setattr(job_queue, "retry_delay", lambda attempts: 3600)
+
+    @job_handler("test_flaky")
+    async def flaky(payload, session_factory):
+        raise RuntimeError("storage unavailable")
+
+    await add_jobs(db_session, "test_flaky", max_attempts=2)
+    await queue.run_pending()
+    [retried] = await stored_jobs(db_session)
+
+    assert retried.status == JobStatus.QUEUED and retried.attempts == 1
+    assert retried.last_error == "RuntimeError: storage unavailable"
+    assert retried.run_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc) + timedelta(minutes=59)
+    # Not due yet
+    assert await queue.run_pending() == 0
+
+    await db_session.execute(update(Job).values(run_at=datetime.now(timezone.utc)))
+    await db_session.commit()
+    failed_before = job_stats()["failed"]
+    await queue.run_pending()
+    [failed] = await stored_jobs(db_session)
+
+    assert failed.status == JobStatus.FAILED and failed.attempts == 2
+    assert job_stats()["failed"] == failed_before + 1
+
+
+async def test_expired_lease_is_claimed_again(queue, db_session):
+    seen = []
+
+    @job_handler("test_lease")
+    async def record(payload, session_factory):
+        seen.append(payload["n"])
+
+    await add_jobs(db_session, "test_lease")
+    # A worker claimed the job, then died
+    await db_session.execute(update(Job).values(
+        status=JobStatus.RUNNING,
+        attempts=1,
+        locked_until=datetime.now(timezone.utc) - timedelta(seconds=1),
+    ))
+    await db_session.commit()
+
+    assert await queue.run_pending() == 1
+    assert seen == [0]
+
+
+async def test_worker_runs_at_most_concurrency_jobs_at_once(queue, db_session):
+    running = 0
+    peak = 0
+    done = []
+
+    @job_handler("test_slow")
+    async def slow(payload, session_factory):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        done.append(payload["n"])
+
+    await add_jobs(db_session, "test_slow", count=6)
+    stop = asyncio.Event()
+    task = asyncio.create_task(queue.run(stop))
+    for _ in range(500):
+        if len(done) == 6:
+            break
+        await asyncio.sleep(0.01)
+    stop.set()
+    await asyncio.wait_for(task, timeout=5)
+
+    assert sorted(done) == list(range(6))
+    assert peak == 2
+
+
+async def test_registration_queues_its_qr_code(queue, db_session, event, make_users):
+    [member] = await make_users()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            f"{settings.API_V1_STR}/registrations/{event}/register", headers=member.headers
+        )
+    [job] = await stored_jobs(db_session)
+
+    assert response.status_code == 200
+    assert job.kind == job_queue.RENDER_QRCODE
+    assert job.payload == {"registration_id": response.json()["id"]}
+
+
+async def test_registration_and_its_qr_code_job_commit_together(
+    queue, db_session, event, make_users, monkeypatch
+):
+    [member] = await make_users()
+
+    def unavailable(*args, **kwargs):
+        raise RuntimeError("queue unavailable")
+
+    # app.crud exports the CRUD object under the module's name
+    monkeypatch.setattr(importlib.import_module("app.crud.registration"), "enqueue_job", unavailable)
+    async with TestingSessionLocal() as db:
+        with pytest.raises(RuntimeError):
+            await registration.register(db, event_id=event, user_id=member.id)
+
+    # Neither the registration nor its seat was kept without the job
+    registrations = await db_session.scalar(
+        select(func.count()).select_from(Registration).where(Registration.event_id == event)
+    )
+    seats_taken = await db_session.scalar(
+        select(Event.seats_taken)
+        .where(Event.id == event)
+        .execution_options(populate_existing=True)
+    )
+    assert (registrations, seats_taken) == (0, 0)
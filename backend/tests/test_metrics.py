@@ -0,0 +1,41 @@
+import httpx
+
+from app.core.config import settings
+from app.main import app
+
+
+async def test_metrics_report_route_templates_and_status():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get(f"{settings.API_V1_STR}/blog")
+        await client.get(f"{settings.API_V1_STR}/blog/not-a-uuid")
+        await client.get("/no/such/path")
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'route="/api/v1/blog",status="200"' in body
+    assert 'route="/api/v1/blog/{id}",status="422"' in body
+    assert 'route="unmatched",status="404"' in body
+    assert "/no/such/path" not in body
+    assert "http_requests_in_flight" in body
+
+
+async def test_diagnostics_are_for_admins_only(dev_auth):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for path in ("/metrics/pool", "/metrics/response-cache", "/metrics/jobs"):
+            anonymous = await client.get(path)
+            host = await client.get(
+                path, headers={"x-dev-email": "host@example.com", "x-dev-groups": "host"}
+            )
+            admin = await client.get(
+                path, headers={"x-dev-email": "admin@example.com", "x-dev-groups": "admin"}
+            )
+
+            assert anonymous.status_code == 403
+            assert host.status_code == 403
+            assert admin.status_code == 200
+
+    assert set(admin.json()) == {"succeeded", "retried", "failed", "in_flight"}
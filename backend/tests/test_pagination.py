@@ -0,0 +1,76 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, insert
+
+from app.core.config import settings
+from app.crud.base import decode_cursor
+from app.main import app
+from app.models import BlogPost, User
+
+
+@pytest.fixture
+async def blog_posts(db_session):
+    """Seed blog posts, several sharing a creation time to exercise the id tie-break."""
+    author_id = uuid.uuid4()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "title": f"Post {i}",
+            "content": "...",
+            "author_id": author_id,
+            "created_at": base + timedelta(minutes=i // 3),
+        }
+        for i in range(7)
+    ]
+    await db_session.execute(
+        insert(User), [{"id": author_id, "name": "Author", "email": f"{author_id}@example.com"}]
+    )
+    await db_session.execute(insert(BlogPost), rows)
+    await db_session.commit()
+    yield sorted(rows, key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    await db_session.execute(delete(BlogPost).where(BlogPost.author_id == author_id))
+    await db_session.execute(delete(User).where(User.id == author_id))
+    await db_session.commit()
+
+
+async def test_blog_cursor_pagination_walks_every_post_once(blog_posts):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+            response = await client.get(f"{settings.API_V1_STR}/blog", params=params)
+            assert response.status_code == 200
+            seen.extend(post["id"] for post in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+    assert seen == [str(row["id"]) for row in blog_posts]
+
+
+async def test_skip_limit_still_supported_and_bad_cursor_rejected(blog_posts):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(f"{settings.API_V1_STR}/blog", params={"skip": 2, "limit": 2})
+        assert [post["id"] for post in response.json()] == [str(row["id"]) for row in blog_posts[2:4]]
+
+        response = await client.get(f"{settings.API_V1_STR}/blog", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+
+@pytest.mark.parametrize("fields", [["2020-01-01", 5], [5, "00" * 16], ["2020-01-01"], {"a": 1}, 7])
+def test_malformed_cursor_is_a_bad_request(fields):
+    cursor = base64.urlsafe_b64encode(json.dumps(fields).encode()).decode()
+
+    with pytest.raises(HTTPException) as raised:
+        decode_cursor(cursor)
+
+    assert raised.value.status_code == 400
@@ -0,0 +1,41 @@
+import pytest
+
+from app.core import qrcode_utils
+from app.core.qrcode_utils import QRCodeRenderer, generate_qrcodes_batch
+from app.core.storage import StorageService
+from tests.test_storage import SlowClient
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    renderer = QRCodeRenderer(max_workers=2, max_pending=2, chunk_size=4)
+    monkeypatch.setattr(qrcode_utils, "renderer", renderer)
+    yield renderer
+    renderer.close()
+
+
+async def test_render_many_keeps_order(renderer):
+    items = [f"payload-{i}" for i in range(10)]
+
+    pngs = await renderer.render_many(items)
+
+    assert len(pngs) == 10
+    assert all(png.startswith(PNG_SIGNATURE) for png in pngs)
+    assert pngs == [qrcode_utils.render_qrcode_png(item) for item in items]
+
+
+async def test_batch_uploads_every_code(renderer, monkeypatch):
+    client = SlowClient(delay=0)
+    service = StorageService(max_workers=4, client=client)
+    monkeypatch.setattr(qrcode_utils, "storage", service)
+    items = [({"registration_id": str(i)}, f"registrations/{i}.png") for i in range(9)]
+
+    urls = await generate_qrcodes_batch(items)
+    service.close()
+
+    assert [url.rsplit("/", 2)[-2:] for url in urls] == [
+        ["registrations", f"{i}.png"] for i in range(9)
+    ]
+    assert all(body.startswith(PNG_SIGNATURE) for body in client.objects.values())
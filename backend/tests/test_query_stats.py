@@ -0,0 +1,62 @@
+import logging
+
+import httpx
+
+from app.core.config import settings
+from app.core.middleware import QueryStatsMiddleware
+from app.core.query_stats import (
+    QueryStats, current_query_stats, install_query_stats, statement_shape,
+)
+from app.main import app
+from tests.conftest import engine
+
+install_query_stats(engine.sync_engine)
+
+
+def test_statement_shape_ignores_parameter_list_length():
+    assert statement_shape("SELECT * FROM users WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT *\n  FROM users WHERE id IN (?)"
+    )
+    assert statement_shape("SELECT * FROM users WHERE id = $1") != statement_shape(
+        "SELECT * FROM events WHERE id = $1"
+    )
+
+
+def test_repeated_shapes_above_threshold():
+    stats = QueryStats()
+    for _ in range(4):
+        stats.record("SELECT * FROM users WHERE id = ?", 0.001)
+    stats.record("SELECT * FROM events", 0.001)
+
+    assert stats.count == 5
+    assert stats.repeated(3) == [("SELECT * FROM users WHERE id = ?", 4)]
+
+
+async def test_request_queries_are_counted_and_logged(caplog):
+    transport = httpx.ASGITransport(app=app)
+
+    with caplog.at_level(logging.INFO, logger="app.core.middleware"):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get(f"{settings.API_V1_STR}/blog")
+
+    assert response.status_code == 200
+    messages = [
+        record.getMessage() for record in caplog.records
+        if record.getMessage().startswith(f"GET {settings.API_V1_STR}/blog: count=")
+    ]
+    assert messages and "count=0;" not in messages[-1]
+
+
+async def test_header_reports_the_request_summary():
+    async def endpoint(scope, receive, send):
+        current_query_stats().record("SELECT 1", 0.002)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    transport = httpx.ASGITransport(
+        app=QueryStatsMiddleware(endpoint, header=True, repeated_threshold=5)
+    )
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/")
+
+    assert response.headers["X-DB-Queries"] == "count=1; time_ms=2.0; max_repeat=1"
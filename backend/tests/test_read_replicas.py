@@ -0,0 +1,74 @@
+import itertools
+
+import pytest
+from sqlalchemy import text
+from starlette.requests import Request
+
+from app.core import database
+from app.core.middleware import ReadYourWritesMiddleware
+
+
+def make_request(cookie=None):
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@pytest.fixture
+async def replicas(monkeypatch, tmp_path):
+    """Point the read path at one working and one unreachable replica."""
+    working = database._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    broken = database._create_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(database, "replica_engines", [broken, working])
+    monkeypatch.setattr(
+        database,
+        "_replica_sessions",
+        itertools.cycle([database._session_factory(broken), database._session_factory(working)]),
+    )
+    yield working
+    await working.dispose()
+    await broken.dispose()
+
+
+async def session_engine(request):
+    sessions = database.get_read_db(request)
+    session = await sessions.__anext__()
+    try:
+        await session.execute(text("SELECT 1"))
+        return session.bind
+    finally:
+        await sessions.aclose()
+
+
+async def test_reads_skip_an_unreachable_replica(replicas):
+    assert await session_engine(make_request()) is replicas
+
+
+async def test_recent_writer_reads_from_the_primary(replicas):
+    request = make_request(f"{database.READ_PRIMARY_COOKIE}=1")
+    assert await session_engine(request) is database.engine
+
+
+async def test_reads_use_the_primary_without_replicas():
+    assert await session_engine(make_request()) is database.engine
+
+
+async def response_headers(method, status):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = ReadYourWritesMiddleware(app, max_age=5)
+    await middleware({"type": "http", "method": method, "headers": []}, None, send)
+    return dict(sent[0]["headers"])
+
+
+async def test_successful_writes_set_the_read_primary_cookie():
+    headers = await response_headers("POST", 201)
+    assert headers[b"set-cookie"].startswith(b"read_primary=1; Max-Age=5")
+    assert b"set-cookie" not in await response_headers("PUT", 400)
+    assert b"set-cookie" not in await response_headers("GET", 200)
@@ -0,0 +1,179 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, insert, select
+
+from app.core.config import settings
+from app.crud import registration
+from app.main import app
+from app.models import Event, Registration, RegistrationStatus
+from tests.conftest import TestingSessionLocal, engine
+
+CAPACITY = 150
+USERS = 2000
+DUPLICATE_ATTEMPTS = 200
+# Every attempt holds a connection, so run at most as many as the test pool
+# opens; more would time out waiting for the pool, not race for seats
+POOL = engine.sync_engine.pool
+CONNECTIONS = POOL.size() + max(POOL._max_overflow, 0)
+
+
+@pytest.fixture
+async def event_with_members(make_users, make_event):
+    """Factory for an event with a pool of member accounts; the first one hosts it."""
+    async def _make(*, capacity: int, users: int):
+        members = await make_users(users)
+        user_ids = [member.id for member in members]
+        return await make_event(user_ids[0], capacity=capacity), user_ids
+
+    return _make
+
+
+async def _gather_bounded(coros):
+    slots = asyncio.Semaphore(CONNECTIONS)
+
+    async def run(coro):
+        async with slots:
+            return await coro
+
+    return await asyncio.gather(*(run(coro) for coro in coros))
+
+
+async def _register(event_id, user_id):
+    async with TestingSessionLocal() as db:
+        try:
+            db_obj = await registration.register(db, event_id=event_id, user_id=user_id)
+            return db_obj.status
+        except HTTPException as exc:
+            return exc.status_code
+
+
+async def _cancel(registration_id):
+    async with TestingSessionLocal() as db:
+        db_obj = await registration.get(db, id=registration_id)
+        return await registration.cancel(db, db_obj=db_obj)
+
+
+async def _status_counts(db, event_id):
+    query = (
+        select(Registration.status, func.count())
+        .where(Registration.event_id == event_id)
+        .group_by(Registration.status)
+    )
+    return dict((await db.execute(query)).all())
+
+
+async def test_simultaneous_registrations_fill_exactly_to_capacity(event_with_members, db_session):
+    event_id, user_ids = await event_with_members(capacity=CAPACITY, users=USERS)
+    attempts = user_ids + user_ids[:DUPLICATE_ATTEMPTS]
+
+    outcomes = await _gather_bounded(_register(event_id, id) for id in attempts)
+
+    assert outcomes.count(RegistrationStatus.CONFIRMED) == CAPACITY
+    assert outcomes.count(RegistrationStatus.WAITLISTED) == USERS - CAPACITY
+    assert outcomes.count(400) == DUPLICATE_ATTEMPTS
+
+    counts = await _status_counts(db_session, event_id)
+    seats_taken = await db_session.scalar(select(Event.seats_taken).where(Event.id == event_id))
+    assert counts == {
+        RegistrationStatus.CONFIRMED: CAPACITY,
+        RegistrationStatus.WAITLISTED: USERS - CAPACITY,
+    }
+    assert seats_taken == CAPACITY
+
+
+async def test_concurrent_cancellations_promote_the_waitlist_in_order(event_with_members, db_session):
+    capacity, waitlisted, cancellations = 50, 100, 30
+    event_id, user_ids = await event_with_members(capacity=capacity, users=capacity + waitlisted)
+    joined = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "event_id": event_id,
+            "user_id": user_id,
+            "status": RegistrationStatus.CONFIRMED if i < capacity else RegistrationStatus.WAITLISTED,
+            "waitlisted_at": None if i < capacity else joined + timedelta(milliseconds=i),
+        }
+        for i, user_id in enumerate(user_ids)
+    ]
+    await db_session.execute(insert(Registration), rows)
+    await db_session.execute(
+        Event.__table__.update().where(Event.id == event_id).values(seats_taken=capacity)
+    )
+    await db_session.commit()
+
+    # Cancel confirmed seats alongside a few waitlisted entries near the head
+    cancelled = [row["id"] for row in rows[:cancellations]]
+    cancelled += [row["id"] for row in rows[capacity:capacity + 5]]
+    promoted = await _gather_bounded(_cancel(id) for id in cancelled)
+
+    # Waitlisted entries promoted before their own cancellation promote again
+    promoted_ids = {db_obj.id for db_obj in promoted if db_obj}
+    assert len(promoted_ids) >= cancellations
+    counts = await _status_counts(db_session, event_id)
+    seats_taken = await db_session.scalar(select(Event.seats_taken).where(Event.id == event_id))
+    assert counts[RegistrationStatus.CONFIRMED] == seats_taken == capacity
+    assert counts[RegistrationStatus.CANCELLED] == len(cancelled)
+
+    # Freed seats went to the earliest entries that were still waiting
+    confirmed = set(
+        await db_session.scalars(
+            select(Registration.id).where(
+                Registration.event_id == event_id,
+                Registration.status == RegistrationStatus.CONFIRMED,
+            )
+        )
+    )
+    kept = [row["id"] for row in rows[cancellations:capacity]]
+    still_waiting = [row["id"] for row in rows[capacity:] if row["id"] not in cancelled]
+    assert confirmed == set(kept) | set(still_waiting[:cancellations])
+
+
+async def test_raising_capacity_promotes_the_waitlist_in_order(host, make_users, make_event, db_session):
+    event_id = await make_event(host.id, capacity=2)
+    members = [member.id for member in await make_users(5)]
+    joined = datetime.now(timezone.utc)
+    # Waitlisted in the reverse of insertion order, so the promotion follows waitlisted_at
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "event_id": event_id,
+            "user_id": user_id,
+            "status": RegistrationStatus.CONFIRMED if i < 2 else RegistrationStatus.WAITLISTED,
+            "waitlisted_at": None if i < 2 else joined - timedelta(seconds=i),
+        }
+        for i, user_id in enumerate(members)
+    ]
+    await db_session.execute(insert(Registration), rows)
+    await db_session.execute(
+        Event.__table__.update().where(Event.id == event_id).values(seats_taken=2)
+    )
+    await db_session.commit()
+
+    url = f"{settings.API_V1_STR}/events/{event_id}"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        raised = await client.patch(url, json={"capacity": 4, "venue": "Big hall"}, headers=host.headers)
+        below_taken = await client.patch(url, json={"capacity": 3}, headers=host.headers)
+
+    assert raised.status_code == 200, raised.text
+    assert raised.json()["capacity"] == 4 and raised.json()["venue"] == "Big hall"
+    assert below_taken.status_code == 400
+    confirmed = set(
+        await db_session.scalars(
+            select(Registration.id).where(
+                Registration.event_id == event_id,
+                Registration.status == RegistrationStatus.CONFIRMED,
+            )
+        )
+    )
+    # The two that joined the waitlist first, i.e. the last two inserted
+    assert confirmed == {row["id"] for row in rows[:2]} | {row["id"] for row in rows[-2:]}
+    db_event = await db_session.scalar(
+        select(Event).where(Event.id == event_id).execution_options(populate_existing=True)
+    )
+    assert (db_event.capacity, db_event.seats_taken) == (4, 4)
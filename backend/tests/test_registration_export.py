@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import insert
+
+from app.api.endpoints import registrations
+from app.core.config import settings
+from app.crud.registration import EXPORT_COLUMNS
+from app.main import app
+from app.models import Registration
+from tests.conftest import TestingSessionLocal
+
+ATTENDEES = 2500
+
+
+@pytest.fixture
+async def big_event(db_session, host, make_users, make_event, monkeypatch):
+    monkeypatch.setattr(registrations, "AsyncSessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 1000)
+    event_id = await make_event(host.id, capacity=ATTENDEES)
+    # A comma in every name, which the CSV must quote
+    members = await make_users(ATTENDEES, name="Member, Jr")
+    await db_session.execute(insert(Registration), [
+        {"id": uuid.uuid4(), "event_id": event_id, "user_id": member.id} for member in members
+    ])
+    await db_session.commit()
+    return event_id, host.headers
+
+
+async def _export(big_event, format):
+    event_id, headers = big_event
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async with client.stream(
+            "GET",
+            f"{settings.API_V1_STR}/registrations/event/{event_id}/export",
+            params={"format": format},
+            headers=headers,
+        ) as response:
+            assert response.status_code == 200
+            body = "".join([chunk async for chunk in response.aiter_text()])
+    return response, body
+
+
+async def test_csv_export_streams_every_registration(big_event):
+    response, body = await _export(big_event, "csv")
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(body)))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert len(rows) == ATTENDEES + 1
+    assert {row[1] for row in rows[1:]} == {"Member, Jr"}
+
+
+async def test_ndjson_export_streams_every_registration(big_event):
+    _, body = await _export(big_event, "ndjson")
+
+    records = [json.loads(line) for line in body.splitlines()]
+    assert len(records) == ATTENDEES
+    assert set(records[0]) == set(EXPORT_COLUMNS)
+    assert records[0]["status"] == "confirmed"
+    assert records[0]["checkin_start"] is None
@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import insert, select, update
+
+from app.api.endpoints import registrations
+from app.core import ticket_qrcodes
+from app.core.config import settings
+from app.main import app
+from app.models import Registration, RegistrationStatus
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture
+async def member_registration(db_session, make_users, make_event, monkeypatch):
+    monkeypatch.setattr(ticket_qrcodes, "AsyncSessionLocal", TestingSessionLocal)
+    [member] = await make_users()
+    event_id, registration_id = await make_event(member.id), uuid.uuid4()
+    await db_session.execute(
+        insert(Registration),
+        [{"id": registration_id, "event_id": event_id, "user_id": member.id}],
+    )
+    await db_session.commit()
+    return registration_id, member.headers
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Record QR renders instead of drawing and uploading them."""
+    calls = []
+
+    async def fake_generate(registration_id, event_id):
+        calls.append(registration_id)
+        await asyncio.sleep(0.05)
+        return f"https://qrcodes.example.com/registrations/{registration_id}.png"
+
+    async def fake_presign(bucket, object_name, **kwargs):
+        return f"https://qrcodes.example.com/{object_name}?signed"
+
+    monkeypatch.setattr(ticket_qrcodes, "_generate_registration_qrcode", fake_generate)
+    monkeypatch.setattr(registrations, "generate_presigned_download_url", fake_presign)
+    return calls
+
+
+async def test_rush_of_ticket_views_renders_once(member_registration, renders, db_session):
+    registration_id, headers = member_registration
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(
+            client.get(f"{settings.API_V1_STR}/registrations/{registration_id}/qr", headers=headers)
+            for _ in range(20)
+        ))
+
+    assert {response.status_code for response in responses} == {307}
+    assert responses[0].headers["location"].endswith(f"registrations/{registration_id}.png?signed")
+    assert renders == [registration_id]
+    stored = await db_session.scalar(
+        select(Registration.qr_code_url)
+        .where(Registration.id == registration_id)
+        .execution_options(populate_existing=True)
+    )
+    assert stored.endswith(f"{registration_id}.png")
+
+
+async def test_row_lock_renders_once_across_workers(member_registration, renders):
+    registration_id, _ = member_registration
+
+    # Bypass the in-process single-flight, as separate workers would
+    urls = await asyncio.gather(*(
+        ticket_qrcodes._store_registration_qrcode(registration_id) for _ in range(5)
+    ))
+
+    assert len(set(urls)) == 1
+    assert renders == [registration_id]
+
+
+@pytest.mark.parametrize("registration_status", [RegistrationStatus.WAITLISTED, RegistrationStatus.CANCELLED])
+async def test_only_confirmed_registrations_get_a_ticket(
+    member_registration, renders, db_session, registration_status
+):
+    registration_id, headers = member_registration
+    await db_session.execute(
+        update(Registration).where(Registration.id == registration_id).values(status=registration_status)
+    )
+    await db_session.commit()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get(
+            f"{settings.API_V1_STR}/registrations/{registration_id}/qr", headers=headers
+        )
+
+    assert response.status_code == 409
+    assert renders == []
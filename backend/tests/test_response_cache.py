@@ -0,0 +1,193 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+
+from app.core.config import settings
+from app.core.response_cache import (
+    CachedResponse, InMemoryCacheBackend, ResponseCache, item_tag,
+)
+from app.main import app
+
+
+@asynccontextmanager
+async def no_session():
+    yield None
+
+
+def make_cache(ttl=60, stale_ttl=60):
+    return ResponseCache(
+        InMemoryCacheBackend(maxsize=10), ttl=ttl, stale_ttl=stale_ttl, session_factory=no_session
+    )
+
+
+def counting_loader():
+    calls = []
+
+    async def load(db):
+        calls.append(db)
+        await asyncio.sleep(0)
+        return CachedResponse(body=f"{len(calls)}".encode())
+
+    return load, calls
+
+
+async def test_miss_then_hit():
+    cache = make_cache()
+    load, calls = counting_loader()
+
+    first = await cache.get_or_load("k", load, db="db", collection="blog", tags=["blog"])
+    second = await cache.get_or_load("k", load, db="db", collection="blog", tags=["blog"])
+
+    assert first == (CachedResponse(body=b"1"), "MISS")
+    assert second == (CachedResponse(body=b"1"), "HIT")
+    assert calls == ["db"]
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+async def test_stale_entry_is_served_while_one_refresh_runs():
+    cache = make_cache(ttl=0.2)
+    load, calls = counting_loader()
+    await cache.get_or_load("k", load, db="db", collection="blog", tags=["blog"])
+    await asyncio.sleep(0.25)
+
+    stale = await asyncio.gather(*(
+        cache.get_or_load("k", load, db="db", collection="blog", tags=["blog"]) for _ in range(3)
+    ))
+    await asyncio.sleep(0.01)
+    refreshed = await cache.get_or_load("k", load, db="db", collection="blog", tags=["blog"])
+
+    assert stale == [(CachedResponse(body=b"1"), "STALE")] * 3
+    assert refreshed == (CachedResponse(body=b"2"), "HIT")
+    # The background refresh used its own session, not the request's
+    assert calls == ["db", None]
+
+
+async def test_invalidation_drops_tagged_entries_only():
+    cache = make_cache()
+    load, _ = counting_loader()
+    await cache.get_or_load("list", load, db=None, collection="blog", tags=["blog"])
+    await cache.get_or_load("a", load, db=None, collection="blog", tags=[item_tag("blog", "a")])
+    await cache.get_or_load("b", load, db=None, collection="blog", tags=[item_tag("blog", "b")])
+
+    await cache.invalidate_item("blog", "a")
+
+    assert cache.stats()["size"] == 1
+    assert (await cache.get_or_load("b", load, db=None, collection="blog", tags=[]))[1] == "HIT"
+
+
+async def test_load_racing_an_invalidation_is_not_stored():
+    cache = make_cache()
+    release = asyncio.Event()
+
+    async def slow_load(db):
+        await release.wait()
+        return CachedResponse(body=b"old")
+
+    pending = asyncio.ensure_future(
+        cache.get_or_load("k", slow_load, db=None, collection="blog", tags=["blog"])
+    )
+    await asyncio.sleep(0)
+    await cache.invalidate("blog")
+    release.set()
+    await pending
+
+    assert cache.stats()["size"] == 0
+
+
+async def test_writes_invalidate_cached_pages(host):
+    headers = host.headers
+    url = f"{settings.API_V1_STR}/blog"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get(url)
+        cached = await client.get(url)
+        created = await client.post(url, json={"title": "Hello", "content": "World"}, headers=headers)
+        client.cookies.clear()
+        after_create = await client.get(url)
+        post_url = f"{url}/{created.json()['id']}"
+        await client.get(post_url)
+        await client.patch(post_url, json={"title": "Edited"}, headers=headers)
+        client.cookies.clear()
+        after_update = await client.get(post_url)
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert cached.headers["X-Cache"] == "HIT" and cached.content == first.content
+    assert after_create.headers["X-Cache"] == "MISS"
+    assert created.json()["id"] in {post["id"] for post in after_create.json()}
+    assert after_update.headers["X-Cache"] == "MISS"
+    assert after_update.json()["title"] == "Edited"
+
+
+async def test_recent_writer_bypasses_the_cache(event):
+    url = f"{settings.API_V1_STR}/events/{event}"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get(url)
+        client.cookies.set("read_primary", "1")
+        response = await client.get(url)
+
+    assert response.status_code == 200
+    assert response.json()["id"] == str(event)
+    assert response.headers["X-Cache"] == "BYPASS"
+
+
+async def test_unchanged_pages_answer_304(host):
+    headers = host.headers
+    url = f"{settings.API_V1_STR}/blog"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        created = await client.post(url, json={"title": "Hello", "content": "World"}, headers=headers)
+        client.cookies.clear()
+        post_url = f"{url}/{created.json()['id']}"
+        first = await client.get(post_url)
+        etag = first.headers["ETag"]
+        unchanged = await client.get(post_url, headers={"If-None-Match": etag})
+        # SQLite's CURRENT_TIMESTAMP, which sets updated_at there, has one-second resolution
+        await asyncio.sleep(1.1)
+        await client.patch(post_url, json={"title": "Edited"}, headers=headers)
+        client.cookies.clear()
+        changed = await client.get(post_url, headers={"If-None-Match": etag})
+        await client.delete(post_url, headers=headers)
+        client.cookies.clear()
+        listing = await client.get(url, headers={"If-None-Match": etag})
+
+    assert first.status_code == 200 and "Last-Modified" in first.headers
+    assert unchanged.status_code == 304 and unchanged.content == b""
+    assert unchanged.headers["ETag"] == etag
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json()["title"] == "Edited"
+    assert listing.status_code == 200
+
+
+async def test_list_versions_only_cover_the_rows_on_the_page(host, make_users):
+    headers = host.headers
+    [outsider] = await make_users(name="Outsider")
+    url = f"{settings.API_V1_STR}/blog"
+    me = f"{settings.API_V1_STR}/users/me"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        posts = []
+        for title in ("Oldest", "Older", "Newer"):
+            created = await client.post(url, json={"title": title, "content": "Post"}, headers=headers)
+            posts.append(created.json()["id"])
+            # SQLite's CURRENT_TIMESTAMP, which sets created_at and updated_at
+            # there, has one-second resolution
+            await asyncio.sleep(1.1)
+        client.cookies.clear()
+        etag = (await client.get(url, params={"limit": 1})).headers["ETag"]
+
+        # Neither a stranger's profile nor a post on another page is on this page
+        await client.patch(me, json={"name": "Renamed"}, headers=outsider.headers)
+        await client.patch(f"{url}/{posts[0]}", json={"title": "Edited"}, headers=headers)
+        client.cookies.clear()
+        unaffected = await client.get(url, params={"limit": 1}, headers={"If-None-Match": etag})
+
+        # The author of a post on the page is
+        await client.patch(me, json={"name": "Renamed"}, headers=headers)
+        client.cookies.clear()
+        changed = await client.get(url, params={"limit": 1}, headers={"If-None-Match": etag})
+
+    assert unaffected.status_code == 304
+    assert changed.status_code == 200
+    assert changed.json()[0]["author"]["name"] == "Renamed"
@@ -0,0 +1,62 @@
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import pytest
+
+from app.core.serialization import ORJSONResponse, dump_trusted, json_body
+from app.models import Event, Registration, RegistrationStatus, User
+from app.models.registration import PaymentStatus
+from app.models.user import UserRole
+from app.schemas.event import EventWithCounts, EventWithCountsAndRegistrations, EventWithRelations
+from tests.conftest import event_row
+
+
+def make_user(i):
+    now = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+    return User(
+        id=uuid.uuid4(), name=f"Member {i}", email=f"member{i}@example.com", role=UserRole.MEMBER,
+        created_at=now, updated_at=now + timedelta(microseconds=i),
+    )
+
+
+def make_event(registrations):
+    now = datetime(2026, 10, 16, 12, 0, 0, 123456, tzinfo=timezone.utc)
+    host = make_user(0)
+    event = Event(**event_row(
+        description=None, date_time=now, is_paid=False, price=0, capacity=registrations,
+        seats_taken=registrations, created_by_id=host.id, created_by=host, created_at=now, updated_at=now,
+    ))
+    event.registrations = [
+        Registration(
+            id=uuid.uuid4(), event_id=event.id, user_id=user.id, user=user,
+            status=RegistrationStatus.CONFIRMED, payment_status=PaymentStatus.PENDING, checkin_start=now if i % 2 else None,
+            created_at=now, updated_at=now,
+        )
+        for i, user in enumerate(make_user(i) for i in range(1, registrations + 1))
+    ]
+    event.registration_count = registrations
+    event.checked_in_count = registrations // 2
+    event.seats_left = 0
+    return event
+
+
+@pytest.mark.parametrize(
+    "schema", [EventWithRelations, EventWithCountsAndRegistrations, EventWithCounts]
+)
+def test_trusted_path_matches_validated_output(schema):
+    event = make_event(3)
+
+    assert json.loads(dump_trusted(schema, event)) == json.loads(json_body(schema, event))
+    assert json.loads(dump_trusted(List[schema], [event, event])) == json.loads(
+        json_body(List[schema], [event, event])
+    )
+
+
+def test_orjson_response_formats_like_pydantic():
+    at = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+    assert ORJSONResponse({"at": at, "id": uuid.UUID(int=1)}).body == (
+        b'{"at":"2026-10-16T12:00:00Z","id":"00000000-0000-0000-0000-000000000001"}'
+    )
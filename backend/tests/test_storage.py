@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.core.storage import ObjectTooLarge, StorageService
+
+
+class SlowClient:
+    """Stand-in for a boto3 S3 client whose calls block their thread."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.threads = set()
+        self.objects = {}
+
+    def put_object(self, Body, Bucket, Key, **kwargs):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        self.objects[(Bucket, Key)] = Body
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        self.parts = {}
+        self.aborted = False
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Body, Bucket, Key, PartNumber, UploadId):
+        self.parts[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        self.objects[(Bucket, Key)] = b"".join(self.parts[n] for n in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = True
+
+    def delete_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "DeleteObject")
+        del self.objects[(Bucket, Key)]
+
+
+async def test_uploads_run_off_the_event_loop():
+    client = SlowClient()
+    storage = StorageService(max_workers=4, client=client)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    tick_task = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    urls = await asyncio.gather(
+        *(storage.upload("bucket", f"key-{i}", b"data") for i in range(4))
+    )
+    elapsed = time.perf_counter() - started
+    tick_task.cancel()
+    storage.close()
+
+    assert len(urls) == 4 and urls[0].endswith("/key-0")
+    assert threading.get_ident() not in client.threads
+    assert elapsed < 4 * client.delay
+    assert ticks > 5
+
+
+async def test_stats_count_calls_and_errors():
+    storage = StorageService(max_workers=2, client=SlowClient(delay=0))
+
+    await storage.upload("bucket", "key", b"data")
+    await storage.delete("bucket", "key")
+    with pytest.raises(ClientError):
+        await storage.delete("bucket", "key")
+    stats = storage.stats()
+    storage.close()
+
+    assert stats["in_flight"] == 0
+    assert stats["operations"]["upload"]["calls"] == 1
+    assert stats["operations"]["delete"]["calls"] == 2
+    assert stats["operations"]["delete"]["errors"] == 1
+
+
+def make_reader(data, max_read=None):
+    """Async reader over bytes, optionally returning short reads."""
+    position = 0
+    reads = []
+
+    async def read(size):
+        nonlocal position
+        size = min(size, max_read or size)
+        reads.append(size)
+        chunk = data[position:position + size]
+        position += len(chunk)
+        return chunk
+
+    return read, reads
+
+
+async def test_stream_within_one_part_is_a_single_put():
+    client = SlowClient(delay=0)
+    storage = StorageService(max_workers=2, client=client)
+    read, _ = make_reader(b"x" * 10)
+
+    await storage.upload_stream("bucket", "key", read, part_size=10, max_size=100)
+    storage.close()
+
+    assert client.objects[("bucket", "key")] == b"x" * 10
+    assert not hasattr(client, "parts")
+
+
+async def test_stream_is_uploaded_in_full_parts_with_bounded_reads():
+    client = SlowClient(delay=0)
+    storage = StorageService(max_workers=2, client=client)
+    data = bytes(range(256)) * 10
+    read, reads = make_reader(data, max_read=7)
+
+    await storage.upload_stream("bucket", "key", read, part_size=1000, max_size=10_000)
+    storage.close()
+
+    assert client.objects[("bucket", "key")] == data
+    assert [len(client.parts[n]) for n in sorted(client.parts)] == [1000, 1000, 560]
+    assert max(reads) <= 7
+
+
+async def test_oversized_stream_is_aborted():
+    client = SlowClient(delay=0)
+    storage = StorageService(max_workers=2, client=client)
+    read, _ = make_reader(b"x" * 3500)
+
+    with pytest.raises(ObjectTooLarge):
+        await storage.upload_stream("bucket", "key", read, part_size=1000, max_size=3000)
+    storage.close()
+
+    assert client.aborted
+    assert ("bucket", "key") not in client.objects
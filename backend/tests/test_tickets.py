@@ -0,0 +1,63 @@
+import base64
+import uuid
+
+import pytest
+import qrcode
+
+from app.core.config import settings
+from app.core.tickets import InvalidTicket, check_signing_key, decode_ticket, encode_ticket
+
+KEY = b"test-signing-key"
+
+
+def test_ticket_round_trips():
+    registration_id, event_id = uuid.uuid4(), uuid.uuid4()
+
+    ticket = decode_ticket(encode_ticket(registration_id, event_id, key=KEY), key=KEY)
+
+    assert ticket.registration_id == registration_id
+    assert ticket.event_id == event_id
+
+
+def test_ticket_fits_a_version_3_qr_code():
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L)
+    qr.add_data(encode_ticket(uuid.uuid4(), uuid.uuid4(), key=KEY))
+    qr.make(fit=True)
+
+    assert qr.version <= 3
+
+
+@pytest.mark.parametrize("tamper", ["other key", "flipped byte", "truncated", "garbage", "version"])
+def test_forged_tickets_are_rejected(tamper):
+    ticket = encode_ticket(uuid.uuid4(), uuid.uuid4(), key=KEY)
+    raw = bytearray(base64.b32decode(ticket + "=" * (-len(ticket) % 8)))
+    if tamper == "other key":
+        ticket = encode_ticket(uuid.uuid4(), uuid.uuid4(), key=b"someone else")
+    elif tamper == "flipped byte":
+        raw[5] ^= 1
+        ticket = base64.b32encode(bytes(raw)).decode().rstrip("=")
+    elif tamper == "truncated":
+        ticket = ticket[:-8]
+    elif tamper == "garbage":
+        ticket = "not a ticket!"
+    elif tamper == "version":
+        raw[0] = 2
+        ticket = base64.b32encode(bytes(raw)).decode().rstrip("=")
+
+    with pytest.raises(InvalidTicket):
+        decode_ticket(ticket, key=KEY)
+
+
+def test_start_up_requires_a_shared_signing_key(monkeypatch):
+    # Neither key configured: SECRET_KEY keeps its random per-process default
+    monkeypatch.setattr(settings, "QR_SIGNING_KEY", None)
+    monkeypatch.setattr(settings, "__pydantic_fields_set__", settings.model_fields_set - {"SECRET_KEY"})
+    with pytest.raises(RuntimeError):
+        check_signing_key()
+
+    monkeypatch.setattr(settings, "__pydantic_fields_set__", settings.model_fields_set | {"SECRET_KEY"})
+    check_signing_key()
+
+    monkeypatch.setattr(settings, "__pydantic_fields_set__", settings.model_fields_set - {"SECRET_KEY"})
+    monkeypatch.setattr(settings, "QR_SIGNING_KEY", "shared")
+    check_signing_key()
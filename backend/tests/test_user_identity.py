@@ -0,0 +1,42 @@
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert
+
+from app.crud import user
+from app.models import User
+from app.models.user import UserRole
+
+
+@pytest.fixture
+async def member(db_session):
+    user_id = uuid.uuid4()
+    email = f"{user_id}@example.com"
+    await db_session.execute(
+        insert(User), [{"id": user_id, "name": "Member", "email": email, "role": UserRole.MEMBER}]
+    )
+    await db_session.commit()
+    user.identity_cache.clear()
+    yield user_id, email
+    await db_session.execute(delete(User).where(User.id == user_id))
+    await db_session.commit()
+
+
+async def test_identity_is_cached_between_lookups(member, db_session):
+    user_id, email = member
+
+    first = await user.get_identity(db_session, email=email)
+    second = await user.get_identity(db_session, email=email)
+
+    assert first.id == second.id == user_id
+    assert user.identity_cache.stats()["hits"] == 1
+
+
+async def test_update_invalidates_cached_identity(member, db_session):
+    user_id, email = member
+    assert (await user.get_identity(db_session, email=email)).role == UserRole.MEMBER
+
+    db_user = await user.get(db_session, id=user_id)
+    await user.update(db_session, db_obj=db_user, obj_in={"role": UserRole.HOST})
+
+    assert (await user.get_identity(db_session, email=email)).role == UserRole.HOST
@@ -116,7 +116,7 @@ export const EventProvider = ({ children }: { children: ReactNode }) => {
               isPaid: event.is_paid || false,
               category: event.category || "Workshop",
               image: event.category === "AI" ? "🤖" : event.category === "Launch" ? "🛰️" : "🚀",
-              registered: event.registered_count || event.registrations?.length || 0,
+              registered: event.registration_count ?? event.registered_count ?? event.registrations?.length ?? 0,
               instructor: event.instructor || "SPARC Team",
               level: event.level || "All Levels",
               coverImage: event.cover_image_url,